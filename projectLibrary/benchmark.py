@@ -0,0 +1,439 @@
+"""
+Benchmarks for the Home Library data layer.
+Fills a scratch database with a synthetic catalog and times every public
+model function at several catalog sizes.
+
+Usage:
+    python benchmark.py [--sizes 1000 10000 100000] [--repeat 5] [--output run.json]
+    python benchmark.py --profiles interactive bulk-load read-mostly compatible
+    python benchmark.py --memory [--sizes 100000]
+    python benchmark.py --compare baseline.json run.json [--threshold 0.25]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+# Add the project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import models
+from datagen import CatalogSpec, populate
+
+# Rows touched by the batch cases
+BATCH = 100
+
+# Differences below this many seconds are treated as noise when comparing
+NOISE_SECONDS = 0.001
+# Peak memory differences below this many bytes are treated as noise
+NOISE_BYTES = 64 * 1024
+
+
+@dataclass
+class Case:
+    """A benchmarked call. setup runs before each repetition and is not timed.
+    
+    metric, if given, turns the call's result into the reported seconds
+    instead of the wall time of the call. Cases with memory set are also
+    measured with tracemalloc when memory benchmarks are requested.
+    """
+    name: str
+    func: Callable
+    setup: Optional[Callable] = None
+    metric: Optional[Callable] = None
+    memory: bool = False
+
+
+def measure(func, *args, **kwargs):
+    """Call a model function and return (seconds, statements, result).
+    
+    Only statements issued by the data layer are counted; trigger bodies
+    and FTS5 shadow-table access reported by the trace callback are not.
+    SQLite reports a statement again when it resumes after its triggers,
+    so consecutive repeats count once, as does an executemany().
+    """
+    statements = []
+    conn = database.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.set_trace_callback(None)
+    issued = [sql for sql in statements if not sql.startswith("--") and "'main'." not in sql]
+    issued = [sql for i, sql in enumerate(issued) if i == 0 or sql != issued[i - 1]]
+    return elapsed, len(issued), result
+
+
+def measure_memory(func) -> Tuple[int, int]:
+    """Call a model function under tracemalloc and return (peak, retained)
+    bytes of Python objects.
+    
+    Retained bytes are those still allocated when the call returns, which
+    is mostly its result. Tracing slows every allocation down, so this
+    runs apart from the timed calls.
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def result_size(result) -> int:
+    """Number of rows in a model call's result."""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return int(result is not None)
+
+
+def rename_authors(count: int):
+    """Rename the first `count` authors in one transaction."""
+    with database.transaction():
+        for author in models.get_all_authors()[:count]:
+            models.update_author(author.id, author.name + "*")
+
+
+def read_during_write(rows: int) -> List[float]:
+    """Read single publications while another thread inserts `rows` more.
+    
+    Returns the latency of every read; with a rollback journal the reads
+    wait whenever the writer holds an exclusive lock.
+    """
+    done = threading.Event()
+    
+    def write():
+        try:
+            populate(CatalogSpec(publications=rows, authors=0, genres=0, locations=0, seed=1))
+        finally:
+            done.set()
+    
+    writer = threading.Thread(target=write)
+    writer.start()
+    latencies = []
+    while not done.is_set():
+        start = time.perf_counter()
+        models.get_publication_by_id(1)
+        latencies.append(time.perf_counter() - start)
+    writer.join()
+    return latencies
+
+
+def cold(func):
+    """Wrap a cached reference getter so every call reads the database."""
+    def call(*args):
+        models.invalidate_reference_cache()
+        return func(*args)
+    return call
+
+
+def build_cases(size: int) -> List[Case]:
+    """Cases covering every public function of models for a catalog of `size`."""
+    serial = itertools.count()
+    middle = max(size // 2, 1)
+    batch_ids = list(range(1, min(size, BATCH) + 1))
+    created = {}
+    
+    def create(key, func, *args):
+        def setup():
+            created[key] = func(*args).id
+        return setup
+    
+    def unique(prefix):
+        return f"{prefix} {next(serial):06d}"
+    
+    def publication_args(title):
+        return (title, 'book', 2000, None, 1, [1, 2], [1])
+    
+    reads = [
+        Case("get_all_authors", cold(models.get_all_authors)),
+        Case("get_author_ids_by_name", cold(models.get_author_ids_by_name)),
+        Case("get_author_by_id", lambda: models.get_author_by_id(1)),
+        Case("get_all_genres", cold(models.get_all_genres)),
+        Case("get_genre_ids_by_name", cold(models.get_genre_ids_by_name)),
+        Case("get_genre_by_id", lambda: models.get_genre_by_id(1)),
+        Case("get_all_publication_types", cold(models.get_all_publication_types)),
+        Case("get_publication_type_ids_by_name", cold(models.get_publication_type_ids_by_name)),
+        Case("get_publication_type_by_id", lambda: models.get_publication_type_by_id(1)),
+        Case("get_all_storage_locations", cold(models.get_all_storage_locations)),
+        Case("get_storage_location_ids_by_label", cold(models.get_storage_location_ids_by_label)),
+        Case("get_storage_location_by_id", lambda: models.get_storage_location_by_id(1)),
+        Case("get_all_publications", models.get_all_publications),
+        Case("get_all_publications rows", lambda: models.get_all_publications(rows='tuple')),
+        Case("iter_publications", lambda: models.iter_publications(limit=200)),
+        Case("iter_publications rows", lambda: models.iter_publications(limit=200, rows='tuple')),
+        Case("get_publication_keys", models.get_publication_keys),
+        Case("get_publications_by_ids", lambda: models.get_publications_by_ids(batch_ids)),
+        Case("get_publications_by_ids rows", lambda: models.get_publications_by_ids(
+            batch_ids, rows='tuple')),
+        Case("get_publication_by_id", lambda: models.get_publication_by_id(middle)),
+        Case("list_publication_rows", models.list_publication_rows),
+        Case("list_publication_rows by ids", lambda: models.list_publication_rows(batch_ids)),
+        Case("search_publications genre", lambda: models.search_publications(genre_id=1)),
+        Case("search_publications title", lambda: models.search_publications(title='Кобзар')),
+        Case("search_publications all", lambda: models.search_publications(
+            genre_ids=[1, 2], genre_match='all', year_from=1900, year_to=2025)),
+        Case("search_publications facets", lambda: models.search_publications(
+            kind='book', facets=True)),
+        Case("search_publications rows", lambda: models.search_publications(
+            kind='book', facets=True, rows='tuple')),
+        Case("search_text", lambda: models.search_text('Кобзар', limit=size)),
+        Case("search_text top 100", lambda: models.search_text('Кобзар')),
+        Case("search_text rows", lambda: models.search_text('Кобзар', limit=size, rows='tuple')),
+        Case("invalidate_reference_cache", models.invalidate_reference_cache),
+    ]
+    for case in reads:
+        case.memory = True
+    
+    writes = [
+        Case("create_author", lambda: models.create_author(unique("Автор"))),
+        Case("update_author", lambda: models.update_author(1, unique("Автор"))),
+        Case("delete_author", lambda: models.delete_author(created['author']),
+             create('author', models.create_author, "Видалити")),
+        Case("create_genre", lambda: models.create_genre(unique("Жанр"))),
+        Case("update_genre", lambda: models.update_genre(1, unique("Жанр"))),
+        Case("delete_genre", lambda: models.delete_genre(created['genre']),
+             create('genre', models.create_genre, "Видалити")),
+        Case("create_publication_type", lambda: models.create_publication_type(unique("Вид"))),
+        Case("update_publication_type", lambda: models.update_publication_type(1, unique("Вид"))),
+        Case("delete_publication_type", lambda: models.delete_publication_type(created['type']),
+             create('type', models.create_publication_type, "Видалити")),
+        Case("create_storage_location", lambda: models.create_storage_location(unique("Шафа"), "1")),
+        Case("update_storage_location", lambda: models.update_storage_location(
+            1, unique("Шафа"), "1")),
+        Case("delete_storage_location", lambda: models.delete_storage_location(created['location']),
+             create('location', models.create_storage_location, "Видалити", "1")),
+        Case("create_publication", lambda: models.create_publication(
+            *publication_args(unique("Нове видання")))),
+        Case("update_publication", lambda: models.update_publication(
+            middle, unique("Змінене видання"), 'book', 2001, None, 2, [2, 3], [2])),
+        Case("delete_publication", lambda: models.delete_publication(created['publication']),
+             create('publication', models.create_publication, *publication_args("Видалити"))),
+        Case("create_authors", lambda: models.create_authors(
+            [unique("Автор") for _ in range(BATCH)])),
+        Case("create_genres", lambda: models.create_genres(
+            [unique("Жанр") for _ in range(BATCH)])),
+        Case("update_publications", lambda: models.update_publications(
+            [{'id': pub_id, 'year': 1990 + next(serial) % 30} for pub_id in batch_ids])),
+        Case("delete_publications", lambda: models.delete_publications(created['batch']),
+             lambda: created.update(batch=[
+                 models.create_publication(*publication_args("Видалити")).id
+                 for _ in range(BATCH)])),
+        Case("relink_location", lambda: models.relink_location(1, 2),
+             lambda: models.update_publications(
+                 [{'id': pub_id, 'storage_location_id': 1} for pub_id in batch_ids])),
+        Case("update_author x1000", lambda: rename_authors(1000)),
+        Case("read during write (max)", lambda: read_during_write(max(size // 10, 100)),
+             metric=max),
+    ]
+    return reads + writes
+
+
+def run_case(case: Case, repeat: int, memory: bool = False) -> dict:
+    """Time a case `repeat` times and summarize the runs.
+    
+    With memory set, a case that allows it is run once more under
+    tracemalloc and its peak and retained bytes are added.
+    """
+    timings = []
+    statements = results = 0
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        elapsed, statements, result = measure(case.func)
+        timings.append(case.metric(result) if case.metric else elapsed)
+        results = result_size(result)
+    summary = {
+        'case': case.name,
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'statements': statements,
+        'results': results,
+    }
+    if memory and case.memory:
+        if case.setup:
+            case.setup()
+        summary['peak_bytes'], summary['retained_bytes'] = measure_memory(case.func)
+    return summary
+
+
+def format_kib(size: Optional[int]) -> str:
+    return f"{size / 1024:.0f}" if size is not None else "-"
+
+
+def run(sizes, repeat: int = 3, spec: CatalogSpec = None, profiles=None,
+        memory: bool = False) -> dict:
+    """Benchmark every case at each catalog size and storage profile and
+    return the results. With memory set, read cases also report their
+    peak and retained memory."""
+    spec = spec or CatalogSpec()
+    profiles = profiles or [database.get_storage_profile()]
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': spec.seed,
+        'results': [],
+    }
+    print(f"{'profile':<12} {'catalog':>8}  {'function':<34} {'results':>8} {'queries':>8} {'seconds':>9}"
+          + (f" {'peak KiB':>10} {'kept KiB':>10}" if memory else ""))
+    initial_profile = database.get_storage_profile()
+    try:
+        for profile in profiles:
+            database.set_storage_profile(profile)
+            for size in sizes:
+                with tempfile.TemporaryDirectory() as tmp:
+                    os.environ["LIBRARY_DB"] = os.path.join(tmp, "bench.db")
+                    database.init_database()
+                    catalog = CatalogSpec(size, spec.authors, spec.genres, spec.locations,
+                                          spec.authors_per_publication, spec.genres_per_publication,
+                                          spec.seed)
+                    try:
+                        cases = [Case("populate", lambda: populate(catalog))] + build_cases(size)
+                        for case in cases:
+                            result = run_case(case, 1 if case.name == "populate" else repeat, memory)
+                            result['profile'] = profile
+                            result['size'] = size
+                            report['results'].append(result)
+                            line = (f"{profile:<12} {size:>8}  {case.name:<34} {result['results']:>8} "
+                                    f"{result['statements']:>8} {result['seconds']:>9.4f}")
+                            if memory:
+                                line += (f" {format_kib(result.get('peak_bytes')):>10}"
+                                         f" {format_kib(result.get('retained_bytes')):>10}")
+                            print(line)
+                    finally:
+                        database.close_connections()
+                        models.invalidate_reference_cache()
+    finally:
+        os.environ.pop("LIBRARY_DB", None)
+        database.set_storage_profile(initial_profile)
+    return report
+
+
+# ============== Comparison ==============
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25) -> List[dict]:
+    """Compare two runs case by case.
+    
+    A case regresses when its median time grows by more than `threshold`
+    (and by more than NOISE_SECONDS), when it issues more statements, or,
+    if both runs measured memory, when its peak memory grows by more than
+    `threshold` (and by more than NOISE_BYTES).
+    """
+    def key(result):
+        return result.get('profile'), result['size'], result['case']
+    
+    before = {key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        slower = (ratio > 1 + threshold
+                  and result['seconds'] - old['seconds'] > NOISE_SECONDS)
+        old_peak, new_peak = old.get('peak_bytes'), result.get('peak_bytes')
+        larger = (old_peak is not None and new_peak is not None
+                  and new_peak > old_peak * (1 + threshold)
+                  and new_peak - old_peak > NOISE_BYTES)
+        rows.append({
+            'profile': result.get('profile'),
+            'size': result['size'],
+            'case': result['case'],
+            'old_seconds': old['seconds'],
+            'new_seconds': result['seconds'],
+            'ratio': ratio,
+            'old_statements': old['statements'],
+            'new_statements': result['statements'],
+            'old_peak_bytes': old_peak,
+            'new_peak_bytes': new_peak,
+            'regression': slower or larger or result['statements'] > old['statements'],
+        })
+    return rows
+
+
+def print_comparison(rows: List[dict]):
+    print(f"{'profile':<12} {'catalog':>8}  {'function':<34} {'old s':>9} {'new s':>9} "
+          f"{'ratio':>6} {'queries':>9} {'peak KiB':>15}")
+    for row in rows:
+        queries = f"{row['old_statements']}→{row['new_statements']}"
+        peak = f"{format_kib(row['old_peak_bytes'])}→{format_kib(row['new_peak_bytes'])}"
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['profile'] or '-':<12} {row['size']:>8}  {row['case']:<34} {row['old_seconds']:>9.4f} "
+              f"{row['new_seconds']:>9.4f} {row['ratio']:>6.2f} {queries:>9} {peak:>15}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) in {len(rows)} case(s)")
+
+
+def print_profile_summary(report: dict):
+    """Print the seconds of every case side by side for each storage profile."""
+    profiles = list(dict.fromkeys(r['profile'] for r in report['results']))
+    seconds = {(r['profile'], r['size'], r['case']): r['seconds'] for r in report['results']}
+    cases = list(dict.fromkeys((r['size'], r['case']) for r in report['results']))
+    print()
+    print(f"{'catalog':>8}  {'function':<34} " + " ".join(f"{p:>12}" for p in profiles))
+    for size, case in cases:
+        values = [seconds.get((profile, size, case)) for profile in profiles]
+        print(f"{size:>8}  {case:<34} " + " ".join(
+            f"{value:>12.4f}" if value is not None else f"{'-':>12}" for value in values))
+
+
+def load_report(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    defaults = CatalogSpec()
+    parser = argparse.ArgumentParser(description="Benchmark the library data layer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="catalog sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per case; the median time is reported")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="catalog generator seed")
+    parser.add_argument("--profiles", nargs="+", choices=list(database.STORAGE_PROFILES),
+                        help="storage profiles to compare (default: the current one)")
+    parser.add_argument("--memory", action="store_true",
+                        help="also measure peak and retained memory of read cases with tracemalloc")
+    parser.add_argument("--output", help="save the results to a JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="compare two saved runs instead of benchmarking")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+    
+    if args.compare:
+        rows = compare(load_report(args.compare[0]), load_report(args.compare[1]), args.threshold)
+        print_comparison(rows)
+        sys.exit(1 if any(row['regression'] for row in rows) else 0)
+    
+    report = run(args.sizes, args.repeat, CatalogSpec(seed=args.seed), args.profiles, args.memory)
+    if args.profiles and len(args.profiles) > 1:
+        print_profile_summary(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
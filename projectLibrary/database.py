@@ -4,25 +4,702 @@ Handles SQLite connection and table initialization.
 """
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Number of prepared statements each connection keeps compiled.
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+_generation = 0
+_rollback_hooks = []
+_connection_hooks = []
+
+# Connection PRAGMAs of each storage profile. The WAL profiles let readers
+# run while a writer is busy; they differ in memory use and checkpointing.
+STORAGE_PROFILES = {
+    # Desktop use: the background checkpointer keeps the log short, so
+    # commits rarely reach the automatic checkpoint
+    'interactive': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 10000,
+    },
+    # Imports: a large cache and rare, large checkpoints
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -256000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+        'wal_autocheckpoint': 20000,
+    },
+    # Browsing and reports: the whole file mapped into memory
+    'read-mostly': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 1024 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'wal_autocheckpoint': 1000,
+    },
+    # SQLite defaults with a rollback journal, for network file systems
+    # where WAL's shared memory index does not work
+    'compatible': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+}
+
+DEFAULT_PROFILE = 'interactive'
+
+# Seconds between background WAL checkpoints
+CHECKPOINT_INTERVAL = 30.0
+# WAL size, in pages, above which a fully checkpointed log is truncated
+CHECKPOINT_TRUNCATE_PAGES = 4096
+
+_profile = os.environ.get("LIBRARY_PROFILE") or DEFAULT_PROFILE
+_checkpoint_stop = threading.Event()
+_checkpoint_thread = None
+
+# Seconds between background flushes of the in-memory replica to disk
+FLUSH_INTERVAL = 5.0
+# Busy timeout of replica connections when the profile sets none, in milliseconds
+REPLICA_BUSY_TIMEOUT_MS = 5000
+
+# In-memory replica state, see enable_replica()
+_replica_uri = None
+_replica_anchor = None
+_replica_lock = threading.RLock()
+_replica_stop = threading.Event()
+_replica_thread = None
+_dirty_since = None
+
+# Tables whose writes are counted in table_generations (migration 3)
+TRACKED_TABLES = ('publication_types', 'genres', 'authors', 'storage_locations',
+                  'publications', 'publication_authors', 'publication_genres')
+
+
+def _generation_triggers(table: str) -> str:
+    """DDL that registers a table in table_generations and bumps its
+    counter after every insert, update and delete."""
+    sql = f"""
+    INSERT INTO table_generations (name) VALUES ('{table}');
+    """
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        sql += f"""
+    CREATE TRIGGER {table}_generation_{event.lower()} AFTER {event} ON {table} BEGIN
+        UPDATE table_generations SET generation = generation + 1 WHERE name = '{table}';
+    END;
+    """
+    return sql
+
+
+def _authors_text(publication_id: str) -> str:
+    """SQL expression for the comma-separated author names of a publication."""
+    return f"""(SELECT group_concat(name, ', ') FROM (
+            SELECT a.name FROM publication_authors pa JOIN authors a ON a.id = pa.author_id
+            WHERE pa.publication_id = {publication_id} ORDER BY a.name))"""
+
+
+def _genres_text(publication_id: str) -> str:
+    """SQL expression for the comma-separated genre names of a publication."""
+    return f"""(SELECT group_concat(name, ', ') FROM (
+            SELECT g.name FROM publication_genres pg JOIN genres g ON g.id = pg.genre_id
+            WHERE pg.publication_id = {publication_id} ORDER BY g.name))"""
+
+
+def _type_name(type_id: str) -> str:
+    """SQL expression for the name of a publication type."""
+    return f"(SELECT name FROM publication_types WHERE id = {type_id})"
+
+
+def _location_text(location_id: str) -> str:
+    """SQL expression for a storage location label, as StorageLocation.__str__."""
+    return (f"(SELECT 'Шафа: ' || cabinet || ', Полиця: ' || shelf "
+            f"FROM storage_locations WHERE id = {location_id})")
+
+
+# Numbered schema migrations applied on top of the base tables.
+# Applying migration N sets PRAGMA user_version to N.
+MIGRATIONS = [
+    # 1: secondary indexes for author/genre filters, ordering and cascades
+    """
+    CREATE INDEX IF NOT EXISTS idx_publication_authors_author ON publication_authors(author_id);
+    CREATE INDEX IF NOT EXISTS idx_publication_genres_genre ON publication_genres(genre_id);
+    CREATE INDEX IF NOT EXISTS idx_publications_title ON publications(title);
+    CREATE INDEX IF NOT EXISTS idx_publications_year ON publications(year);
+    CREATE INDEX IF NOT EXISTS idx_publications_type ON publications(publication_type_id);
+    CREATE INDEX IF NOT EXISTS idx_publications_location ON publications(storage_location_id);
+    """,
+    # 2: full-text index over titles, author names and genre names.
+    # rowid is the publication id; remove_diacritics 0 keeps й/и and ї/і distinct.
+    """
+    CREATE VIRTUAL TABLE publication_search USING fts5(
+        title, authors, genres,
+        tokenize = 'unicode61 remove_diacritics 0'
+    );
+    
+    INSERT INTO publication_search (rowid, title, authors, genres)
+    SELECT p.id, p.title,
+           (SELECT group_concat(a.name, ' ') FROM publication_authors pa
+            JOIN authors a ON a.id = pa.author_id WHERE pa.publication_id = p.id),
+           (SELECT group_concat(g.name, ' ') FROM publication_genres pg
+            JOIN genres g ON g.id = pg.genre_id WHERE pg.publication_id = p.id)
+    FROM publications p;
+    
+    CREATE TRIGGER publication_search_insert AFTER INSERT ON publications BEGIN
+        INSERT INTO publication_search (rowid, title) VALUES (NEW.id, NEW.title);
+    END;
+    
+    CREATE TRIGGER publication_search_update AFTER UPDATE OF title ON publications BEGIN
+        UPDATE publication_search SET title = NEW.title WHERE rowid = NEW.id;
+    END;
+    
+    CREATE TRIGGER publication_search_delete AFTER DELETE ON publications BEGIN
+        DELETE FROM publication_search WHERE rowid = OLD.id;
+    END;
+    
+    CREATE TRIGGER publication_search_link_author AFTER INSERT ON publication_authors BEGIN
+        UPDATE publication_search SET authors = (
+            SELECT group_concat(a.name, ' ') FROM publication_authors pa
+            JOIN authors a ON a.id = pa.author_id WHERE pa.publication_id = NEW.publication_id
+        ) WHERE rowid = NEW.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_search_unlink_author AFTER DELETE ON publication_authors BEGIN
+        UPDATE publication_search SET authors = (
+            SELECT group_concat(a.name, ' ') FROM publication_authors pa
+            JOIN authors a ON a.id = pa.author_id WHERE pa.publication_id = OLD.publication_id
+        ) WHERE rowid = OLD.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_search_link_genre AFTER INSERT ON publication_genres BEGIN
+        UPDATE publication_search SET genres = (
+            SELECT group_concat(g.name, ' ') FROM publication_genres pg
+            JOIN genres g ON g.id = pg.genre_id WHERE pg.publication_id = NEW.publication_id
+        ) WHERE rowid = NEW.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_search_unlink_genre AFTER DELETE ON publication_genres BEGIN
+        UPDATE publication_search SET genres = (
+            SELECT group_concat(g.name, ' ') FROM publication_genres pg
+            JOIN genres g ON g.id = pg.genre_id WHERE pg.publication_id = OLD.publication_id
+        ) WHERE rowid = OLD.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_search_rename_author AFTER UPDATE OF name ON authors BEGIN
+        UPDATE publication_search SET authors = (
+            SELECT group_concat(a.name, ' ') FROM publication_authors pa
+            JOIN authors a ON a.id = pa.author_id WHERE pa.publication_id = publication_search.rowid
+        ) WHERE rowid IN (SELECT publication_id FROM publication_authors WHERE author_id = NEW.id);
+    END;
+    
+    CREATE TRIGGER publication_search_rename_genre AFTER UPDATE OF name ON genres BEGIN
+        UPDATE publication_search SET genres = (
+            SELECT group_concat(g.name, ' ') FROM publication_genres pg
+            JOIN genres g ON g.id = pg.genre_id WHERE pg.publication_id = publication_search.rowid
+        ) WHERE rowid IN (SELECT publication_id FROM publication_genres WHERE genre_id = NEW.id);
+    END;
+    """,
+    # 3: per-table change counters, bumped by triggers on every write,
+    # so views can tell whether their data changed since they were loaded
+    """
+    CREATE TABLE table_generations (
+        name TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+    """ + "".join(_generation_triggers(table) for table in TRACKED_TABLES),
+    # 4: display rows of publications with author, genre, type and location
+    # names already joined, kept current by triggers on every source table;
+    # deleted types and locations reach it through ON DELETE SET NULL
+    f"""
+    CREATE TABLE publication_summary (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        publication_kind TEXT NOT NULL,
+        year INTEGER,
+        authors_text TEXT,
+        genres_text TEXT,
+        type_name TEXT,
+        location_text TEXT
+    );
+    
+    INSERT INTO publication_summary
+    SELECT p.id, p.title, p.publication_kind, p.year,
+           {_authors_text('p.id')},
+           {_genres_text('p.id')},
+           {_type_name('p.publication_type_id')},
+           {_location_text('p.storage_location_id')}
+    FROM publications p;
+    
+    CREATE INDEX idx_publication_summary_title ON publication_summary(title, id);
+    
+    CREATE TRIGGER publication_summary_insert AFTER INSERT ON publications BEGIN
+        INSERT INTO publication_summary (id, title, publication_kind, year, type_name, location_text)
+        VALUES (NEW.id, NEW.title, NEW.publication_kind, NEW.year,
+                {_type_name('NEW.publication_type_id')},
+                {_location_text('NEW.storage_location_id')});
+    END;
+    
+    CREATE TRIGGER publication_summary_update AFTER UPDATE ON publications BEGIN
+        UPDATE publication_summary SET
+            title = NEW.title,
+            publication_kind = NEW.publication_kind,
+            year = NEW.year,
+            type_name = {_type_name('NEW.publication_type_id')},
+            location_text = {_location_text('NEW.storage_location_id')}
+        WHERE id = NEW.id;
+    END;
+    
+    CREATE TRIGGER publication_summary_delete AFTER DELETE ON publications BEGIN
+        DELETE FROM publication_summary WHERE id = OLD.id;
+    END;
+    
+    CREATE TRIGGER publication_summary_link_author AFTER INSERT ON publication_authors BEGIN
+        UPDATE publication_summary SET authors_text = {_authors_text('NEW.publication_id')}
+        WHERE id = NEW.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_summary_unlink_author AFTER DELETE ON publication_authors BEGIN
+        UPDATE publication_summary SET authors_text = {_authors_text('OLD.publication_id')}
+        WHERE id = OLD.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_summary_relink_author AFTER UPDATE ON publication_authors BEGIN
+        UPDATE publication_summary SET authors_text = {_authors_text('publication_summary.id')}
+        WHERE id IN (OLD.publication_id, NEW.publication_id);
+    END;
+    
+    CREATE TRIGGER publication_summary_link_genre AFTER INSERT ON publication_genres BEGIN
+        UPDATE publication_summary SET genres_text = {_genres_text('NEW.publication_id')}
+        WHERE id = NEW.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_summary_unlink_genre AFTER DELETE ON publication_genres BEGIN
+        UPDATE publication_summary SET genres_text = {_genres_text('OLD.publication_id')}
+        WHERE id = OLD.publication_id;
+    END;
+    
+    CREATE TRIGGER publication_summary_relink_genre AFTER UPDATE ON publication_genres BEGIN
+        UPDATE publication_summary SET genres_text = {_genres_text('publication_summary.id')}
+        WHERE id IN (OLD.publication_id, NEW.publication_id);
+    END;
+    
+    CREATE TRIGGER publication_summary_rename_author AFTER UPDATE OF name ON authors BEGIN
+        UPDATE publication_summary SET authors_text = {_authors_text('publication_summary.id')}
+        WHERE id IN (SELECT publication_id FROM publication_authors WHERE author_id = NEW.id);
+    END;
+    
+    CREATE TRIGGER publication_summary_rename_genre AFTER UPDATE OF name ON genres BEGIN
+        UPDATE publication_summary SET genres_text = {_genres_text('publication_summary.id')}
+        WHERE id IN (SELECT publication_id FROM publication_genres WHERE genre_id = NEW.id);
+    END;
+    
+    CREATE TRIGGER publication_summary_rename_type AFTER UPDATE OF name ON publication_types BEGIN
+        UPDATE publication_summary SET type_name = NEW.name
+        WHERE id IN (SELECT id FROM publications WHERE publication_type_id = NEW.id);
+    END;
+    
+    CREATE TRIGGER publication_summary_move_location AFTER UPDATE OF cabinet, shelf ON storage_locations BEGIN
+        UPDATE publication_summary SET location_text = {_location_text('NEW.id')}
+        WHERE id IN (SELECT id FROM publications WHERE storage_location_id = NEW.id);
+    END;
+    """,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
 
 
 def get_db_path() -> str:
-    """Get the path to the database file."""
-    return str(Path(__file__).parent / "library.db")
+    """Get the path to the database file.
+    
+    The LIBRARY_DB environment variable overrides the default location,
+    which lets scripts and benchmarks work on a scratch database.
+    """
+    return os.environ.get("LIBRARY_DB") or str(Path(__file__).parent / "library.db")
 
 
-def get_connection() -> sqlite3.Connection:
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(get_db_path())
+def open_connection() -> sqlite3.Connection:
+    """Open a new database connection with row factory.
+    
+    In replica mode the connection is to the in-memory copy; otherwise
+    the PRAGMAs of the storage profile are applied.
+    """
+    if _replica_uri:
+        conn = sqlite3.connect(_replica_uri, uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False)
+        # Readers wait out a committing writer, as with a database file
+        busy_timeout = STORAGE_PROFILES[_profile].get('busy_timeout', REPLICA_BUSY_TIMEOUT_MS)
+        conn.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+    else:
+        conn = sqlite3.connect(get_db_path(), cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False)
+        apply_storage_profile(conn)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
 
+def get_connection() -> sqlite3.Connection:
+    """Get the long-lived connection of the current thread.
+    
+    The connection is opened on first use and kept until
+    close_connections() is called. Callers must not close it.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _generation:
+        conn = open_connection()
+        with _connections_lock:
+            _connections.append(conn)
+            _local.generation = _generation
+        _local.conn = conn
+        _local.depth = 0
+        _local.transactions = 0
+        _local.generations = None
+        for hook in _connection_hooks:
+            hook(conn)
+    return conn
+
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """Run a block of statements in one transaction on the thread's connection.
+    
+    Nested blocks join the outermost transaction, so several model calls
+    wrapped in one `with transaction():` are committed or rolled back
+    together. With immediate=True the outermost block takes the write
+    lock up front (BEGIN IMMEDIATE), so a busy database fails right away
+    instead of at the first write.
+    """
+    conn = get_connection()
+    depth = _local.depth
+    # Writers and the flush to disk take turns on the replica
+    locked = depth == 0 and _replica_uri is not None
+    if locked:
+        _replica_lock.acquire()
+    _local.depth = depth + 1
+    try:
+        if immediate and depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+    except BaseException:
+        _local.depth = depth
+        if depth == 0:
+            try:
+                conn.rollback()
+            finally:
+                _local.transactions += 1
+                if locked:
+                    _replica_lock.release()
+            run_rollback_hooks()
+        raise
+    _local.depth = depth
+    if depth == 0:
+        try:
+            conn.commit()
+        except BaseException:
+            # A failed COMMIT (SQLITE_BUSY) leaves the transaction open, and
+            # the next BEGIN on this connection would fail
+            if conn.in_transaction:
+                conn.rollback()
+            run_rollback_hooks()
+            raise
+        finally:
+            _local.transactions += 1
+            if locked:
+                _mark_dirty()
+                _replica_lock.release()
+
+
+def add_rollback_hook(func):
+    """Register a function to call after a transaction() block rolls back.
+    
+    Used by in-memory caches that may have seen uncommitted data.
+    """
+    _rollback_hooks.append(func)
+
+
+def run_rollback_hooks():
+    """Call the rollback hooks; for code that rolls back to a savepoint."""
+    for hook in _rollback_hooks:
+        hook()
+
+
+def in_transaction() -> bool:
+    """Check whether this thread is inside a transaction() block."""
+    return getattr(_local, "depth", 0) > 0
+
+
+def add_connection_hook(func):
+    """Register a function to call with each new connection from get_connection().
+    
+    Used by instrumentation to install its trace callback.
+    """
+    _connection_hooks.append(func)
+
+
+def get_table_generations() -> Dict[str, int]:
+    """Get the change counter of every tracked table.
+    
+    The counters are read again only when a transaction() block on this
+    thread has ended or PRAGMA data_version reports a commit by another
+    connection, including one in another process. Otherwise the copy
+    cached for this thread is returned.
+    """
+    conn = get_connection()
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    key = (data_version, _local.transactions)
+    cached = _local.generations
+    if cached is None or cached[0] != key or conn.in_transaction:
+        generations = {row[0]: row[1] for row in
+                       conn.execute("SELECT name, generation FROM table_generations")}
+        cached = _local.generations = (key, generations)
+    return dict(cached[1])
+
+
+def get_generation(tables) -> Tuple[int, ...]:
+    """Get the change counters of some tables; compare two results to see
+    whether any of the tables was written in between."""
+    generations = get_table_generations()
+    return tuple(generations.get(table, 0) for table in tables)
+
+
+def close_connections():
+    """Close every connection opened by get_connection(). Call on shutdown.
+    
+    Threads that use the database afterwards get a fresh connection.
+    """
+    global _generation
+    with _connections_lock:
+        connections = list(_connections)
+        _connections.clear()
+        _generation += 1
+    for conn in connections:
+        conn.close()
+
+
+# ============== Storage Profiles ==============
+
+def set_storage_profile(name: str):
+    """Select the storage profile used by connections opened from now on.
+    
+    Existing connections are closed, so every thread picks it up.
+    """
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile: {name} (expected {', '.join(STORAGE_PROFILES)})")
+    global _profile
+    _profile = name
+    close_connections()
+
+
+def get_storage_profile() -> str:
+    return _profile
+
+
+def apply_storage_profile(conn: sqlite3.Connection, name: str = None):
+    """Apply the PRAGMAs of a storage profile (default: the selected one)."""
+    pragmas = STORAGE_PROFILES.get(name or _profile)
+    if pragmas is None:
+        raise ValueError(f"Unknown storage profile: {name or _profile}")
+    for pragma, value in pragmas.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+def checkpoint(mode: str = 'PASSIVE') -> Tuple[int, int, int]:
+    """Checkpoint the WAL on a short-lived connection.
+    
+    Returns (busy, log pages, checkpointed pages) as reported by SQLite.
+    """
+    conn = sqlite3.connect(get_db_path(), timeout=0)
+    try:
+        return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+    finally:
+        conn.close()
+
+
+def _checkpoint_loop(interval: float):
+    """Background thread: passive checkpoints, truncating a large log once
+    every frame in it has been copied back."""
+    while not _checkpoint_stop.wait(interval):
+        try:
+            busy, log_pages, done_pages = checkpoint('PASSIVE')
+            if not busy and log_pages > CHECKPOINT_TRUNCATE_PAGES and done_pages == log_pages:
+                checkpoint('TRUNCATE')
+        except sqlite3.Error:
+            # Locked by a writer; try again on the next tick
+            pass
+
+
+def start_checkpointer(interval: float = CHECKPOINT_INTERVAL):
+    """Start the background WAL checkpoint thread."""
+    global _checkpoint_thread
+    if _checkpoint_thread is not None:
+        return
+    _checkpoint_stop.clear()
+    _checkpoint_thread = threading.Thread(target=_checkpoint_loop, args=(interval,),
+                                          name="wal-checkpoint", daemon=True)
+    _checkpoint_thread.start()
+
+
+def stop_checkpointer():
+    """Stop the checkpoint thread and fold the WAL into the database file."""
+    global _checkpoint_thread
+    if _checkpoint_thread is None:
+        return
+    _checkpoint_stop.set()
+    _checkpoint_thread.join()
+    _checkpoint_thread = None
+    try:
+        checkpoint('TRUNCATE')
+    except sqlite3.Error:
+        pass
+
+
+# ============== In-Memory Replica ==============
+
+def enable_replica(flush_interval: float = FLUSH_INTERVAL):
+    """Serve all reads and writes from an in-memory copy of the database.
+    
+    The database file is copied with the backup API into a memory database
+    of the memdb VFS (SQLite 3.36+), which every connection of the process
+    opens by name. Unlike a shared-cache memory database it keeps the usual
+    file locking, so readers never see uncommitted writes. Committed writes
+    are copied back to the file by a background thread every flush_interval
+    seconds and by close_replica(). Writes by other processes are not seen and are overwritten by the next
+    flush, so use this mode only with a single application instance.
+    """
+    global _replica_uri, _replica_anchor, _replica_thread
+    if _replica_uri:
+        return
+    uri = f"file:/library-replica-{os.getpid()}?vfs=memdb"
+    # The memory database lives as long as at least one connection is open
+    anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    close_connections()
+    disk = sqlite3.connect(get_db_path())
+    try:
+        # A copied WAL header would make memdb look for a WAL file, so the
+        # file is switched to a rollback journal for as long as the replica
+        # runs; the next normal start applies the storage profile again
+        disk.execute("PRAGMA journal_mode = DELETE")
+        disk.backup(anchor)
+    finally:
+        disk.close()
+    
+    # Connections opened from now on use the replica
+    _replica_anchor = anchor
+    _replica_uri = uri
+    _replica_stop.clear()
+    _replica_thread = threading.Thread(target=_flush_loop, args=(flush_interval,),
+                                       name="replica-flush", daemon=True)
+    _replica_thread.start()
+
+
+def replica_enabled() -> bool:
+    return _replica_uri is not None
+
+
+def _mark_dirty():
+    global _dirty_since
+    if _dirty_since is None:
+        _dirty_since = time.monotonic()
+
+
+def _flush_loop(interval: float):
+    """Background thread that copies the replica to disk while it is running."""
+    while not _replica_stop.wait(interval):
+        try:
+            flush_replica()
+        except sqlite3.Error:
+            # The file may be locked by a backup tool; retry on the next tick
+            pass
+
+
+def flush_replica() -> bool:
+    """Copy the replica to the database file if it has unsaved commits.
+    
+    Returns True if anything was written.
+    """
+    global _dirty_since
+    with _replica_lock:
+        if _replica_anchor is None or _dirty_since is None:
+            return False
+        disk = sqlite3.connect(get_db_path())
+        try:
+            _replica_anchor.backup(disk)
+        finally:
+            disk.close()
+        _dirty_since = None
+    return True
+
+
+def get_flush_lag() -> Optional[float]:
+    """Seconds since the oldest commit not yet flushed to disk.
+    
+    0 when the file is up to date, None when replica mode is off.
+    """
+    if _replica_uri is None:
+        return None
+    dirty_since = _dirty_since
+    return time.monotonic() - dirty_since if dirty_since is not None else 0.0
+
+
+def close_replica():
+    """Stop the flush thread, write pending commits to disk and drop the replica.
+    
+    Call on shutdown after background database work has stopped.
+    """
+    global _replica_uri, _replica_anchor, _replica_thread
+    if _replica_uri is None:
+        return
+    _replica_stop.set()
+    _replica_thread.join()
+    flush_replica()
+    close_connections()
+    _replica_anchor.close()
+    _replica_anchor = None
+    _replica_uri = None
+    _replica_thread = None
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Get the number of the last migration applied to the database."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection):
+    """Apply pending migrations in order, each in its own transaction."""
+    for number in range(get_schema_version(conn) + 1, SCHEMA_VERSION + 1):
+        try:
+            conn.executescript(
+                f"BEGIN;\n{MIGRATIONS[number - 1]}\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+
 def init_database():
-    """Initialize the database with all required tables."""
+    """Initialize the database with all required tables and migrations.
+    
+    When the schema is already current no DDL is executed at all.
+    """
     conn = get_connection()
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return
+    
     cursor = conn.cursor()
     
     # Publication Types table (Науково-технічне, Підручник, Художня література)
@@ -108,7 +785,7 @@ def init_database():
         )
     
     conn.commit()
-    conn.close()
+    apply_migrations(conn)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""
+Synthetic catalog generator for Home Library application.
+Fills a database with a deterministic catalog for benchmarks and testing.
+
+The same counts and seed always produce the same rows.
+
+Usage:
+    python datagen.py scratch.db --publications 100000 [--authors 2000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Tuple
+
+# Add the project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import models
+
+TITLE_WORDS = [
+    "Історія", "України", "Мова", "Поезія", "Море", "Ліс", "Місто", "Зорі",
+    "Сонце", "Подорож", "Пригоди", "Наука", "Фізика", "Хімія", "Математика",
+    "Весна", "Зима", "Легенди", "Казки", "Роман", "Світ", "Дорога", "Степ",
+    "Кобзар", "Думи", "Серце", "Час", "Вогонь", "Вода", "Земля",
+]
+
+FIRST_NAMES = [
+    "Іван", "Леся", "Тарас", "Ольга", "Михайло", "Марія", "Василь", "Ліна",
+    "Григорій", "Оксана", "Павло", "Ірина", "Микола", "Софія", "Андрій", "Наталя",
+]
+
+LAST_NAMES = [
+    "Франко", "Українка", "Шевченко", "Кобилянська", "Коцюбинський", "Вовчок",
+    "Стефаник", "Костенко", "Сковорода", "Забужко", "Тичина", "Рильський",
+    "Хвильовий", "Жадан", "Стус", "Симоненко",
+]
+
+PERIODICAL_SHARE = 0.25
+YEARS = (1900, 2025)
+SHELVES_PER_CABINET = 8
+
+
+@dataclass
+class CatalogSpec:
+    """Sizes of a synthetic catalog.
+    
+    The *_per_publication ranges give the inclusive number of distinct
+    authors and genres linked to each publication.
+    """
+    publications: int = 10000
+    authors: int = 2000
+    genres: int = 50
+    locations: int = 40
+    authors_per_publication: Tuple[int, int] = (1, 3)
+    genres_per_publication: Tuple[int, int] = (1, 2)
+    seed: int = 0
+
+
+def author_name(index: int) -> str:
+    """Unique author name for an index."""
+    first = FIRST_NAMES[index % len(FIRST_NAMES)]
+    last = LAST_NAMES[index // len(FIRST_NAMES) % len(LAST_NAMES)]
+    return f"{first} {last} {index:05d}"
+
+
+def _insert_ids(conn, table: str, sql: str, rows: list) -> list:
+    """Insert reference rows and return their ids in order."""
+    first = conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+    conn.executemany(sql, rows)
+    return list(range(first, first + len(rows)))
+
+
+def populate(spec: CatalogSpec):
+    """Fill the current database with the catalog described by spec.
+    
+    Meant for an empty scratch database; rows are added after any that
+    already exist.
+    """
+    rng = random.Random(spec.seed)
+    low_authors, high_authors = spec.authors_per_publication
+    low_genres, high_genres = spec.genres_per_publication
+    
+    with database.transaction() as conn:
+        author_ids = _insert_ids(conn, "authors", "INSERT INTO authors (name) VALUES (?)",
+                                 [(author_name(i),) for i in range(spec.authors)])
+        genre_ids = _insert_ids(conn, "genres", "INSERT INTO genres (name) VALUES (?)",
+                                [(f"Жанр {i:03d}",) for i in range(spec.genres)])
+        location_ids = _insert_ids(
+            conn, "storage_locations", "INSERT INTO storage_locations (cabinet, shelf) VALUES (?, ?)",
+            [(f"Шафа {i // SHELVES_PER_CABINET + 1}", f"{i % SHELVES_PER_CABINET + 1}")
+             for i in range(spec.locations)]
+        )
+        type_ids = [row['id'] for row in conn.execute("SELECT id FROM publication_types ORDER BY id")]
+        
+        first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM publications").fetchone()[0]
+        publications = []
+        author_links = []
+        genre_links = []
+        for pub_id in range(first_id, first_id + spec.publications):
+            publications.append((
+                pub_id,
+                " ".join(rng.sample(TITLE_WORDS, 3)) + f" {rng.randrange(1000)}",
+                'periodical' if rng.random() < PERIODICAL_SHARE else 'book',
+                rng.randint(*YEARS),
+                rng.choice(type_ids) if type_ids else None,
+                rng.choice(location_ids) if location_ids else None,
+            ))
+            count = min(rng.randint(low_authors, high_authors), len(author_ids))
+            author_links.extend((pub_id, author_id) for author_id in rng.sample(author_ids, count))
+            count = min(rng.randint(low_genres, high_genres), len(genre_ids))
+            genre_links.extend((pub_id, genre_id) for genre_id in rng.sample(genre_ids, count))
+        
+        conn.executemany("""
+            INSERT INTO publications (id, title, publication_kind, year, publication_type_id, storage_location_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, publications)
+        conn.executemany("INSERT INTO publication_authors (publication_id, author_id) VALUES (?, ?)",
+                         author_links)
+        conn.executemany("INSERT INTO publication_genres (publication_id, genre_id) VALUES (?, ?)",
+                         genre_links)
+    
+    # Reference rows were written past the models layer
+    models.invalidate_reference_cache()
+
+
+def populate_catalog(publications: int, authors: int = 2000, genres: int = 50,
+                     locations: int = 40, seed: int = 0):
+    """Fill the current database with a deterministic synthetic catalog."""
+    populate(CatalogSpec(publications=publications, authors=authors, genres=genres,
+                         locations=locations, seed=seed))
+
+
+def _range(text: str) -> Tuple[int, int]:
+    """Parse 'N' or 'LOW-HIGH' into an inclusive range."""
+    low, _, high = text.partition('-')
+    return int(low), int(high or low)
+
+
+def main():
+    defaults = CatalogSpec()
+    parser = argparse.ArgumentParser(description="Fill a database with a synthetic catalog.")
+    parser.add_argument("path", help="database file to create or extend")
+    parser.add_argument("--publications", type=int, default=defaults.publications)
+    parser.add_argument("--authors", type=int, default=defaults.authors)
+    parser.add_argument("--genres", type=int, default=defaults.genres)
+    parser.add_argument("--locations", type=int, default=defaults.locations)
+    parser.add_argument("--authors-per-publication", type=_range, default=defaults.authors_per_publication,
+                        metavar="LOW-HIGH", help="authors linked to each publication")
+    parser.add_argument("--genres-per-publication", type=_range, default=defaults.genres_per_publication,
+                        metavar="LOW-HIGH", help="genres linked to each publication")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+    
+    os.environ["LIBRARY_DB"] = args.path
+    database.init_database()
+    spec = CatalogSpec(args.publications, args.authors, args.genres, args.locations,
+                       args.authors_per_publication, args.genres_per_publication, args.seed)
+    try:
+        populate(spec)
+    finally:
+        database.close_connections()
+    print(f"Generated {spec.publications} publications, {spec.authors} authors, "
+          f"{spec.genres} genres and {spec.locations} locations in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Catalog export for Home Library application.
+Streams publications to CSV, JSON Lines or XLSX without loading the catalog.
+
+The columns match the importer, so an exported file can be imported again.
+
+Usage:
+    python main.py export catalog.csv
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from database import get_connection
+from importer import FIELDS, LIST_SEPARATOR
+
+try:
+    import openpyxl
+    EXCEL_SUPPORT = True
+except ImportError:
+    EXCEL_SUPPORT = False
+
+EXPORT_FIELDS = ('id',) + FIELDS
+
+# Authors and genres are aggregated in SQL, ordered by name
+EXPORT_QUERY = f"""
+    SELECT p.id, p.title, p.publication_kind, p.year, pt.name, sl.cabinet, sl.shelf,
+           (SELECT group_concat(name, '{LIST_SEPARATOR}') FROM (
+                SELECT a.name FROM publication_authors pa
+                JOIN authors a ON a.id = pa.author_id
+                WHERE pa.publication_id = p.id ORDER BY a.name)),
+           (SELECT group_concat(name, '{LIST_SEPARATOR}') FROM (
+                SELECT g.name FROM publication_genres pg
+                JOIN genres g ON g.id = pg.genre_id
+                WHERE pg.publication_id = p.id ORDER BY g.name))
+    FROM publications p
+    LEFT JOIN publication_types pt ON p.publication_type_id = pt.id
+    LEFT JOIN storage_locations sl ON p.storage_location_id = sl.id
+    ORDER BY p.title, p.id
+"""
+
+# Rows fetched from the cursor at a time
+FETCH_SIZE = 1000
+
+
+def iter_publication_rows() -> Iterator[Tuple]:
+    """Yield one tuple per publication in EXPORT_FIELDS order.
+    
+    Rows are read from the cursor in chunks, so memory use does not grow
+    with the size of the catalog.
+    """
+    cursor = get_connection().execute(EXPORT_QUERY)
+    try:
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
+    finally:
+        cursor.close()
+
+
+# ============== Writers ==============
+
+def write_csv(rows, path: str) -> int:
+    """Write rows to a CSV file with a header row."""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(['' if value is None else value for value in row])
+            count += 1
+    return count
+
+
+def write_jsonl(rows, path: str) -> int:
+    """Write rows to a JSON Lines file; authors and genres become lists."""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            record = dict(zip(EXPORT_FIELDS, row))
+            for field in ('authors', 'genres'):
+                record[field] = record[field].split(LIST_SEPARATOR) if record[field] else []
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def write_xlsx(rows, path: str) -> int:
+    """Write rows to an XLSX file using openpyxl write-only mode."""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("openpyxl is not installed. Run: pip install openpyxl")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Publications")
+    sheet.append(EXPORT_FIELDS)
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    workbook.save(path)
+    return count
+
+
+WRITERS = {
+    '.csv': write_csv,
+    '.jsonl': write_jsonl,
+    '.xlsx': write_xlsx,
+}
+
+
+def export_catalog(path: str) -> int:
+    """Export all publications to a file, choosing the format by extension.
+    
+    Returns the number of exported publications.
+    """
+    writer = WRITERS.get(Path(path).suffix.lower())
+    if writer is None:
+        raise ValueError(f"Unsupported file type: {path} (expected {', '.join(WRITERS)})")
+    return writer(iter_publication_rows(), path)
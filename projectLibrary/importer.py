@@ -0,0 +1,347 @@
+"""
+Bulk catalog import for Home Library application.
+Streams publications from CSV, JSON Lines, JSON or XLSX files into the database.
+
+Each record has the fields title, kind, year, type, cabinet, shelf, authors
+and genres. Authors and genres are lists, or strings separated by ';'.
+Missing authors, genres, types and storage locations are created.
+
+Usage:
+    python main.py import catalog.csv [--errors rejected.csv] [--batch-size 10000]
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import database
+import models
+
+try:
+    import openpyxl
+    EXCEL_SUPPORT = True
+except ImportError:
+    EXCEL_SUPPORT = False
+
+FIELDS = ('title', 'kind', 'year', 'type', 'cabinet', 'shelf', 'authors', 'genres')
+
+# Separator of several authors or genres in one text field
+LIST_SEPARATOR = ';'
+
+# Records written per transaction
+BATCH_SIZE = 10000
+
+# Largest accepted year, in either direction; larger values are typos and
+# may not even fit an SQLite integer
+MAX_YEAR = 9999
+
+KIND_NAMES = {
+    'book': 'book',
+    'periodical': 'periodical',
+    'книга': 'book',
+    'періодика': 'periodical',
+    'періодичне видання': 'periodical',
+}
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    error_file: Optional[str] = None
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+# ============== Readers ==============
+
+def read_csv(path: str) -> Iterator[dict]:
+    """Stream records from a CSV file with a header row."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """Stream records from a JSON Lines file, one object per line."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_json(path: str) -> Iterator[dict]:
+    """Read records from a JSON array. The whole file is parsed at once;
+    use JSON Lines for large catalogs."""
+    with open(path, encoding='utf-8') as f:
+        yield from json.load(f)
+
+
+def read_xlsx(path: str) -> Iterator[dict]:
+    """Stream records from the first sheet of an XLSX file with a header row."""
+    if not EXCEL_SUPPORT:
+        raise RuntimeError("openpyxl is not installed. Run: pip install openpyxl")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else '' for name in next(rows, ())]
+        for row in rows:
+            if any(value is not None for value in row):
+                yield dict(zip(header, row))
+    finally:
+        workbook.close()
+
+
+READERS = {
+    '.csv': read_csv,
+    '.jsonl': read_jsonl,
+    '.json': read_json,
+    '.xlsx': read_xlsx,
+}
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Stream records from a file, choosing the reader by extension."""
+    reader = READERS.get(Path(path).suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported file type: {path} (expected {', '.join(READERS)})")
+    return reader(path)
+
+
+# ============== Parsing ==============
+
+def _text(value) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def _names(value) -> List[str]:
+    """Split a list field into unique non-empty names, keeping their order."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    return list(dict.fromkeys(name for name in map(_text, value) if name))
+
+
+def _year(value) -> Optional[int]:
+    """Parse a year field; spreadsheets may store whole years as 1999.0.
+    
+    Raises ValueError for anything that is not a whole number in range.
+    """
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        year = int(text)
+    except ValueError:
+        try:
+            number = float(text)
+        except ValueError:
+            number = None
+        # is_integer() is false for 1999.7, inf and nan
+        if number is None or not number.is_integer():
+            raise ValueError(f"invalid year: {text}")
+        year = int(number)
+    if abs(year) > MAX_YEAR:
+        raise ValueError(f"invalid year: {text}")
+    return year
+
+
+def parse_record(record: dict) -> Tuple:
+    """Validate a record and return (title, kind, year, type, location, authors, genres).
+    
+    Raises ValueError with the reason if the record cannot be imported.
+    """
+    title = _text(record.get('title'))
+    if not title:
+        raise ValueError("missing title")
+    
+    kind_text = _text(record.get('kind')).lower() or 'book'
+    kind = KIND_NAMES.get(kind_text)
+    if kind is None:
+        raise ValueError(f"unknown kind: {kind_text}")
+    
+    year = _year(record.get('year'))
+    
+    cabinet = _text(record.get('cabinet'))
+    shelf = _text(record.get('shelf'))
+    if bool(cabinet) != bool(shelf):
+        raise ValueError("cabinet and shelf must be given together")
+    location = (cabinet, shelf) if cabinet else None
+    
+    type_name = _text(record.get('type')) or None
+    return (title, kind, year, type_name, location,
+            _names(record.get('authors')), _names(record.get('genres')))
+
+
+# ============== Reference Data ==============
+
+class ReferenceMaps:
+    """In-memory name -> id maps for reference data, creating missing rows."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.authors = self._load("SELECT name, id FROM authors")
+        self.genres = self._load("SELECT name, id FROM genres")
+        self.types = self._load("SELECT name, id FROM publication_types")
+        self.locations = {(row['cabinet'], row['shelf']): row['id'] for row in
+                          conn.execute("SELECT cabinet, shelf, id FROM storage_locations")}
+    
+    def _load(self, sql: str) -> Dict[str, int]:
+        return {row[0]: row[1] for row in self.conn.execute(sql)}
+    
+    def _resolve(self, ids: dict, key, sql: str, params: tuple) -> int:
+        if key not in ids:
+            ids[key] = self.conn.execute(sql, params).lastrowid
+        return ids[key]
+    
+    def author(self, name: str) -> int:
+        return self._resolve(self.authors, name, "INSERT INTO authors (name) VALUES (?)", (name,))
+    
+    def genre(self, name: str) -> int:
+        return self._resolve(self.genres, name, "INSERT INTO genres (name) VALUES (?)", (name,))
+    
+    def publication_type(self, name: str) -> int:
+        return self._resolve(self.types, name,
+                             "INSERT INTO publication_types (name) VALUES (?)", (name,))
+    
+    def location(self, location: Tuple[str, str]) -> int:
+        return self._resolve(self.locations, location,
+                             "INSERT INTO storage_locations (cabinet, shelf) VALUES (?, ?)", location)
+
+
+# ============== Import ==============
+
+def _next_publication_id(conn) -> int:
+    """Get the id the next inserted publication would receive."""
+    row = conn.execute("""
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'publications'), 0),
+                   COALESCE((SELECT MAX(id) FROM publications), 0))
+    """).fetchone()
+    return row[0] + 1
+
+
+def _write_batch(conn, refs: ReferenceMaps, parsed: List[Tuple]):
+    """Insert a batch of parsed records in the current transaction.
+    
+    Ids are assigned up front, so publications and both junction tables
+    are each written with a single executemany.
+    """
+    next_id = _next_publication_id(conn)
+    publications = []
+    author_links = []
+    genre_links = []
+    for offset, (title, kind, year, type_name, location, authors, genres) in enumerate(parsed):
+        pub_id = next_id + offset
+        publications.append((
+            pub_id, title, kind, year,
+            refs.publication_type(type_name) if type_name else None,
+            refs.location(location) if location else None,
+        ))
+        author_links.extend((pub_id, refs.author(name)) for name in authors)
+        genre_links.extend((pub_id, refs.genre(name)) for name in genres)
+    
+    conn.executemany("""
+        INSERT INTO publications (id, title, publication_kind, year, publication_type_id, storage_location_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, publications)
+    conn.executemany("INSERT INTO publication_authors (publication_id, author_id) VALUES (?, ?)",
+                     author_links)
+    conn.executemany("INSERT INTO publication_genres (publication_id, genre_id) VALUES (?, ?)",
+                     genre_links)
+
+
+class _ErrorWriter:
+    """CSV file of rejected records, created on the first rejection."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.writer = None
+    
+    def write(self, record: dict, error: str):
+        if self.writer is None:
+            self.file = open(self.path, 'w', newline='', encoding='utf-8-sig')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(FIELDS + ('error',))
+        row = []
+        for field in FIELDS:
+            value = record.get(field) if isinstance(record, dict) else None
+            if isinstance(value, list):
+                value = LIST_SEPARATOR.join(map(str, value))
+            row.append('' if value is None else value)
+        self.writer.writerow(row + [error])
+    
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+def import_catalog(path: str, error_path: Optional[str] = None,
+                   batch_size: int = BATCH_SIZE, progress=None) -> ImportReport:
+    """Import publications from a file.
+    
+    Records that fail validation, or whose batch fails to insert, are
+    written to error_path (default: <file>.rejected.csv) with the reason.
+    progress(report) is called after each batch.
+    """
+    if error_path is None:
+        source = Path(path)
+        error_path = str(source.with_name(source.stem + '.rejected.csv'))
+    report = ImportReport()
+    errors = _ErrorWriter(error_path)
+    refs = None
+    start = time.perf_counter()
+    
+    def flush(records, parsed):
+        nonlocal refs
+        try:
+            # Take the write lock up front: ids are assigned from MAX(id),
+            # which must not change before the batch is inserted
+            with database.transaction(immediate=True) as conn:
+                if refs is None:
+                    refs = ReferenceMaps(conn)
+                _write_batch(conn, refs, parsed)
+            report.imported += len(parsed)
+        except Exception as e:
+            # The maps may hold ids of rows that were rolled back
+            refs = None
+            for record in records:
+                errors.write(record, f"batch failed: {e}")
+            report.rejected += len(records)
+        report.seconds = time.perf_counter() - start
+        if progress:
+            progress(report)
+    
+    records = []
+    parsed = []
+    try:
+        for record in read_records(path):
+            report.read += 1
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("record is not an object")
+                parsed.append(parse_record(record))
+                records.append(record)
+            except ValueError as e:
+                errors.write(record, str(e))
+                report.rejected += 1
+            if len(parsed) >= batch_size:
+                flush(records, parsed)
+                records, parsed = [], []
+        if parsed:
+            flush(records, parsed)
+    finally:
+        errors.close()
+        # New reference rows bypassed the models layer
+        models.invalidate_reference_cache()
+    
+    report.seconds = time.perf_counter() - start
+    if errors.writer is not None:
+        report.error_file = error_path
+    return report
@@ -0,0 +1,258 @@
+"""
+SQL instrumentation for Home Library application.
+Counts calls, statements and latency of the public models functions and
+keeps a log of slow statements with their query plans.
+
+Enabled by setting LIBRARY_INSTRUMENT=1. LIBRARY_SLOW_MS sets the slow
+statement threshold in milliseconds (default 50) and LIBRARY_SLOW_LOG
+names a file the slow statements are appended to.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import database
+from write_queue import queued_write
+
+# Upper bounds, in milliseconds, of the latency histogram buckets
+BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, float('inf'))
+
+# Slow statements kept in memory
+SLOW_LOG_SIZE = 200
+
+# Statement kinds that EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+@dataclass
+class FunctionStats:
+    calls: int = 0
+    statements: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * len(BUCKETS_MS))
+    
+    def record(self, seconds: float, statements: int):
+        self.calls += 1
+        self.statements += statements
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        milliseconds = seconds * 1000
+        for i, bound in enumerate(BUCKETS_MS):
+            if milliseconds <= bound:
+                self.histogram[i] += 1
+                break
+
+
+@dataclass
+class SlowQuery:
+    sql: str
+    seconds: float
+    function: str
+    plan: List[str] = None
+
+
+_enabled = False
+_lock = threading.Lock()
+_stats: Dict[str, FunctionStats] = {}
+_slow_queries = deque(maxlen=SLOW_LOG_SIZE)
+_local = threading.local()
+_slow_seconds = 0.05
+_slow_log_path = None
+
+
+def enabled_by_env() -> bool:
+    """Check whether LIBRARY_INSTRUMENT asks for instrumentation."""
+    return os.environ.get("LIBRARY_INSTRUMENT", "") not in ("", "0")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+# ============== Statement Tracing ==============
+
+def _frames() -> list:
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+        _local.current = None
+        _local.pending = []
+    return frames
+
+
+def _finish_statement():
+    """Close the timing of the statement started last on this thread.
+    
+    A statement is timed from its trace callback until the next statement
+    starts or the enclosing model call returns, which includes fetching
+    its rows.
+    """
+    current = _local.current
+    if current is None:
+        return
+    _local.current = None
+    sql, started, function = current
+    seconds = time.perf_counter() - started
+    if seconds >= _slow_seconds:
+        _local.pending.append(SlowQuery(sql=sql, seconds=seconds, function=function))
+
+
+def _on_statement(sql: str):
+    """Trace callback installed on every connection."""
+    # Trigger bodies and FTS5 shadow-table access are part of their statement
+    if sql.startswith("--") or "'main'." in sql:
+        return
+    frames = _frames()
+    # SQLite reports a statement again when it resumes after running triggers
+    if _local.current is not None and _local.current[0] == sql:
+        return
+    _finish_statement()
+    # Only statements issued inside a model call are counted and timed
+    if not frames:
+        return
+    for frame in frames:
+        frame[1] += 1
+    _local.current = (sql, time.perf_counter(), frames[-1][0])
+
+
+def _explain(conn, sql: str) -> List[str]:
+    """Get the query plan of a statement, one line per plan step."""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return []
+    conn.set_trace_callback(None)
+    try:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    except Exception as e:
+        return [f"(no plan: {e})"]
+    finally:
+        conn.set_trace_callback(_on_statement)
+
+
+def _log_slow_queries():
+    """Explain the slow statements of this thread and add them to the log."""
+    pending, _local.pending = _local.pending, []
+    if not pending:
+        return
+    conn = database.get_connection()
+    for query in pending:
+        query.plan = _explain(conn, query.sql)
+    with _lock:
+        _slow_queries.extend(pending)
+    if _slow_log_path:
+        with open(_slow_log_path, 'a', encoding='utf-8') as f:
+            for query in pending:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {query.seconds * 1000:.1f} ms "
+                        f"in {query.function}\n  {query.sql.strip()}\n")
+                for step in query.plan:
+                    f.write(f"    {step}\n")
+
+
+# ============== Function Wrapping ==============
+
+def _wrap(name: str, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        frames = _frames()
+        frame = [name, 0]
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _finish_statement()
+            seconds = time.perf_counter() - start
+            frames.pop()
+            with _lock:
+                _stats.setdefault(name, FunctionStats()).record(seconds, frame[1])
+            if not frames:
+                _log_slow_queries()
+    wrapper.__wrapped_by_instrumentation__ = True
+    return wrapper
+
+
+def instrument_module(module):
+    """Wrap the public functions defined in a module.
+    
+    Functions in the module call each other through the module globals,
+    so nested model calls are recorded as well. Queued writes run on the
+    writer thread, so the function inside the queued_write wrapper is
+    instrumented and its statements are counted on that thread.
+    """
+    for name, obj in list(vars(module).items()):
+        if (name.startswith('_') or not inspect.isfunction(obj)
+                or obj.__module__ != module.__name__
+                or getattr(obj, '__wrapped_by_instrumentation__', False)):
+            continue
+        if getattr(obj, '__queued_write__', False):
+            setattr(module, name, queued_write(_wrap(name, obj.__wrapped__)))
+        else:
+            setattr(module, name, _wrap(name, obj))
+
+
+def install(slow_ms: float = None, slow_log: str = None):
+    """Turn instrumentation on for the models module and new connections.
+    
+    Call before the first database connection is opened.
+    """
+    global _enabled, _slow_seconds, _slow_log_path
+    if _enabled:
+        return
+    import models
+    
+    if slow_ms is None:
+        slow_ms = float(os.environ.get("LIBRARY_SLOW_MS", 50))
+    _slow_seconds = slow_ms / 1000
+    _slow_log_path = slow_log or os.environ.get("LIBRARY_SLOW_LOG") or None
+    
+    database.add_connection_hook(lambda conn: conn.set_trace_callback(_on_statement))
+    instrument_module(models)
+    _enabled = True
+
+
+# ============== Reports ==============
+
+def get_stats() -> Dict[str, FunctionStats]:
+    """Get a snapshot of the per-function statistics."""
+    with _lock:
+        return {name: FunctionStats(stats.calls, stats.statements, stats.total_seconds,
+                                    stats.max_seconds, list(stats.histogram))
+                for name, stats in _stats.items()}
+
+
+def get_slow_queries() -> List[SlowQuery]:
+    """Get the logged slow statements, newest last."""
+    with _lock:
+        return list(_slow_queries)
+
+
+def reset():
+    """Clear the collected statistics and the slow-query log."""
+    with _lock:
+        _stats.clear()
+        _slow_queries.clear()
+
+
+def format_histogram(histogram: List[int]) -> str:
+    """Format histogram counts as '≤1ms:3 ≤5ms:1 ...', skipping empty buckets."""
+    parts = []
+    for bound, count in zip(BUCKETS_MS, histogram):
+        if count:
+            label = f"≤{bound:g}ms" if bound != float('inf') else ">1s"
+            parts.append(f"{label}:{count}")
+    return " ".join(parts)
+
+
+def report() -> str:
+    """Format the statistics as a text table."""
+    lines = [f"{'function':<34} {'calls':>7} {'stmts':>7} {'avg ms':>8} {'max ms':>8}  histogram"]
+    for name, stats in sorted(get_stats().items(), key=lambda item: -item[1].total_seconds):
+        average = stats.total_seconds / stats.calls * 1000 if stats.calls else 0
+        lines.append(f"{name:<34} {stats.calls:>7} {stats.statements:>7} {average:>8.1f} "
+                     f"{stats.max_seconds * 1000:>8.1f}  {format_histogram(stats.histogram)}")
+    return "\n".join(lines)
@@ -1,28 +1,168 @@
 """
 Home Library Application - Домашня Бібліотека
 Main entry point for the application.
+
+Usage:
+    python main.py                      start the application
+    python main.py import <file>        import publications from CSV/JSON/JSONL/XLSX
+    python main.py export <file>        export publications to CSV/JSONL/XLSX
+    python main.py --profile-startup    print startup timings
+    python main.py --memory             serve the database from memory
 """
+import time
+
+_started = time.perf_counter()
+
+import argparse
 import sys
 import os
 
 # Add the project root to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database import init_database
+from database import (init_database, close_connections, enable_replica, close_replica,
+                      set_storage_profile, start_checkpointer, stop_checkpointer, STORAGE_PROFILES)
 from ui.main_window import create_main_window
+from ui.tasks import shutdown_runner
+import importer
+import exporter
+import instrumentation
+import write_queue
+
+_imported = time.perf_counter()
+
+
+class StartupProfile:
+    """Durations of the startup phases, printed with --profile-startup."""
+    
+    def __init__(self):
+        self.phases = [("imports", _imported - _started)]
+        self.last = _imported
+    
+    def mark(self, phase):
+        """End a phase that started at the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def report(self):
+        print("Startup timings:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<16} {seconds * 1000:>8.1f} ms")
+        print(f"  {'total':<16} {(self.last - _started) * 1000:>8.1f} ms")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Home Library - Домашня Бібліотека")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import, database and first paint timings")
+    parser.add_argument("--storage-profile", choices=list(STORAGE_PROFILES),
+                        help="SQLite settings to use (default: interactive, "
+                             "bulk-load for import; also LIBRARY_PROFILE)")
+    parser.add_argument("--memory", action="store_true",
+                        default=os.environ.get("LIBRARY_REPLICA", "") not in ("", "0"),
+                        help="work on an in-memory copy of the database, saved to disk "
+                             "in the background (also LIBRARY_REPLICA=1)")
+    commands = parser.add_subparsers(dest="command")
+    
+    import_parser = commands.add_parser("import", help="import publications from a file")
+    import_parser.add_argument("path", help="CSV, JSON, JSON Lines or XLSX file")
+    import_parser.add_argument("--errors", help="file for rejected records "
+                                                "(default: <file>.rejected.csv)")
+    import_parser.add_argument("--batch-size", type=int, default=importer.BATCH_SIZE,
+                               help="records written per transaction")
+    
+    export_parser = commands.add_parser("export", help="export publications to a file")
+    export_parser.add_argument("path", help="CSV, JSON Lines or XLSX file")
+    return parser.parse_args(argv)
+
+
+def run_import(args):
+    """Import a catalog file and print the report."""
+    def progress(report):
+        print(f"  {report.read} records, {report.rows_per_second:.0f} records/s")
+    
+    try:
+        report = importer.import_catalog(args.path, args.errors, args.batch_size, progress)
+    except (OSError, ValueError, RuntimeError) as e:
+        sys.exit(f"Import failed: {e}")
+    print(f"Imported {report.imported} of {report.read} records in {report.seconds:.1f} s "
+          f"({report.rows_per_second:.0f} records/s)")
+    if report.rejected:
+        print(f"Rejected {report.rejected} records, see {report.error_file}")
+
+
+def run_export(args):
+    """Export the catalog to a file and print the result."""
+    try:
+        count = exporter.export_catalog(args.path)
+    except (OSError, ValueError, RuntimeError) as e:
+        sys.exit(f"Export failed: {e}")
+    print(f"Exported {count} publications to {args.path}")
 
 
 def main():
     """Main application entry point."""
+    args = parse_args()
+    
+    # SQL statistics and slow-query log, see instrumentation.py
+    if instrumentation.enabled_by_env():
+        instrumentation.install()
+    
+    if args.storage_profile:
+        set_storage_profile(args.storage_profile)
+    elif args.command == "import" and not os.environ.get("LIBRARY_PROFILE"):
+        set_storage_profile("bulk-load")
+    
     # Initialize the database (creates tables if not exist)
     print("Initializing database...")
     init_database()
     print("Database ready!")
     
+    if args.command in ("import", "export"):
+        try:
+            if args.command == "import":
+                run_import(args)
+            else:
+                run_export(args)
+        finally:
+            close_connections()
+        return
+    
+    if args.memory:
+        enable_replica()
+        print("Using in-memory replica")
+    else:
+        start_checkpointer()
+    # The UI and the background worker write through one writer thread
+    write_queue.start()
+    
     # Create and run the main window
     print("Starting application...")
+    profile = StartupProfile() if args.profile_startup else None
+    if profile:
+        profile.mark("database")
     root = create_main_window()
-    root.mainloop()
+    if profile:
+        profile.mark("window")
+        
+        def first_paint():
+            profile.mark("first paint")
+            profile.report()
+        
+        # Idle callbacks run once the pending redraws are done
+        root.after_idle(first_paint)
+    try:
+        root.mainloop()
+    finally:
+        # Stop the background worker and the writer, save the replica (if
+        # any), checkpoint the WAL, then close the long-lived connections
+        shutdown_runner()
+        write_queue.stop()
+        close_replica()
+        stop_checkpointer()
+        close_connections()
 
 
 if __name__ == "__main__":
@@ -2,28 +2,46 @@
 Data classes for Home Library application.
 Contains all entity definitions.
 """
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field, fields
+from typing import List, NamedTuple, Optional
 
 
+def _with_slots(cls):
+    """Rebuild a dataclass with __slots__ for its fields.
+    
+    Same as dataclass(slots=True), which needs Python 3.10. Instances have
+    no __dict__, which makes the many small entities of a big load cheaper.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in names + ('__dict__', '__weakref__'):
+        namespace.pop(name, None)
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_with_slots
 @dataclass
 class Author:
     id: Optional[int]
     name: str
 
 
+@_with_slots
 @dataclass
 class Genre:
     id: Optional[int]
     name: str
 
 
+@_with_slots
 @dataclass
 class PublicationType:
     id: Optional[int]
     name: str
 
 
+@_with_slots
 @dataclass
 class StorageLocation:
     id: Optional[int]
@@ -34,6 +52,7 @@ class StorageLocation:
         return f"Шафа: {self.cabinet}, Полиця: {self.shelf}"
 
 
+@_with_slots
 @dataclass
 class Publication:
     id: Optional[int]
@@ -52,3 +71,33 @@ class Publication:
             self.authors = []
         if self.genres is None:
             self.genres = []
+
+
+@_with_slots
+@dataclass
+class PublicationChanges:
+    """What update_publication() changed; empty when nothing did."""
+    publication_id: int
+    changed_fields: List[str] = field(default_factory=list)
+    added_author_ids: List[int] = field(default_factory=list)
+    removed_author_ids: List[int] = field(default_factory=list)
+    added_genre_ids: List[int] = field(default_factory=list)
+    removed_genre_ids: List[int] = field(default_factory=list)
+    publication: Optional[Publication] = None
+    
+    @property
+    def changed(self) -> bool:
+        return bool(self.changed_fields or self.added_author_ids or self.removed_author_ids
+                    or self.added_genre_ids or self.removed_genre_ids)
+
+
+class PublicationRow(NamedTuple):
+    """Display row of a publication, read from publication_summary."""
+    id: int
+    title: str
+    publication_kind: str
+    year: Optional[int]
+    authors_text: Optional[str]
+    genres_text: Optional[str]
+    type_name: Optional[str]
+    location_text: Optional[str]
@@ -2,193 +2,360 @@
 CRUD operations for Home Library application.
 Contains all Create, Read, Update, Delete functions for each entity.
 """
-from typing import List, Optional
-from database import get_connection
-from .classes import Author, Genre, PublicationType, StorageLocation, Publication
+from typing import Dict, List, Optional, Tuple
+from database import get_connection, transaction, add_rollback_hook, get_table_generations
+from write_queue import queued_write
+from .classes import (Author, Genre, PublicationType, StorageLocation, Publication,
+                      PublicationChanges, PublicationRow)
+
+
+# ============== Reference Data Cache ==============
+
+# Reference lists (authors, genres, types, locations) with their
+# name -> id maps, kept in memory until the table's generation changes,
+# which also catches writes by other processes.
+_reference_cache = {}
+
+
+def _cached_reference(table: str, load):
+    """Get (items, ids_by_name) for a reference table, loading it on a miss."""
+    generation = get_table_generations().get(table)
+    entry = _reference_cache.get(table)
+    if entry is None or entry[0] != generation:
+        entry = (generation, load())
+        _reference_cache[table] = entry
+    return entry[1]
+
+
+def invalidate_reference_cache(table: str = None):
+    """Drop cached reference data for one table, or for all of them."""
+    if table is None:
+        _reference_cache.clear()
+    else:
+        _reference_cache.pop(table, None)
+
+
+# A rolled back write may have left uncommitted rows in the cache
+add_rollback_hook(invalidate_reference_cache)
 
 
 # ============== Author CRUD ==============
 
-def get_all_authors() -> List[Author]:
+def _load_authors():
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM authors ORDER BY name")
     authors = [Author(id=row['id'], name=row['name']) for row in cursor.fetchall()]
-    conn.close()
-    return authors
+    return authors, {a.name: a.id for a in authors}
+
+
+def get_all_authors() -> List[Author]:
+    return list(_cached_reference('authors', _load_authors)[0])
+
+
+def get_author_ids_by_name() -> Dict[str, int]:
+    """Get a name -> id map of all authors."""
+    return _cached_reference('authors', _load_authors)[1]
 
 
 def get_author_by_id(author_id: int) -> Optional[Author]:
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM authors WHERE id = ?", (author_id,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return Author(id=row['id'], name=row['name'])
     return None
 
 
-def create_author(name: str) -> int:
-    conn = get_connection()
-    cursor = conn.execute("INSERT INTO authors (name) VALUES (?)", (name,))
-    author_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return author_id
+@queued_write
+def create_author(name: str) -> Author:
+    with transaction() as conn:
+        cursor = conn.execute("INSERT INTO authors (name) VALUES (?)", (name,))
+        author_id = cursor.lastrowid
+    invalidate_reference_cache('authors')
+    return Author(id=author_id, name=name)
 
 
-def update_author(author_id: int, name: str):
-    conn = get_connection()
-    conn.execute("UPDATE authors SET name = ? WHERE id = ?", (name, author_id))
-    conn.commit()
-    conn.close()
+@queued_write
+def update_author(author_id: int, name: str) -> Author:
+    with transaction() as conn:
+        conn.execute("UPDATE authors SET name = ? WHERE id = ?", (name, author_id))
+    invalidate_reference_cache('authors')
+    return Author(id=author_id, name=name)
 
 
+@queued_write
 def delete_author(author_id: int):
-    conn = get_connection()
-    conn.execute("DELETE FROM authors WHERE id = ?", (author_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM authors WHERE id = ?", (author_id,))
+    invalidate_reference_cache('authors')
 
 
 # ============== Genre CRUD ==============
 
-def get_all_genres() -> List[Genre]:
+def _load_genres():
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM genres ORDER BY name")
     genres = [Genre(id=row['id'], name=row['name']) for row in cursor.fetchall()]
-    conn.close()
-    return genres
+    return genres, {g.name: g.id for g in genres}
+
+
+def get_all_genres() -> List[Genre]:
+    return list(_cached_reference('genres', _load_genres)[0])
+
+
+def get_genre_ids_by_name() -> Dict[str, int]:
+    """Get a name -> id map of all genres."""
+    return _cached_reference('genres', _load_genres)[1]
 
 
 def get_genre_by_id(genre_id: int) -> Optional[Genre]:
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM genres WHERE id = ?", (genre_id,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return Genre(id=row['id'], name=row['name'])
     return None
 
 
-def create_genre(name: str) -> int:
-    conn = get_connection()
-    cursor = conn.execute("INSERT INTO genres (name) VALUES (?)", (name,))
-    genre_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return genre_id
+@queued_write
+def create_genre(name: str) -> Genre:
+    with transaction() as conn:
+        cursor = conn.execute("INSERT INTO genres (name) VALUES (?)", (name,))
+        genre_id = cursor.lastrowid
+    invalidate_reference_cache('genres')
+    return Genre(id=genre_id, name=name)
 
 
-def update_genre(genre_id: int, name: str):
-    conn = get_connection()
-    conn.execute("UPDATE genres SET name = ? WHERE id = ?", (name, genre_id))
-    conn.commit()
-    conn.close()
+@queued_write
+def update_genre(genre_id: int, name: str) -> Genre:
+    with transaction() as conn:
+        conn.execute("UPDATE genres SET name = ? WHERE id = ?", (name, genre_id))
+    invalidate_reference_cache('genres')
+    return Genre(id=genre_id, name=name)
 
 
+@queued_write
 def delete_genre(genre_id: int):
-    conn = get_connection()
-    conn.execute("DELETE FROM genres WHERE id = ?", (genre_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM genres WHERE id = ?", (genre_id,))
+    invalidate_reference_cache('genres')
 
 
 # ============== Publication Type CRUD ==============
 
-def get_all_publication_types() -> List[PublicationType]:
+def _load_publication_types():
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM publication_types ORDER BY name")
     types = [PublicationType(id=row['id'], name=row['name']) for row in cursor.fetchall()]
-    conn.close()
-    return types
+    return types, {t.name: t.id for t in types}
+
+
+def get_all_publication_types() -> List[PublicationType]:
+    return list(_cached_reference('publication_types', _load_publication_types)[0])
+
+
+def get_publication_type_ids_by_name() -> Dict[str, int]:
+    """Get a name -> id map of all publication types."""
+    return _cached_reference('publication_types', _load_publication_types)[1]
 
 
 def get_publication_type_by_id(type_id: int) -> Optional[PublicationType]:
     conn = get_connection()
     cursor = conn.execute("SELECT id, name FROM publication_types WHERE id = ?", (type_id,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return PublicationType(id=row['id'], name=row['name'])
     return None
 
 
-def create_publication_type(name: str) -> int:
-    conn = get_connection()
-    cursor = conn.execute("INSERT INTO publication_types (name) VALUES (?)", (name,))
-    type_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return type_id
+@queued_write
+def create_publication_type(name: str) -> PublicationType:
+    with transaction() as conn:
+        cursor = conn.execute("INSERT INTO publication_types (name) VALUES (?)", (name,))
+        type_id = cursor.lastrowid
+    invalidate_reference_cache('publication_types')
+    return PublicationType(id=type_id, name=name)
 
 
-def update_publication_type(type_id: int, name: str):
-    conn = get_connection()
-    conn.execute("UPDATE publication_types SET name = ? WHERE id = ?", (name, type_id))
-    conn.commit()
-    conn.close()
+@queued_write
+def update_publication_type(type_id: int, name: str) -> PublicationType:
+    with transaction() as conn:
+        conn.execute("UPDATE publication_types SET name = ? WHERE id = ?", (name, type_id))
+    invalidate_reference_cache('publication_types')
+    return PublicationType(id=type_id, name=name)
 
 
+@queued_write
 def delete_publication_type(type_id: int):
-    conn = get_connection()
-    conn.execute("DELETE FROM publication_types WHERE id = ?", (type_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM publication_types WHERE id = ?", (type_id,))
+    invalidate_reference_cache('publication_types')
 
 
 # ============== Storage Location CRUD ==============
 
-def get_all_storage_locations() -> List[StorageLocation]:
+def _load_storage_locations():
     conn = get_connection()
     cursor = conn.execute("SELECT id, cabinet, shelf FROM storage_locations ORDER BY cabinet, shelf")
     locations = [StorageLocation(id=row['id'], cabinet=row['cabinet'], shelf=row['shelf']) 
                  for row in cursor.fetchall()]
-    conn.close()
-    return locations
+    return locations, {str(loc): loc.id for loc in locations}
+
+
+def get_all_storage_locations() -> List[StorageLocation]:
+    return list(_cached_reference('storage_locations', _load_storage_locations)[0])
+
+
+def get_storage_location_ids_by_label() -> Dict[str, int]:
+    """Get a display label -> id map of all storage locations."""
+    return _cached_reference('storage_locations', _load_storage_locations)[1]
 
 
 def get_storage_location_by_id(location_id: int) -> Optional[StorageLocation]:
     conn = get_connection()
     cursor = conn.execute("SELECT id, cabinet, shelf FROM storage_locations WHERE id = ?", (location_id,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return StorageLocation(id=row['id'], cabinet=row['cabinet'], shelf=row['shelf'])
     return None
 
 
-def create_storage_location(cabinet: str, shelf: str) -> int:
-    conn = get_connection()
-    cursor = conn.execute(
-        "INSERT INTO storage_locations (cabinet, shelf) VALUES (?, ?)",
-        (cabinet, shelf)
-    )
-    location_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return location_id
+@queued_write
+def create_storage_location(cabinet: str, shelf: str) -> StorageLocation:
+    with transaction() as conn:
+        cursor = conn.execute(
+            "INSERT INTO storage_locations (cabinet, shelf) VALUES (?, ?)",
+            (cabinet, shelf)
+        )
+        location_id = cursor.lastrowid
+    invalidate_reference_cache('storage_locations')
+    return StorageLocation(id=location_id, cabinet=cabinet, shelf=shelf)
 
 
-def update_storage_location(location_id: int, cabinet: str, shelf: str):
-    conn = get_connection()
-    conn.execute(
-        "UPDATE storage_locations SET cabinet = ?, shelf = ? WHERE id = ?",
-        (cabinet, shelf, location_id)
-    )
-    conn.commit()
-    conn.close()
+@queued_write
+def update_storage_location(location_id: int, cabinet: str, shelf: str) -> StorageLocation:
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE storage_locations SET cabinet = ?, shelf = ? WHERE id = ?",
+            (cabinet, shelf, location_id)
+        )
+    invalidate_reference_cache('storage_locations')
+    return StorageLocation(id=location_id, cabinet=cabinet, shelf=shelf)
 
 
+@queued_write
 def delete_storage_location(location_id: int):
-    conn = get_connection()
-    conn.execute("DELETE FROM storage_locations WHERE id = ?", (location_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM storage_locations WHERE id = ?", (location_id,))
+    invalidate_reference_cache('storage_locations')
 
 
 # ============== Publication CRUD ==============
 
-def get_all_publications() -> List[Publication]:
+# Older SQLite builds allow at most 999 bound parameters per statement.
+_ID_CHUNK_SIZE = 500
+
+
+class _IdentityMap:
+    """One entity instance per (class, id) within a single load.
+    
+    Publications loaded together share their Author, Genre, PublicationType
+    and StorageLocation objects, so callers must not modify them.
+    """
+    __slots__ = ('entities',)
+    
+    def __init__(self):
+        self.entities = {}
+    
+    def get(self, cls, entity_id, *values):
+        """Get the shared entity for an id, creating it on first use."""
+        key = (cls, entity_id)
+        entity = self.entities.get(key)
+        if entity is None:
+            entity = self.entities[key] = cls(entity_id, *values)
+        return entity
+
+
+def _publication_from_row(row, identities: _IdentityMap) -> Publication:
+    """Build a Publication with its type and location from a joined row."""
+    pub = Publication(
+        id=row['id'],
+        title=row['title'],
+        publication_kind=row['publication_kind'],
+        year=row['year'],
+        publication_type_id=row['publication_type_id'],
+        storage_location_id=row['storage_location_id']
+    )
+    
+    if row['type_name']:
+        pub.publication_type = identities.get(
+            PublicationType, row['publication_type_id'], row['type_name'])
+    
+    if row['cabinet']:
+        pub.storage_location = identities.get(
+            StorageLocation, row['storage_location_id'], row['cabinet'], row['shelf'])
+    
+    return pub
+
+
+def _load_relations(conn, publications: List[Publication], identities: _IdentityMap,
+                    all_links: bool = False):
+    """Attach authors and genres to publications in bulk.
+    
+    Links are read with one query per relation for each chunk of
+    publication ids, or for the whole junction tables when all_links
+    is set, instead of two queries per publication.
+    """
+    by_id = {pub.id: pub for pub in publications}
+    if not by_id:
+        return
+    
+    if all_links:
+        chunks = [None]
+    else:
+        ids = list(by_id)
+        chunks = [ids[i:i + _ID_CHUNK_SIZE] for i in range(0, len(ids), _ID_CHUNK_SIZE)]
+    
+    for chunk in chunks:
+        author_query = """
+            SELECT pa.publication_id, a.id, a.name
+            FROM publication_authors pa
+            JOIN authors a ON a.id = pa.author_id
+        """
+        genre_query = """
+            SELECT pg.publication_id, g.id, g.name
+            FROM publication_genres pg
+            JOIN genres g ON g.id = pg.genre_id
+        """
+        params = []
+        if chunk is not None:
+            placeholders = ", ".join("?" * len(chunk))
+            author_query += f" WHERE pa.publication_id IN ({placeholders})"
+            genre_query += f" WHERE pg.publication_id IN ({placeholders})"
+            params = chunk
+        
+        # Load authors
+        for r in conn.execute(author_query, params):
+            pub = by_id.get(r['publication_id'])
+            if pub is not None:
+                pub.authors.append(identities.get(Author, r['id'], r['name']))
+        
+        # Load genres
+        for r in conn.execute(genre_query, params):
+            pub = by_id.get(r['publication_id'])
+            if pub is not None:
+                pub.genres.append(identities.get(Genre, r['id'], r['name']))
+
+
+def get_all_publications(rows: str = 'objects') -> List[Publication]:
+    """Get all publications ordered by title.
+    
+    With rows='tuple' display rows are returned instead, as by
+    list_publication_rows().
+    """
+    if rows == 'tuple':
+        return list_publication_rows()
+    
     conn = get_connection()
     cursor = conn.execute("""
         SELECT p.id, p.title, p.publication_kind, p.year, 
@@ -201,162 +368,428 @@ def get_all_publications() -> List[Publication]:
         ORDER BY p.title
     """)
     
-    publications = []
-    for row in cursor.fetchall():
-        pub = Publication(
-            id=row['id'],
-            title=row['title'],
-            publication_kind=row['publication_kind'],
-            year=row['year'],
-            publication_type_id=row['publication_type_id'],
-            storage_location_id=row['storage_location_id']
-        )
-        
-        if row['type_name']:
-            pub.publication_type = PublicationType(
-                id=row['publication_type_id'],
-                name=row['type_name']
-            )
-        
-        if row['cabinet']:
-            pub.storage_location = StorageLocation(
-                id=row['storage_location_id'],
-                cabinet=row['cabinet'],
-                shelf=row['shelf']
-            )
-        
-        # Load authors
-        author_cursor = conn.execute("""
-            SELECT a.id, a.name
-            FROM authors a
-            JOIN publication_authors pa ON a.id = pa.author_id
-            WHERE pa.publication_id = ?
-        """, (pub.id,))
-        pub.authors = [Author(id=r['id'], name=r['name']) for r in author_cursor.fetchall()]
-        
-        # Load genres
-        genre_cursor = conn.execute("""
-            SELECT g.id, g.name
-            FROM genres g
-            JOIN publication_genres pg ON g.id = pg.genre_id
-            WHERE pg.publication_id = ?
-        """, (pub.id,))
-        pub.genres = [Genre(id=r['id'], name=r['name']) for r in genre_cursor.fetchall()]
-        
-        publications.append(pub)
+    identities = _IdentityMap()
+    publications = [_publication_from_row(row, identities) for row in cursor.fetchall()]
+    _load_relations(conn, publications, identities, all_links=True)
     
-    conn.close()
     return publications
 
 
-def get_publication_by_id(publication_id: int) -> Optional[Publication]:
+def iter_publications(after: Optional[Tuple[str, int]] = None, limit: int = 200,
+                      title: str = None, author_id: int = None,
+                      genre_id: int = None, type_id: int = None, rows: str = 'objects'
+                      ) -> Tuple[List[Publication], Optional[Tuple[str, int]]]:
+    """Get one page of publications ordered by title.
+    
+    Uses keyset pagination on (title, id): pass the returned cursor as
+    `after` to get the next page. The cursor is None on the last page.
+    Authors and genres are loaded for the rows of this page only. With
+    rows='tuple' the page holds display rows, as by list_publication_rows().
+    """
     conn = get_connection()
-    cursor = conn.execute("""
-        SELECT p.id, p.title, p.publication_kind, p.year,
-               p.publication_type_id, p.storage_location_id
-        FROM publications p
-        WHERE p.id = ?
-    """, (publication_id,))
-    row = cursor.fetchone()
     
-    if not row:
-        conn.close()
-        return None
+    if rows == 'tuple':
+        query = f"""
+            SELECT {_SUMMARY_COLUMNS}
+            FROM publications p
+            JOIN publication_summary s ON s.id = p.id
+            WHERE 1=1
+        """
+    else:
+        query = """
+            SELECT p.id, p.title, p.publication_kind, p.year,
+                   p.publication_type_id, p.storage_location_id,
+                   pt.name as type_name,
+                   sl.cabinet, sl.shelf
+            FROM publications p
+            LEFT JOIN publication_types pt ON p.publication_type_id = pt.id
+            LEFT JOIN storage_locations sl ON p.storage_location_id = sl.id
+            WHERE 1=1
+        """
+    params = []
     
-    pub = Publication(
-        id=row['id'],
-        title=row['title'],
-        publication_kind=row['publication_kind'],
-        year=row['year'],
-        publication_type_id=row['publication_type_id'],
-        storage_location_id=row['storage_location_id']
-    )
+    if after:
+        query += " AND (p.title, p.id) > (?, ?)"
+        params.extend(after)
     
-    # Load authors
-    author_cursor = conn.execute("""
-        SELECT a.id, a.name
-        FROM authors a
-        JOIN publication_authors pa ON a.id = pa.author_id
-        WHERE pa.publication_id = ?
-    """, (pub.id,))
-    pub.authors = [Author(id=r['id'], name=r['name']) for r in author_cursor.fetchall()]
-    
-    # Load genres
-    genre_cursor = conn.execute("""
-        SELECT g.id, g.name
-        FROM genres g
-        JOIN publication_genres pg ON g.id = pg.genre_id
-        WHERE pg.publication_id = ?
-    """, (pub.id,))
-    pub.genres = [Genre(id=r['id'], name=r['name']) for r in genre_cursor.fetchall()]
-    
-    conn.close()
-    return pub
+    if title:
+        query += " AND p.title LIKE ?"
+        params.append(f"%{title}%")
+    
+    if author_id:
+        query += """ AND EXISTS (SELECT 1 FROM publication_authors pa
+                                 WHERE pa.publication_id = p.id AND pa.author_id = ?)"""
+        params.append(author_id)
+    
+    if genre_id:
+        query += """ AND EXISTS (SELECT 1 FROM publication_genres pg
+                                 WHERE pg.publication_id = p.id AND pg.genre_id = ?)"""
+        params.append(genre_id)
+    
+    # Unary + keeps the planner walking the title index instead of sorting
+    if type_id:
+        query += " AND +p.publication_type_id = ?"
+        params.append(type_id)
+    
+    # Fetch one extra row to know whether another page follows
+    query += " ORDER BY p.title, p.id LIMIT ?"
+    params.append(limit + 1)
+    
+    if rows == 'tuple':
+        found = _fetch_rows(conn, query, params)
+        publications = found[:limit]
+    else:
+        found = conn.execute(query, params).fetchall()
+        identities = _IdentityMap()
+        publications = [_publication_from_row(row, identities) for row in found[:limit]]
+        _load_relations(conn, publications, identities)
+    
+    next_cursor = None
+    if len(found) > limit:
+        last = publications[-1]
+        next_cursor = (last.title, last.id)
+    return publications, next_cursor
+
+
+def get_publication_keys() -> List[Tuple[str, int]]:
+    """Get (title, id) of all publications in display order."""
+    conn = get_connection()
+    cursor = conn.execute("SELECT title, id FROM publications ORDER BY title, id")
+    return [(row[0], row[1]) for row in cursor.fetchall()]
+
+
+def get_publications_by_ids(publication_ids: List[int], rows: str = 'objects') -> List[Publication]:
+    """Get publications with authors and genres, in the order of the given ids.
+    
+    Ids that no longer exist are skipped. With rows='tuple' display rows
+    are returned instead, as by list_publication_rows().
+    """
+    if rows == 'tuple':
+        return list_publication_rows(publication_ids)
+    
+    conn = get_connection()
+    identities = _IdentityMap()
+    found = {}
+    for i in range(0, len(publication_ids), _ID_CHUNK_SIZE):
+        chunk = publication_ids[i:i + _ID_CHUNK_SIZE]
+        cursor = conn.execute(f"""
+            SELECT p.id, p.title, p.publication_kind, p.year,
+                   p.publication_type_id, p.storage_location_id,
+                   pt.name as type_name,
+                   sl.cabinet, sl.shelf
+            FROM publications p
+            LEFT JOIN publication_types pt ON p.publication_type_id = pt.id
+            LEFT JOIN storage_locations sl ON p.storage_location_id = sl.id
+            WHERE p.id IN ({", ".join("?" * len(chunk))})
+        """, chunk)
+        for row in cursor.fetchall():
+            found[row['id']] = _publication_from_row(row, identities)
+    
+    publications = [found[pub_id] for pub_id in publication_ids if pub_id in found]
+    _load_relations(conn, publications, identities)
+    return publications
+
+
+# Columns of publication_summary `s` in PublicationRow order
+_SUMMARY_COLUMNS = ("s.id, s.title, s.publication_kind, s.year, "
+                    "s.authors_text, s.genres_text, s.type_name, s.location_text")
+
+
+def _fetch_rows(conn, query: str, params=()) -> List[PublicationRow]:
+    """Run a query selecting _SUMMARY_COLUMNS and return its display rows.
+    
+    The rows skip sqlite3.Row and are built straight from the fetched tuples.
+    SQLite returns a new string for every value, so the few distinct kinds,
+    genre lists, types and locations are shared within the result, the
+    same way _IdentityMap shares entities.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    share = {}.setdefault
+    return [PublicationRow(pub_id, title, share(kind, kind), year, authors,
+                           share(genres, genres), share(pub_type, pub_type), share(location, location))
+            for pub_id, title, kind, year, authors, genres, pub_type, location
+            in cursor.execute(query, params)]
+
+
+def list_publication_rows(publication_ids: List[int] = None) -> List[PublicationRow]:
+    """Get display rows of publications.
+    
+    Rows come from publication_summary, where author, genre, type and
+    location names are already joined, so no entity objects are built.
+    Rows follow the order of the given ids, skipping ids that no longer
+    exist, or are ordered by title when no ids are given.
+    """
+    conn = get_connection()
+    if publication_ids is None:
+        return _fetch_rows(
+            conn, f"SELECT {_SUMMARY_COLUMNS} FROM publication_summary s ORDER BY s.title, s.id")
+    
+    found = {}
+    for i in range(0, len(publication_ids), _ID_CHUNK_SIZE):
+        chunk = publication_ids[i:i + _ID_CHUNK_SIZE]
+        for row in _fetch_rows(conn, f"""
+            SELECT {_SUMMARY_COLUMNS} FROM publication_summary s
+            WHERE s.id IN ({", ".join("?" * len(chunk))})
+        """, chunk):
+            found[row.id] = row
+    return [found[pub_id] for pub_id in publication_ids if pub_id in found]
+
+
+def get_publication_by_id(publication_id: int) -> Optional[Publication]:
+    publications = get_publications_by_ids([publication_id])
+    return publications[0] if publications else None
 
 
+@queued_write
 def create_publication(title: str, publication_kind: str, year: Optional[int],
                        publication_type_id: Optional[int], storage_location_id: Optional[int],
-                       author_ids: List[int], genre_ids: List[int]) -> int:
-    conn = get_connection()
-    cursor = conn.execute("""
-        INSERT INTO publications (title, publication_kind, year, publication_type_id, storage_location_id)
-        VALUES (?, ?, ?, ?, ?)
-    """, (title, publication_kind, year, publication_type_id, storage_location_id))
-    publication_id = cursor.lastrowid
+                       author_ids: List[int], genre_ids: List[int]) -> Publication:
+    with transaction() as conn:
+        cursor = conn.execute("""
+            INSERT INTO publications (title, publication_kind, year, publication_type_id, storage_location_id)
+            VALUES (?, ?, ?, ?, ?)
+        """, (title, publication_kind, year, publication_type_id, storage_location_id))
+        publication_id = cursor.lastrowid
+        
+        # Link authors
+        for author_id in author_ids:
+            conn.execute(
+                "INSERT INTO publication_authors (publication_id, author_id) VALUES (?, ?)",
+                (publication_id, author_id)
+            )
+        
+        # Link genres
+        for genre_id in genre_ids:
+            conn.execute(
+                "INSERT INTO publication_genres (publication_id, genre_id) VALUES (?, ?)",
+                (publication_id, genre_id)
+            )
     
-    # Link authors
-    for author_id in author_ids:
-        conn.execute(
-            "INSERT INTO publication_authors (publication_id, author_id) VALUES (?, ?)",
-            (publication_id, author_id)
-        )
+    return get_publication_by_id(publication_id)
+
+
+# Scalar columns compared by update_publication()
+_PUBLICATION_FIELDS = ('title', 'publication_kind', 'year', 'publication_type_id', 'storage_location_id')
+
+
+def _update_links_many(conn, table: str, column: str,
+                       wanted: Dict[int, List[int]]) -> Dict[int, Tuple[List[int], List[int]]]:
+    """Make the links of several publications in a junction table match `wanted`.
     
-    # Link genres
-    for genre_id in genre_ids:
-        conn.execute(
-            "INSERT INTO publication_genres (publication_id, genre_id) VALUES (?, ?)",
-            (publication_id, genre_id)
-        )
+    Only the differences are written, with one executemany for all
+    deletes and one for all inserts. Returns {publication id: (added, removed)}.
+    """
+    current = {publication_id: set() for publication_id in wanted}
+    publication_ids = list(wanted)
+    for start in range(0, len(publication_ids), _ID_CHUNK_SIZE):
+        chunk = publication_ids[start:start + _ID_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(
+                f"SELECT publication_id, {column} FROM {table} WHERE publication_id IN ({placeholders})",
+                chunk):
+            current[row[0]].add(row[1])
+    
+    diffs = {}
+    deletes = []
+    inserts = []
+    for publication_id, ids in wanted.items():
+        links = dict.fromkeys(ids)
+        added = [link_id for link_id in links if link_id not in current[publication_id]]
+        removed = sorted(current[publication_id].difference(links))
+        deletes.extend((publication_id, link_id) for link_id in removed)
+        inserts.extend((publication_id, link_id) for link_id in added)
+        diffs[publication_id] = (added, removed)
+    
+    if deletes:
+        conn.executemany(f"DELETE FROM {table} WHERE publication_id = ? AND {column} = ?", deletes)
+    if inserts:
+        conn.executemany(f"INSERT INTO {table} (publication_id, {column}) VALUES (?, ?)", inserts)
+    return diffs
+
+
+def _update_links(conn, table: str, column: str, publication_id: int,
+                  ids: List[int]) -> Tuple[List[int], List[int]]:
+    """Make a publication's links in a junction table match `ids`.
     
-    conn.commit()
-    conn.close()
-    return publication_id
+    Only the differences are written. Returns (added ids, removed ids).
+    """
+    return _update_links_many(conn, table, column, {publication_id: ids})[publication_id]
 
 
+@queued_write
 def update_publication(publication_id: int, title: str, publication_kind: str, 
                        year: Optional[int], publication_type_id: Optional[int],
                        storage_location_id: Optional[int],
-                       author_ids: List[int], genre_ids: List[int]):
-    conn = get_connection()
-    conn.execute("""
-        UPDATE publications 
-        SET title = ?, publication_kind = ?, year = ?, 
-            publication_type_id = ?, storage_location_id = ?
-        WHERE id = ?
-    """, (title, publication_kind, year, publication_type_id, storage_location_id, publication_id))
-    
-    # Update authors - remove old, add new
-    conn.execute("DELETE FROM publication_authors WHERE publication_id = ?", (publication_id,))
-    for author_id in author_ids:
-        conn.execute(
-            "INSERT INTO publication_authors (publication_id, author_id) VALUES (?, ?)",
-            (publication_id, author_id)
-        )
+                       author_ids: List[int], genre_ids: List[int]) -> Optional[PublicationChanges]:
+    """Update a publication, writing only what differs from the stored row.
     
-    # Update genres - remove old, add new
-    conn.execute("DELETE FROM publication_genres WHERE publication_id = ?", (publication_id,))
-    for genre_id in genre_ids:
-        conn.execute(
-            "INSERT INTO publication_genres (publication_id, genre_id) VALUES (?, ?)",
-            (publication_id, genre_id)
-        )
+    Returns a PublicationChanges summary holding the updated publication,
+    or None if the publication does not exist.
+    """
+    values = dict(zip(_PUBLICATION_FIELDS, (title, publication_kind, year,
+                                            publication_type_id, storage_location_id)))
+    with transaction() as conn:
+        row = conn.execute(
+            f"SELECT {', '.join(_PUBLICATION_FIELDS)} FROM publications WHERE id = ?",
+            (publication_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        # Only changed columns are set, so title triggers fire only on a new title
+        changes = PublicationChanges(publication_id=publication_id)
+        changes.changed_fields = [name for name in _PUBLICATION_FIELDS if row[name] != values[name]]
+        if changes.changed_fields:
+            assignments = ", ".join(f"{name} = ?" for name in changes.changed_fields)
+            conn.execute(f"UPDATE publications SET {assignments} WHERE id = ?",
+                         [values[name] for name in changes.changed_fields] + [publication_id])
+        
+        changes.added_author_ids, changes.removed_author_ids = _update_links(
+            conn, 'publication_authors', 'author_id', publication_id, author_ids)
+        changes.added_genre_ids, changes.removed_genre_ids = _update_links(
+            conn, 'publication_genres', 'genre_id', publication_id, genre_ids)
     
-    conn.commit()
-    conn.close()
+    changes.publication = get_publication_by_id(publication_id)
+    return changes
 
 
+@queued_write
 def delete_publication(publication_id: int):
-    conn = get_connection()
-    conn.execute("DELETE FROM publications WHERE id = ?", (publication_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("DELETE FROM publications WHERE id = ?", (publication_id,))
+
+
+# ============== Batch Operations ==============
+
+def _ids_by_name(conn, table: str, names: List[str]) -> Dict[str, int]:
+    ids = {}
+    for start in range(0, len(names), _ID_CHUNK_SIZE):
+        chunk = names[start:start + _ID_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT name, id FROM {table} WHERE name IN ({placeholders})", chunk):
+            ids[row['name']] = row['id']
+    return ids
+
+
+def _create_named(table: str, names: List[str]) -> List[int]:
+    """Insert missing names into a reference table and return all their ids."""
+    unique = list(dict.fromkeys(names))
+    with transaction() as conn:
+        ids = _ids_by_name(conn, table, unique)
+        missing = [name for name in unique if name not in ids]
+        if missing:
+            conn.executemany(f"INSERT INTO {table} (name) VALUES (?)", [(name,) for name in missing])
+            ids.update(_ids_by_name(conn, table, missing))
+    invalidate_reference_cache(table)
+    return [ids[name] for name in names]
+
+
+@queued_write
+def create_authors(names: List[str]) -> List[int]:
+    """Create authors in one transaction; existing names keep their id.
+    
+    Returns the ids in the order of `names`.
+    """
+    return _create_named('authors', names)
+
+
+@queued_write
+def create_genres(names: List[str]) -> List[int]:
+    """Create genres in one transaction; existing names keep their id.
+    
+    Returns the ids in the order of `names`.
+    """
+    return _create_named('genres', names)
+
+
+def _existing_publication_ids(conn, publication_ids: List[int]) -> set:
+    existing = set()
+    unique = list(dict.fromkeys(publication_ids))
+    for start in range(0, len(unique), _ID_CHUNK_SIZE):
+        chunk = unique[start:start + _ID_CHUNK_SIZE]
+        placeholders = ", ".join("?" * len(chunk))
+        existing.update(row[0] for row in conn.execute(
+            f"SELECT id FROM publications WHERE id IN ({placeholders})", chunk))
+    return existing
+
+
+@queued_write
+def delete_publications(publication_ids: List[int]) -> List[int]:
+    """Delete publications in one transaction.
+    
+    Returns the ids that existed and were deleted, in input order.
+    """
+    with transaction() as conn:
+        existing = _existing_publication_ids(conn, publication_ids)
+        deleted = [publication_id for publication_id in dict.fromkeys(publication_ids)
+                   if publication_id in existing]
+        for start in range(0, len(deleted), _ID_CHUNK_SIZE):
+            chunk = deleted[start:start + _ID_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            conn.execute(f"DELETE FROM publications WHERE id IN ({placeholders})", chunk)
+    return deleted
+
+
+@queued_write
+def update_publications(changes: List[dict]) -> List[int]:
+    """Apply partial updates to several publications in one transaction.
+    
+    Each change is a dict with 'id' and any of the scalar fields of
+    update_publication() plus 'author_ids' and 'genre_ids'. Only values
+    that differ from the stored rows are written; rows with the same set
+    of changed columns share one executemany. Returns the ids of the
+    publications that exist, in input order.
+    """
+    with transaction() as conn:
+        ids = [change['id'] for change in changes]
+        stored = {}
+        unique = list(dict.fromkeys(ids))
+        for start in range(0, len(unique), _ID_CHUNK_SIZE):
+            chunk = unique[start:start + _ID_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in conn.execute(
+                    f"SELECT id, {', '.join(_PUBLICATION_FIELDS)} FROM publications WHERE id IN ({placeholders})",
+                    chunk):
+                stored[row['id']] = dict(row)
+        
+        updates = {}
+        author_links = {}
+        genre_links = {}
+        for change in changes:
+            row = stored.get(change['id'])
+            if row is None:
+                continue
+            changed = tuple(name for name in _PUBLICATION_FIELDS
+                            if name in change and change[name] != row[name])
+            if changed:
+                row.update((name, change[name]) for name in changed)
+                updates.setdefault(changed, []).append(
+                    [change[name] for name in changed] + [change['id']])
+            if 'author_ids' in change:
+                author_links[change['id']] = change['author_ids']
+            if 'genre_ids' in change:
+                genre_links[change['id']] = change['genre_ids']
+        
+        for fields, params in updates.items():
+            assignments = ", ".join(f"{name} = ?" for name in fields)
+            conn.executemany(f"UPDATE publications SET {assignments} WHERE id = ?", params)
+        if author_links:
+            _update_links_many(conn, 'publication_authors', 'author_id', author_links)
+        if genre_links:
+            _update_links_many(conn, 'publication_genres', 'genre_id', genre_links)
+    return [publication_id for publication_id in ids if publication_id in stored]
+
+
+@queued_write
+def relink_location(old_location_id: int, new_location_id: Optional[int]) -> List[int]:
+    """Move every publication from one storage location to another.
+    
+    Returns the ids of the moved publications in id order.
+    """
+    with transaction() as conn:
+        moved = [row[0] for row in conn.execute(
+            "SELECT id FROM publications WHERE storage_location_id = ? ORDER BY id", (old_location_id,))]
+        conn.execute("UPDATE publications SET storage_location_id = ? WHERE storage_location_id = ?",
+                     (new_location_id, old_location_id))
+    return moved
@@ -0,0 +1,53 @@
+"""
+Shared helpers for the Home Library tests.
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import database
+import models
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Test case with a fresh scratch database for every test."""
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.previous_db = os.environ.get("LIBRARY_DB")
+        os.environ["LIBRARY_DB"] = os.path.join(self.tmp, "test.db")
+        database.close_connections()
+        models.invalidate_reference_cache()
+        database.init_database()
+    
+    def tearDown(self):
+        database.close_connections()
+        models.invalidate_reference_cache()
+        if self.previous_db is None:
+            os.environ.pop("LIBRARY_DB", None)
+        else:
+            os.environ["LIBRARY_DB"] = self.previous_db
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+def create_tk_root():
+    """Create a hidden Tk root, or skip the test when there is no display."""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise unittest.SkipTest(f"Tk is not available: {e}")
+    root.withdraw()
+    return root
+
+
+def pump(root, until, timeout=5.0):
+    """Process Tk events until until() is true; fail after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not until():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the Tk event loop")
+        root.update()
+        time.sleep(0.01)
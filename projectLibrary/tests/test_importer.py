@@ -0,0 +1,98 @@
+"""
+Tests for the catalog importer.
+"""
+import csv
+import os
+import sqlite3
+import threading
+import unittest
+from unittest import mock
+
+import database
+import importer
+from tests.support import DatabaseTestCase
+
+
+class ParseYearTest(unittest.TestCase):
+
+    def parse(self, year):
+        return importer.parse_record({'title': "Кобзар", 'year': year})[2]
+    
+    def test_whole_years_are_accepted(self):
+        self.assertEqual(self.parse("1840"), 1840)
+        self.assertEqual(self.parse(" 1840 "), 1840)
+        self.assertEqual(self.parse("1840.0"), 1840)
+        self.assertEqual(self.parse(1840.0), 1840)
+        self.assertEqual(self.parse(1840), 1840)
+        self.assertIsNone(self.parse(""))
+        self.assertIsNone(self.parse(None))
+    
+    def test_bad_years_are_rejected(self):
+        for year in ("inf", "-inf", "nan", "1999.7", "1e300", "99999999999999999999", "рік"):
+            with self.subTest(year=year):
+                with self.assertRaisesRegex(ValueError, "invalid year"):
+                    self.parse(year)
+
+
+class ImportBadYearTest(DatabaseTestCase):
+
+    def test_bad_years_are_reported_as_rejected_records(self):
+        path = os.path.join(self.tmp, "catalog.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(importer.FIELDS)
+            for title, year in (("Кобзар", "1840"), ("Безмежність", "inf"),
+                                ("Ніщо", "nan"), ("Дріб", "1999.7")):
+                writer.writerow([title, 'book', year, '', '', '', '', ''])
+        
+        report = importer.import_catalog(path)
+        
+        self.assertEqual((report.read, report.imported, report.rejected), (4, 1, 3))
+        titles = [row[0] for row in database.get_connection().execute("SELECT title FROM publications")]
+        self.assertEqual(titles, ["Кобзар"])
+        with open(report.error_file, newline='', encoding='utf-8') as f:
+            reasons = [row[-1] for row in list(csv.reader(f))[1:]]
+        self.assertEqual(reasons, ["invalid year: inf", "invalid year: nan", "invalid year: 1999.7"])
+
+
+class ConcurrentImportTest(DatabaseTestCase):
+
+    def write_catalog(self, count):
+        path = os.path.join(self.tmp, "catalog.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(importer.FIELDS)
+            for i in range(count):
+                writer.writerow([f"Видання {i}", 'book', 2000, '', '', '', "Автор", "Жанр"])
+        return path
+    
+    def test_insert_by_another_connection_during_a_batch_is_not_a_conflict(self):
+        path = self.write_catalog(30)
+        others = []
+        original = importer._next_publication_id
+        
+        def next_id_then_concurrent_insert(conn):
+            next_id = original(conn)
+            
+            def insert():
+                other = sqlite3.connect(database.get_db_path(), timeout=10)
+                with other:
+                    other.execute("INSERT INTO publications (title, publication_kind) "
+                                  "VALUES ('Чужий запис', 'book')")
+                other.close()
+            thread = threading.Thread(target=insert)
+            thread.start()
+            # Give the other writer a chance to get in before the batch inserts
+            thread.join(0.3)
+            others.append(thread)
+            return next_id
+        
+        with mock.patch.object(importer, '_next_publication_id', next_id_then_concurrent_insert):
+            report = importer.import_catalog(path, batch_size=10)
+        for thread in others:
+            thread.join()
+        
+        self.assertEqual((report.imported, report.rejected), (30, 0))
+        conn = database.get_connection()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM publications").fetchone()[0], 33)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM publication_authors").fetchone()[0], 30)
@@ -0,0 +1,182 @@
+"""
+Tests for the models layer.
+"""
+from unittest import mock
+
+import database
+import models
+from tests.support import DatabaseTestCase
+
+
+class UpdatePublicationTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.authors = [models.create_author(name).id for name in ("Автор 1", "Автор 2", "Автор 3")]
+        self.genres = [models.create_genre(name).id for name in ("Жанр 1", "Жанр 2", "Жанр 3")]
+        self.pub = models.create_publication("Кобзар", 'book', 1840, None, None,
+                                             self.authors[:2], self.genres[:2])
+    
+    def update(self, author_ids, genre_ids, **fields):
+        values = dict(title="Кобзар", publication_kind='book', year=1840,
+                      publication_type_id=None, storage_location_id=None)
+        values.update(fields)
+        return models.update_publication(self.pub.id, author_ids=author_ids,
+                                         genre_ids=genre_ids, **values)
+    
+    def link_rowids(self, table, column):
+        """Get {linked id: rowid} of the publication's junction rows."""
+        rows = database.get_connection().execute(
+            f"SELECT {column}, rowid FROM {table} WHERE publication_id = ?", (self.pub.id,))
+        return dict(rows.fetchall())
+    
+    def test_links_are_diffed(self):
+        authors_before = self.link_rowids('publication_authors', 'author_id')
+        genres_before = self.link_rowids('publication_genres', 'genre_id')
+        a1, a2, a3 = self.authors
+        g1, g2, g3 = self.genres
+        
+        changes = self.update([a2, a3], [g3, g1])
+        
+        self.assertEqual(changes.changed_fields, [])
+        self.assertEqual((changes.added_author_ids, changes.removed_author_ids), ([a3], [a1]))
+        self.assertEqual((changes.added_genre_ids, changes.removed_genre_ids), ([g3], [g2]))
+        self.assertTrue(changes.changed)
+        self.assertEqual(sorted(a.id for a in changes.publication.authors), [a2, a3])
+        self.assertEqual(sorted(g.id for g in changes.publication.genres), [g1, g3])
+        # Links kept by the update are not deleted and reinserted
+        self.assertEqual(self.link_rowids('publication_authors', 'author_id')[a2], authors_before[a2])
+        self.assertEqual(self.link_rowids('publication_genres', 'genre_id')[g1], genres_before[g1])
+    
+    def test_only_changed_fields_are_reported(self):
+        changes = self.update(self.authors[:2], self.genres[:2], title="Гайдамаки", year=1841)
+        
+        self.assertEqual(changes.changed_fields, ['title', 'year'])
+        self.assertEqual(changes.added_author_ids + changes.removed_author_ids, [])
+        self.assertEqual(changes.added_genre_ids + changes.removed_genre_ids, [])
+        self.assertEqual((changes.publication.title, changes.publication.year), ("Гайдамаки", 1841))
+    
+    def test_unchanged_publication_reports_no_changes(self):
+        generation = database.get_generation(('publications', 'publication_authors',
+                                              'publication_genres'))
+        
+        changes = self.update(list(reversed(self.authors[:2])), self.genres[:2])
+        
+        self.assertFalse(changes.changed)
+        self.assertEqual(changes.publication.id, self.pub.id)
+        self.assertEqual(database.get_generation(('publications', 'publication_authors',
+                                                  'publication_genres')), generation)
+    
+    def test_duplicate_ids_are_linked_once(self):
+        a1, a2, a3 = self.authors
+        
+        changes = self.update([a3, a3, a1], self.genres[:2])
+        
+        self.assertEqual((changes.added_author_ids, changes.removed_author_ids), ([a3], [a2]))
+        self.assertEqual(sorted(self.link_rowids('publication_authors', 'author_id')), [a1, a3])
+    
+    def test_missing_publication(self):
+        self.assertIsNone(models.update_publication(self.pub.id + 1, "Ні", 'book', None,
+                                                    None, None, [], []))
+
+
+class BatchApiTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Small chunks so every batch spans several IN (...) queries
+        patcher = mock.patch.object(models, '_ID_CHUNK_SIZE', 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def create_publications(self, count, **fields):
+        values = dict(publication_kind='book', year=2000, publication_type_id=None,
+                      storage_location_id=None, author_ids=[], genre_ids=[])
+        values.update(fields)
+        return [models.create_publication(title=f"Видання {i}", **values).id
+                for i in range(count)]
+    
+    def snapshot(self, publication_id):
+        """The stored state of a publication, without its id."""
+        pub = models.get_publication_by_id(publication_id)
+        return (pub.title, pub.publication_kind, pub.year, pub.publication_type_id,
+                pub.storage_location_id, sorted(a.id for a in pub.authors),
+                sorted(g.id for g in pub.genres))
+    
+    def test_create_named_returns_ids_in_input_order(self):
+        existing = models.create_author("Б")
+        names = ["В", "Б", "А", "Г", "В"]
+        
+        ids = models.create_authors(names)
+        
+        self.assertEqual(ids[1], existing.id)
+        self.assertEqual(ids[0], ids[4])
+        self.assertEqual([models.get_author_by_id(author_id).name for author_id in ids], names)
+        self.assertEqual(len(models.get_all_authors()), 4)
+        self.assertEqual(models.create_authors(names), ids)
+    
+    def test_create_genres_matches_create_genre(self):
+        single = models.create_genre("Поезія")
+        
+        ids = models.create_genres(["Проза", "Поезія", "Драма"])
+        
+        self.assertEqual(ids[1], single.id)
+        self.assertEqual([models.get_genre_by_id(genre_id).name for genre_id in ids],
+                         ["Проза", "Поезія", "Драма"])
+        self.assertEqual(models.get_genre_ids_by_name(),
+                         {"Проза": ids[0], "Поезія": ids[1], "Драма": ids[2]})
+    
+    def test_delete_publications_returns_deleted_ids_in_input_order(self):
+        ids = self.create_publications(6)
+        missing = ids[-1] + 100
+        
+        deleted = models.delete_publications([ids[4], missing, ids[0], ids[2], ids[4]])
+        models.delete_publication(ids[1])
+        
+        self.assertEqual(deleted, [ids[4], ids[0], ids[2]])
+        self.assertEqual([pub_id for _, pub_id in models.get_publication_keys()], [ids[3], ids[5]])
+    
+    def test_update_publications_matches_update_publication(self):
+        author_ids = models.create_authors(["Автор 1", "Автор 2", "Автор 3"])
+        genre_ids = models.create_genres(["Жанр 1", "Жанр 2"])
+        type_id = models.create_publication_type("Роман").id
+        location_id = models.create_storage_location("Шафа", "1").id
+        batch = self.create_publications(3, author_ids=author_ids[:2], genre_ids=genre_ids[:1])
+        single = self.create_publications(3, author_ids=author_ids[:2], genre_ids=genre_ids[:1])
+        updates = [
+            dict(title="Нова назва", year=1999, author_ids=[author_ids[2], author_ids[0]]),
+            dict(publication_type_id=type_id, storage_location_id=location_id,
+                 genre_ids=genre_ids),
+            dict(publication_kind='periodical', author_ids=[], genre_ids=[]),
+        ]
+        
+        ids = models.update_publications(
+            [dict(update, id=pub_id) for pub_id, update in reversed(list(zip(batch, updates)))]
+            + [dict(id=single[-1] + 100, title="Немає")])
+        for pub_id, update in zip(single, updates):
+            pub = models.get_publication_by_id(pub_id)
+            values = dict(title=pub.title, publication_kind=pub.publication_kind, year=pub.year,
+                          publication_type_id=pub.publication_type_id,
+                          storage_location_id=pub.storage_location_id,
+                          author_ids=[a.id for a in pub.authors],
+                          genre_ids=[g.id for g in pub.genres])
+            values.update(update)
+            models.update_publication(pub_id, **values)
+        
+        self.assertEqual(ids, list(reversed(batch)))
+        self.assertEqual([self.snapshot(pub_id) for pub_id in batch],
+                         [self.snapshot(pub_id) for pub_id in single])
+        self.assertEqual(self.snapshot(batch[0])[0], "Нова назва")
+    
+    def test_relink_location_matches_moving_one_by_one(self):
+        old = models.create_storage_location("Шафа", "1").id
+        new = models.create_storage_location("Шафа", "2").id
+        other = self.create_publications(2)
+        ids = self.create_publications(5, storage_location_id=old)
+        
+        moved = models.relink_location(old, new)
+        
+        self.assertEqual(moved, ids)
+        self.assertEqual([models.get_publication_by_id(pub_id).storage_location_id
+                          for pub_id in ids + other], [new] * 5 + [None] * 2)
+        self.assertEqual(models.relink_location(old, new), [])
@@ -0,0 +1,67 @@
+"""
+Tests for the publications view.
+"""
+import sqlite3
+import unittest
+from functools import partial
+from types import SimpleNamespace
+from unittest import mock
+
+import database
+import models
+from tests.support import DatabaseTestCase
+from ui.publications_view import PublicationsView
+
+
+class FetchRowsTest(DatabaseTestCase):
+
+    def test_rows_deleted_elsewhere_keep_their_positions(self):
+        ids = [models.create_publication(title, 'book', 2000, None, None, [], []).id
+               for title in ("А", "Б", "В")]
+        view = SimpleNamespace(publication_keys=models.get_publication_keys())
+        
+        # Another process deletes the middle publication
+        other = sqlite3.connect(database.get_db_path())
+        with other:
+            other.execute("DELETE FROM publications WHERE id = ?", (ids[1],))
+        other.close()
+        
+        rows = PublicationsView.fetch_rows(view, 0, 3)
+        
+        self.assertEqual([key for key, _ in rows], [ids[0], None, ids[2]])
+        self.assertEqual(rows[1], (None, ()))
+        self.assertEqual(rows[2][1][:2], (ids[2], "В"))
+
+
+class FindRowTest(unittest.TestCase):
+
+    def make_view(self, keys):
+        """A stand-in for the view with the row methods bound to it."""
+        view = SimpleNamespace(list=mock.Mock(), fetch_rows=None, get_selected_id=lambda: None)
+        for name in ('show_keys', 'find_row', 'insert_row', 'remove_row', 'update_row',
+                     'remove_rows'):
+            setattr(view, name, partial(getattr(PublicationsView, name), view))
+        view.show_keys(keys)
+        return view
+    
+    def assert_positions(self, view):
+        for index, (_, pub_id) in enumerate(view.publication_keys):
+            self.assertEqual(view.find_row(pub_id), index)
+    
+    def test_positions_follow_row_changes(self):
+        view = self.make_view([("А", 1), ("Б", 2), ("Б", 5), ("Д", 3)])
+        self.assert_positions(view)
+        
+        view.insert_row(SimpleNamespace(id=4, title="В"))
+        view.update_row(SimpleNamespace(id=1, title="Я"))
+        view.remove_row(5)
+        
+        self.assertEqual(view.publication_keys, [("Б", 2), ("В", 4), ("Д", 3), ("Я", 1)])
+        self.assertIsNone(view.find_row(5))
+        self.assert_positions(view)
+        
+        view.remove_rows([2, 3])
+        
+        self.assertEqual(view.publication_keys, [("В", 4), ("Я", 1)])
+        self.assertIsNone(view.find_row(2))
+        self.assert_positions(view)
@@ -0,0 +1,53 @@
+"""
+Tests for the authors, genres, types and locations views.
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import database
+import models
+from tests.support import DatabaseTestCase
+from ui import authors_view, genres_view, locations_view, types_view
+
+
+# (module, view class, dialog class, add and edit results, action suffix, row factory)
+VIEWS = (
+    (authors_view, authors_view.AuthorsView, 'AuthorDialog',
+     ("Автор", "Автор 2"), 'author', lambda: models.create_author("Автор 0")),
+    (genres_view, genres_view.GenresView, 'GenreDialog',
+     ("Жанр", "Жанр 2"), 'genre', lambda: models.create_genre("Жанр 0")),
+    (types_view, types_view.TypesView, 'TypeDialog',
+     ("Вид", "Вид 2"), 'type', lambda: models.create_publication_type("Вид 0")),
+    (locations_view, locations_view.LocationsView, 'LocationDialog',
+     (("Шафа", "1"), ("Шафа", "2")), 'location',
+     lambda: models.create_storage_location("Шафа 0", "1")),
+)
+
+
+class MarkRenderedTest(DatabaseTestCase):
+
+    def make_view(self, cls, selected_id=None):
+        """A stand-in for the view with the rendered generation of a fresh load."""
+        view = SimpleNamespace(TABLES=cls.TABLES, patcher=mock.Mock(),
+                               wait_window=lambda dialog: None,
+                               get_selected_id=lambda: selected_id)
+        view.mark_rendered = lambda: cls.mark_rendered(view)
+        view.mark_rendered()
+        return view
+    
+    def test_own_writes_leave_the_view_rendered(self):
+        for module, cls, dialog_name, results, name, create in VIEWS:
+            with self.subTest(view=cls.__name__):
+                entity_id = create().id
+                for action, result in (('add', results[0]), ('edit', results[1]),
+                                       ('delete', None)):
+                    view = self.make_view(cls, entity_id)
+                    dialog = SimpleNamespace(result=result)
+                    with mock.patch.object(module, dialog_name, return_value=dialog), \
+                            mock.patch.object(module.messagebox, 'askyesno', return_value=True), \
+                            mock.patch.object(module.messagebox, 'showerror') as showerror:
+                        getattr(cls, f'{action}_{name}')(view)
+                    
+                    showerror.assert_not_called()
+                    self.assertEqual(view.rendered_generation, database.get_generation(cls.TABLES),
+                                     action)
@@ -0,0 +1,58 @@
+"""
+Tests for the in-memory replica mode.
+"""
+import sqlite3
+import threading
+
+import database
+import models
+from tests.support import DatabaseTestCase
+
+
+class ReplicaTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        database.enable_replica(flush_interval=60)
+    
+    def tearDown(self):
+        database.close_replica()
+        super().tearDown()
+    
+    def count_authors_in_thread(self):
+        """Start counting authors on a connection of another thread.
+        
+        Returns the thread and a list that receives the count.
+        """
+        result = []
+        thread = threading.Thread(target=lambda: result.append(
+            database.get_connection().execute("SELECT COUNT(*) FROM authors").fetchone()[0]))
+        thread.start()
+        return thread, result
+    
+    def test_readers_do_not_see_uncommitted_writes(self):
+        with self.assertRaises(RuntimeError):
+            with database.transaction() as conn:
+                conn.execute("INSERT INTO authors (name) VALUES ('Чернетка')")
+                # The reader waits for the open write transaction to end
+                thread, result = self.count_authors_in_thread()
+                thread.join(0.2)
+                self.assertEqual(result, [])
+                raise RuntimeError("roll back")
+        thread.join()
+        self.assertEqual(result, [0])
+    
+    def test_commits_are_flushed_to_the_file(self):
+        models.create_author("Леся Українка")
+        thread, result = self.count_authors_in_thread()
+        thread.join()
+        self.assertEqual(result, [1])
+        self.assertTrue(database.flush_replica())
+        
+        disk = sqlite3.connect(database.get_db_path())
+        try:
+            names = [row[0] for row in disk.execute("SELECT name FROM authors")]
+            self.assertEqual(disk.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        finally:
+            disk.close()
+        self.assertEqual(names, ["Леся Українка"])
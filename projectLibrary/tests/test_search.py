@@ -0,0 +1,87 @@
+"""
+Tests for search_publications().
+"""
+import models
+from tests.support import DatabaseTestCase
+
+
+class SearchPublicationsTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.a, self.b, self.c = models.create_authors(["Автор А", "Автор Б", "Автор В"])
+        self.x, self.y = models.create_genres(["Жанр X", "Жанр Y"])
+        self.novel = models.create_publication_type("Роман").id
+        self.poem = models.create_publication_type("Поема").id
+        self.shelf1 = models.create_storage_location("Шафа", "1").id
+        self.shelf2 = models.create_storage_location("Шафа", "2").id
+        for title, kind, year, type_id, location_id, authors, genres in (
+                ("Кобзар", 'book', 1840, self.poem, self.shelf1, [self.a, self.b], [self.x]),
+                ("Гайдамаки", 'book', 1841, self.poem, self.shelf1, [self.a], [self.x, self.y]),
+                ("Журнал", 'periodical', 1900, self.novel, self.shelf2, [self.b], [self.y]),
+                ("Кобзар ілюстрований", 'book', 1990, None, None, [], []),
+                ("Лісова пісня", 'book', 1911, self.novel, self.shelf2,
+                 [self.c, self.a, self.b], [self.y])):
+            models.create_publication(title, kind, year, type_id, location_id, authors, genres)
+    
+    def titles(self, **criteria):
+        return [pub.title for pub in models.search_publications(**criteria)]
+    
+    def test_no_criteria_returns_everything_by_title(self):
+        self.assertEqual(self.titles(), ["Гайдамаки", "Журнал", "Кобзар",
+                                         "Кобзар ілюстрований", "Лісова пісня"])
+    
+    def test_authors_any_and_all(self):
+        self.assertEqual(self.titles(author_ids=[self.a, self.b]),
+                         ["Гайдамаки", "Журнал", "Кобзар", "Лісова пісня"])
+        self.assertEqual(self.titles(author_ids=[self.a, self.b], author_match='all'),
+                         ["Кобзар", "Лісова пісня"])
+        self.assertEqual(self.titles(author_ids=[self.a, self.c], author_match='all'),
+                         ["Лісова пісня"])
+        # Repeated ids are one criterion, not a higher link count
+        self.assertEqual(self.titles(author_ids=[self.a, self.a], author_match='all'),
+                         ["Гайдамаки", "Кобзар", "Лісова пісня"])
+    
+    def test_genres_any_and_all(self):
+        self.assertEqual(self.titles(genre_ids=[self.x, self.y]),
+                         ["Гайдамаки", "Журнал", "Кобзар", "Лісова пісня"])
+        self.assertEqual(self.titles(genre_ids=[self.x, self.y], genre_match='all'),
+                         ["Гайдамаки"])
+    
+    def test_single_id_shortcuts_join_the_id_lists(self):
+        self.assertEqual(self.titles(author_id=self.a), ["Гайдамаки", "Кобзар", "Лісова пісня"])
+        self.assertEqual(self.titles(author_id=self.a, author_ids=[self.b], author_match='all'),
+                         ["Кобзар", "Лісова пісня"])
+        self.assertEqual(self.titles(genre_id=self.x, genre_ids=[self.y], genre_match='all'),
+                         ["Гайдамаки"])
+    
+    def test_combined_criteria_must_all_match(self):
+        self.assertEqual(self.titles(title="Кобзар", kind='book'),
+                         ["Кобзар", "Кобзар ілюстрований"])
+        self.assertEqual(self.titles(title="Кобзар", year_to=1900), ["Кобзар"])
+        self.assertEqual(self.titles(author_ids=[self.a, self.b], author_match='all',
+                                     genre_ids=[self.y]), ["Лісова пісня"])
+        self.assertEqual(self.titles(author_ids=[self.b], genre_ids=[self.x, self.y],
+                                     genre_match='all'), [])
+        self.assertEqual(self.titles(type_id=self.novel, location_id=self.shelf2, kind='book'),
+                         ["Лісова пісня"])
+        self.assertEqual(self.titles(author_ids=[self.a], type_id=self.poem,
+                                     location_id=self.shelf1, year_from=1841),
+                         ["Гайдамаки"])
+    
+    def test_year_range_is_inclusive(self):
+        self.assertEqual(self.titles(year_from=1841, year_to=1911),
+                         ["Гайдамаки", "Журнал", "Лісова пісня"])
+        self.assertEqual(self.titles(year_from=1900, year_to=1900), ["Журнал"])
+    
+    def test_rows_and_facets_follow_the_same_filter(self):
+        criteria = dict(author_ids=[self.a, self.b], author_match='all')
+        
+        pubs, facets = models.search_publications(facets=True, **criteria)
+        rows = models.search_publications(rows='tuple', **criteria)
+        
+        self.assertEqual([row.id for row in rows], [pub.id for pub in pubs])
+        self.assertEqual(facets['author'], {self.a: 2, self.b: 2, self.c: 1})
+        self.assertEqual(facets['genre'], {self.x: 1, self.y: 1})
+        self.assertEqual(facets['year'], {1840: 1, 1910: 1})
+        self.assertEqual(facets['kind'], {'book': 2})
@@ -0,0 +1,46 @@
+"""
+Tests for the search view.
+"""
+from datagen import populate_catalog
+from tests.support import DatabaseTestCase, create_tk_root, pump
+from ui import tasks
+from ui.search_view import SearchView
+import models
+
+
+class DecadeFilterTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        populate_catalog(publications=300, authors=20, genres=5, locations=4)
+        self.root = create_tk_root()
+        tasks.start_runner(self.root)
+        self.view = SearchView(self.root, debounce_ms=0)
+        self.view.pack()
+    
+    def tearDown(self):
+        tasks.shutdown_runner()
+        self.root.destroy()
+        super().tearDown()
+    
+    def choose(self, combo, index):
+        """Pick a combobox entry as the user would and wait for the search results."""
+        self.view.facets = None
+        combo.current(index)
+        combo.event_generate('<<ComboboxSelected>>')
+        pump(self.root, lambda: self.view.facets is not None)
+    
+    def test_choosing_a_decade_sets_the_years_and_searches(self):
+        self.choose(self.view.kind_combo, 1)
+        self.assertTrue(self.view.decades)
+        decade = self.view.decades[0]
+        
+        self.choose(self.view.decade_combo, 1)
+        
+        last_year = decade + models.YEAR_BUCKET - 1
+        self.assertEqual(self.view.year_from_var.get(), str(decade))
+        self.assertEqual(self.view.year_to_var.get(), str(last_year))
+        expected = models.search_publications(kind='book', year_from=decade, year_to=last_year)
+        self.assertTrue(expected)
+        self.assertEqual([row.id for row in self.view.results], [pub.id for pub in expected])
+        self.assertTrue(all(decade <= row.year <= last_year for row in self.view.results))
@@ -0,0 +1,148 @@
+"""
+Tests for the write coordinator.
+"""
+import sqlite3
+import threading
+import time
+from unittest import mock
+
+import database
+import instrumentation
+import models
+import write_queue
+from tests.support import DatabaseTestCase
+
+
+class QueuedWriteInstrumentationTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # install() patches module globals; keep them to undo it afterwards
+        self.saved_models = dict(vars(models))
+        self.saved_hooks = list(database._connection_hooks)
+        self.saved_settings = (instrumentation._enabled, instrumentation._slow_seconds,
+                               instrumentation._slow_log_path)
+        instrumentation.install(slow_ms=0)
+        instrumentation.reset()
+        self.writer = write_queue.start()
+    
+    def tearDown(self):
+        write_queue.stop()
+        instrumentation.reset()
+        # Connections opened while installed carry the trace callback
+        database.close_connections()
+        vars(models).update(self.saved_models)
+        database._connection_hooks[:] = self.saved_hooks
+        (instrumentation._enabled, instrumentation._slow_seconds,
+         instrumentation._slow_log_path) = self.saved_settings
+        super().tearDown()
+    
+    def test_statements_of_queued_writes_are_recorded(self):
+        author = models.create_author("Іван Франко")
+        
+        self.assertEqual(models.get_author_by_id(author.id).name, "Іван Франко")
+        self.assertEqual(self.writer.get_stats().writes, 1)
+        stats = instrumentation.get_stats()['create_author']
+        self.assertEqual(stats.calls, 1)
+        self.assertEqual(stats.statements, 1)
+        slow = [query for query in instrumentation.get_slow_queries()
+                if query.function == 'create_author']
+        self.assertEqual(len(slow), 1)
+        self.assertIn("INSERT INTO authors", slow[0].sql)
+
+
+class BusyRetryTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = write_queue.start()
+        # Another process holding the write lock
+        self.other = sqlite3.connect(database.get_db_path(), isolation_level=None)
+        self.other.execute("BEGIN IMMEDIATE")
+    
+    def tearDown(self):
+        self.other.close()
+        write_queue.stop()
+        super().tearDown()
+    
+    def create_author_in_thread(self, name):
+        """Start a queued write on another thread; returns the thread and its outcome."""
+        outcome = {}
+        
+        def write():
+            try:
+                outcome['author'] = models.create_author(name)
+            except sqlite3.OperationalError as e:
+                outcome['error'] = e
+        thread = threading.Thread(target=write)
+        thread.start()
+        return thread, outcome
+    
+    def test_budget_covers_the_profile_busy_timeout(self):
+        for name, pragmas in database.STORAGE_PROFILES.items():
+            with mock.patch.object(database, '_profile', name):
+                self.assertGreaterEqual(write_queue.retry_budget(),
+                                        pragmas.get('busy_timeout', 0) / 1000)
+    
+    def test_write_waits_out_a_lock_held_longer_than_the_backoff_cap(self):
+        thread, outcome = self.create_author_in_thread("Тарас Шевченко")
+        time.sleep(2.5)
+        self.other.execute("COMMIT")
+        thread.join()
+        
+        self.assertNotIn('error', outcome)
+        self.assertEqual(models.get_author_by_id(outcome['author'].id).name, "Тарас Шевченко")
+        self.assertGreater(self.writer.get_stats().retries, 0)
+    
+    def test_write_fails_once_the_budget_is_spent(self):
+        with mock.patch.object(write_queue, 'retry_budget', return_value=0.3):
+            started = time.monotonic()
+            thread, outcome = self.create_author_in_thread("Леся Українка")
+            thread.join()
+        
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+        self.assertTrue(write_queue.is_busy_error(outcome['error']))
+        self.assertEqual(self.writer.get_stats().failures, 1)
+
+
+class BusyCommit:
+    """Connection stand-in whose first COMMIT fails as if the database were locked."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.failures = 1
+    
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+    
+    def commit(self):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        self.conn.commit()
+
+
+class BusyCommitRetryTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.writer = write_queue.start()
+    
+    def tearDown(self):
+        write_queue.stop()
+        super().tearDown()
+    
+    def test_write_is_retried_after_a_busy_commit(self):
+        connections = {}
+        get_connection = database.get_connection
+        
+        def busy_commit_connection():
+            conn = get_connection()
+            return connections.setdefault(id(conn), BusyCommit(conn))
+        
+        with mock.patch.object(database, 'get_connection', busy_commit_connection):
+            author = models.create_author("Марко Вовчок")
+        
+        self.assertEqual(models.get_author_by_id(author.id).name, "Марко Вовчок")
+        self.assertEqual([a.name for a in models.get_all_authors()], ["Марко Вовчок"])
+        self.assertEqual(self.writer.get_stats().retries, 1)
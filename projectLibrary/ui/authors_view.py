@@ -4,11 +4,17 @@ Authors management view for Home Library application.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import models
+from database import get_generation
+from ui.row_patcher import RowPatcher
+from ui.tracked_view import TrackedView
 
 
-class AuthorsView(ttk.Frame):
+class AuthorsView(TrackedView):
     """Frame for managing authors."""
     
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = ('authors',)
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_ui()
@@ -44,17 +50,21 @@ class AuthorsView(ttk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Applies single-row changes after add/edit/delete
+        self.patcher = RowPatcher(self.tree, sort_key=lambda values: str(values[1]))
+        
         # Double-click to edit
         self.tree.bind('<Double-1>', lambda e: self.edit_author())
     
     def load_data(self):
         """Load authors from database."""
+        self.rendered_generation = get_generation(self.TABLES)
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         authors = models.get_all_authors()
         for author in authors:
-            self.tree.insert('', 'end', values=(author.id, author.name))
+            self.tree.insert('', 'end', iid=author.id, values=(author.id, author.name))
     
     def get_selected_id(self):
         """Get the ID of selected item."""
@@ -69,8 +79,9 @@ class AuthorsView(ttk.Frame):
         self.wait_window(dialog)
         if dialog.result:
             try:
-                models.create_author(dialog.result)
-                self.load_data()
+                author = models.create_author(dialog.result)
+                self.patcher.upsert(author.id, (author.id, author.name))
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося додати автора: {e}")
     
@@ -87,8 +98,9 @@ class AuthorsView(ttk.Frame):
             self.wait_window(dialog)
             if dialog.result:
                 try:
-                    models.update_author(author_id, dialog.result)
-                    self.load_data()
+                    author = models.update_author(author_id, dialog.result)
+                    self.patcher.upsert(author.id, (author.id, author.name))
+                    self.mark_rendered()
                 except Exception as e:
                     messagebox.showerror("Помилка", f"Не вдалося оновити автора: {e}")
     
@@ -102,7 +114,8 @@ class AuthorsView(ttk.Frame):
         if messagebox.askyesno("Підтвердження", "Ви впевнені, що хочете видалити цього автора?"):
             try:
                 models.delete_author(author_id)
-                self.load_data()
+                self.patcher.remove(author_id)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося видалити автора: {e}")
 
@@ -0,0 +1,119 @@
+"""
+Debug panel for Home Library application.
+Shows the per-function SQL statistics and the slow-query log collected by
+the instrumentation module. Opened with Ctrl+Shift+D when LIBRARY_INSTRUMENT=1.
+"""
+import tkinter as tk
+from tkinter import ttk
+import instrumentation
+import write_queue
+
+
+class DebugPanel(tk.Toplevel):
+    """Window with live instrumentation statistics."""
+    
+    # Milliseconds between refreshes
+    REFRESH_MS = 1000
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Діагностика SQL")
+        self.geometry("900x550")
+        self.shown_slow = ()
+        self.refresh_job = None
+        self.setup_ui()
+        self.refresh()
+    
+    def setup_ui(self):
+        """Setup the UI components."""
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill='x', padx=10, pady=5)
+        ttk.Button(toolbar, text="🔄 Скинути", command=self.reset).pack(side='left', padx=2)
+        self.writer_var = tk.StringVar()
+        ttk.Label(toolbar, textvariable=self.writer_var).pack(side='left', padx=10)
+        
+        panes = ttk.PanedWindow(self, orient='vertical')
+        panes.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        # Function statistics
+        stats_frame = ttk.Frame(panes)
+        columns = ('function', 'calls', 'statements', 'avg', 'max', 'histogram')
+        self.tree = ttk.Treeview(stats_frame, columns=columns, show='headings', selectmode='browse')
+        for column, text, width, anchor in (
+                ('function', "Функція", 220, 'w'),
+                ('calls', "Викликів", 70, 'e'),
+                ('statements', "Запитів", 70, 'e'),
+                ('avg', "Сер. мс", 70, 'e'),
+                ('max', "Макс. мс", 70, 'e'),
+                ('histogram', "Розподіл", 300, 'w')):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=anchor)
+        scrollbar = ttk.Scrollbar(stats_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        panes.add(stats_frame, weight=1)
+        
+        # Slow queries with their plans
+        slow_frame = ttk.LabelFrame(panes, text="Повільні запити", padding=5)
+        self.slow_text = tk.Text(slow_frame, wrap='none', height=10, font=('Courier', 9))
+        slow_scrollbar = ttk.Scrollbar(slow_frame, orient='vertical', command=self.slow_text.yview)
+        self.slow_text.configure(yscrollcommand=slow_scrollbar.set, state='disabled')
+        self.slow_text.pack(side='left', fill='both', expand=True)
+        slow_scrollbar.pack(side='right', fill='y')
+        panes.add(slow_frame, weight=1)
+    
+    def refresh(self):
+        """Update the tables and schedule the next refresh."""
+        stats = instrumentation.get_stats()
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for name, item in sorted(stats.items(), key=lambda pair: -pair[1].total_seconds):
+            average = item.total_seconds / item.calls * 1000 if item.calls else 0
+            self.tree.insert('', 'end', iid=name, values=(
+                name, item.calls, item.statements, f"{average:.1f}",
+                f"{item.max_seconds * 1000:.1f}",
+                instrumentation.format_histogram(item.histogram)
+            ))
+        selected = [iid for iid in selected if self.tree.exists(iid)]
+        if selected:
+            self.tree.selection_set(selected)
+        
+        writer = write_queue.get_stats()
+        if writer is not None:
+            self.writer_var.set(
+                f"Черга записів: {writer.queued} (макс. {writer.max_queued}), "
+                f"записів: {writer.writes}, транзакцій: {writer.transactions}, "
+                f"повторів: {writer.retries}, відмов: {writer.failures}")
+        
+        slow = instrumentation.get_slow_queries()
+        # Rewriting the text would reset its scroll position
+        newest = (len(slow), id(slow[-1])) if slow else None
+        if newest != self.shown_slow:
+            self.shown_slow = newest
+            self.show_slow_queries(slow)
+        
+        self.refresh_job = self.after(self.REFRESH_MS, self.refresh)
+    
+    def show_slow_queries(self, slow):
+        """Fill the slow-query text, newest first."""
+        self.slow_text.configure(state='normal')
+        self.slow_text.delete('1.0', 'end')
+        for query in reversed(slow):
+            self.slow_text.insert('end', f"{query.seconds * 1000:.1f} мс — {query.function}\n")
+            self.slow_text.insert('end', f"  {' '.join(query.sql.split())}\n")
+            for step in query.plan or []:
+                self.slow_text.insert('end', f"    {step}\n")
+            self.slow_text.insert('end', "\n")
+        self.slow_text.configure(state='disabled')
+    
+    def reset(self):
+        """Clear the collected statistics."""
+        instrumentation.reset()
+        self.shown_slow = ()
+        self.after_cancel(self.refresh_job)
+        self.refresh()
+    
+    def destroy(self):
+        self.after_cancel(self.refresh_job)
+        super().destroy()
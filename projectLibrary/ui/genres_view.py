@@ -4,11 +4,17 @@ Genres management view for Home Library application.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import models
+from database import get_generation
+from ui.row_patcher import RowPatcher
+from ui.tracked_view import TrackedView
 
 
-class GenresView(ttk.Frame):
+class GenresView(TrackedView):
     """Frame for managing genres."""
     
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = ('genres',)
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_ui()
@@ -44,17 +50,21 @@ class GenresView(ttk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Applies single-row changes after add/edit/delete
+        self.patcher = RowPatcher(self.tree, sort_key=lambda values: str(values[1]))
+        
         # Double-click to edit
         self.tree.bind('<Double-1>', lambda e: self.edit_genre())
     
     def load_data(self):
         """Load genres from database."""
+        self.rendered_generation = get_generation(self.TABLES)
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         genres = models.get_all_genres()
         for genre in genres:
-            self.tree.insert('', 'end', values=(genre.id, genre.name))
+            self.tree.insert('', 'end', iid=genre.id, values=(genre.id, genre.name))
     
     def get_selected_id(self):
         """Get the ID of selected item."""
@@ -69,8 +79,9 @@ class GenresView(ttk.Frame):
         self.wait_window(dialog)
         if dialog.result:
             try:
-                models.create_genre(dialog.result)
-                self.load_data()
+                genre = models.create_genre(dialog.result)
+                self.patcher.upsert(genre.id, (genre.id, genre.name))
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося додати жанр: {e}")
     
@@ -87,8 +98,9 @@ class GenresView(ttk.Frame):
             self.wait_window(dialog)
             if dialog.result:
                 try:
-                    models.update_genre(genre_id, dialog.result)
-                    self.load_data()
+                    genre = models.update_genre(genre_id, dialog.result)
+                    self.patcher.upsert(genre.id, (genre.id, genre.name))
+                    self.mark_rendered()
                 except Exception as e:
                     messagebox.showerror("Помилка", f"Не вдалося оновити жанр: {e}")
     
@@ -102,7 +114,8 @@ class GenresView(ttk.Frame):
         if messagebox.askyesno("Підтвердження", "Ви впевнені, що хочете видалити цей жанр?"):
             try:
                 models.delete_genre(genre_id)
-                self.load_data()
+                self.patcher.remove(genre_id)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося видалити жанр: {e}")
 
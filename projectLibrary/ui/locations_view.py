@@ -4,11 +4,17 @@ Storage Locations management view for Home Library application.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import models
+from database import get_generation
+from ui.row_patcher import RowPatcher
+from ui.tracked_view import TrackedView
 
 
-class LocationsView(ttk.Frame):
+class LocationsView(TrackedView):
     """Frame for managing storage locations."""
     
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = ('storage_locations',)
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_ui()
@@ -46,17 +52,21 @@ class LocationsView(ttk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Applies single-row changes after add/edit/delete
+        self.patcher = RowPatcher(self.tree, sort_key=lambda values: (str(values[1]), str(values[2])))
+        
         # Double-click to edit
         self.tree.bind('<Double-1>', lambda e: self.edit_location())
     
     def load_data(self):
         """Load locations from database."""
+        self.rendered_generation = get_generation(self.TABLES)
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         locations = models.get_all_storage_locations()
         for loc in locations:
-            self.tree.insert('', 'end', values=(loc.id, loc.cabinet, loc.shelf))
+            self.tree.insert('', 'end', iid=loc.id, values=(loc.id, loc.cabinet, loc.shelf))
     
     def get_selected_id(self):
         """Get the ID of selected item."""
@@ -71,8 +81,9 @@ class LocationsView(ttk.Frame):
         self.wait_window(dialog)
         if dialog.result:
             try:
-                models.create_storage_location(dialog.result[0], dialog.result[1])
-                self.load_data()
+                loc = models.create_storage_location(dialog.result[0], dialog.result[1])
+                self.patcher.upsert(loc.id, (loc.id, loc.cabinet, loc.shelf))
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося додати місце: {e}")
     
@@ -90,8 +101,9 @@ class LocationsView(ttk.Frame):
             self.wait_window(dialog)
             if dialog.result:
                 try:
-                    models.update_storage_location(location_id, dialog.result[0], dialog.result[1])
-                    self.load_data()
+                    loc = models.update_storage_location(location_id, dialog.result[0], dialog.result[1])
+                    self.patcher.upsert(loc.id, (loc.id, loc.cabinet, loc.shelf))
+                    self.mark_rendered()
                 except Exception as e:
                     messagebox.showerror("Помилка", f"Не вдалося оновити місце: {e}")
     
@@ -105,7 +117,8 @@ class LocationsView(ttk.Frame):
         if messagebox.askyesno("Підтвердження", "Ви впевнені, що хочете видалити це місце?"):
             try:
                 models.delete_storage_location(location_id)
-                self.load_data()
+                self.patcher.remove(location_id)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося видалити місце: {e}")
 
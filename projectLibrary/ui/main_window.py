@@ -2,13 +2,18 @@
 Main window for Home Library application.
 """
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox, filedialog
+import exporter
+import instrumentation
+from database import get_generation, get_flush_lag, replica_enabled
 from ui.publications_view import PublicationsView
 from ui.authors_view import AuthorsView
 from ui.genres_view import GenresView
 from ui.types_view import TypesView
 from ui.locations_view import LocationsView
 from ui.search_view import SearchView
+from ui import tasks
+from ui.debug_panel import DebugPanel
 
 
 class MainWindow:
@@ -24,7 +29,13 @@ class MainWindow:
         self.setup_style()
         
         # Create main layout
+        self.setup_menu()
         self.setup_ui()
+        
+        # Hidden SQL statistics window, only when instrumentation is on
+        self.debug_panel = None
+        if instrumentation.is_enabled():
+            self.root.bind_all('<Control-Shift-D>', lambda e: self.show_debug_panel())
     
     def setup_style(self):
         """Configure ttk styles for better appearance."""
@@ -44,6 +55,16 @@ class MainWindow:
         # Configure Notebook tabs
         style.configure("TNotebook.Tab", padding=[15, 5], font=('Helvetica', 10))
     
+    def setup_menu(self):
+        """Setup the menu bar."""
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=False)
+        file_menu.add_command(label="Експорт каталогу...", command=self.export_catalog)
+        file_menu.add_separator()
+        file_menu.add_command(label="Вихід", command=self.root.destroy)
+        menubar.add_cascade(label="Файл", menu=file_menu)
+        self.root.config(menu=menubar)
+    
     def setup_ui(self):
         """Setup the main UI."""
         # Header
@@ -68,55 +89,124 @@ class MainWindow:
         # Separator
         ttk.Separator(self.root, orient='horizontal').pack(fill='x', pady=5)
         
+        # Status bar with a busy indicator for background database calls.
+        # Created before the tabs, which start loading data right away.
+        status_bar = ttk.Frame(self.root, relief='sunken')
+        status_bar.pack(fill='x', side='bottom')
+        self.status_message = "Готово"
+        self.status_var = tk.StringVar(value=self.status_message)
+        ttk.Label(status_bar, textvariable=self.status_var, anchor='w').pack(side='left', fill='x', expand=True)
+        self.busy_bar = ttk.Progressbar(status_bar, mode='indeterminate', length=120)
+        # Unsaved changes of the in-memory replica
+        if replica_enabled():
+            self.flush_var = tk.StringVar()
+            ttk.Label(status_bar, textvariable=self.flush_var).pack(side='right', padx=5)
+            self.show_flush_lag()
+        tasks.start_runner(self.root, on_busy=self.on_busy)
+        
         # Notebook (tabs)
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=(0, 10))
         
-        # Create tabs
-        self.publications_view = PublicationsView(self.notebook)
-        self.notebook.add(self.publications_view, text="📖 Видання")
-        
-        self.authors_view = AuthorsView(self.notebook)
-        self.notebook.add(self.authors_view, text="✍️ Автори")
-        
-        self.genres_view = GenresView(self.notebook)
-        self.notebook.add(self.genres_view, text="🏷️ Жанри")
-        
-        self.types_view = TypesView(self.notebook)
-        self.notebook.add(self.types_view, text="📋 Види")
-        
-        self.locations_view = LocationsView(self.notebook)
-        self.notebook.add(self.locations_view, text="📍 Місця")
-        
-        self.search_view = SearchView(self.notebook)
-        self.notebook.add(self.search_view, text="🔍 Пошук")
-        
-        # Bind tab change to refresh data
+        # Tabs are empty frames; each view is built and loaded the first
+        # time its tab is selected
+        self.tabs = {}
+        self.current_tab = None
+        self.add_tab('publications_view', "📖 Видання", PublicationsView)
+        self.add_tab('authors_view', "✍️ Автори", AuthorsView)
+        self.add_tab('genres_view', "🏷️ Жанри", GenresView)
+        self.add_tab('types_view', "📋 Види", TypesView)
+        self.add_tab('locations_view', "📍 Місця", LocationsView)
+        self.add_tab('search_view', "🔍 Пошук",
+                     lambda parent: SearchView(parent, on_status=self.set_status))
+        
+        # Bind tab change to build or refresh the selected view
         self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
-        
-        # Status bar
-        self.status_var = tk.StringVar(value="Готово")
-        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief='sunken', anchor='w')
-        status_bar.pack(fill='x', side='bottom')
+        self.on_tab_changed()
+    
+    def add_tab(self, attribute, text, factory):
+        """Add a notebook tab whose view is created by factory(parent) on first use."""
+        container = ttk.Frame(self.notebook)
+        self.notebook.add(container, text=text)
+        self.tabs[str(container)] = (attribute, container, factory)
+        setattr(self, attribute, None)
+    
+    def on_busy(self, pending):
+        """Show or hide the busy indicator while database calls are running."""
+        if pending:
+            self.status_var.set("⏳ Завантаження даних...")
+            if not self.busy_bar.winfo_manager():
+                self.busy_bar.pack(side='right', padx=5)
+                self.busy_bar.start(15)
+        else:
+            self.status_var.set(self.status_message)
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+    
+    def export_catalog(self):
+        """Ask for a file and export the catalog to it in the background."""
+        filetypes = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+        if exporter.EXCEL_SUPPORT:
+            filetypes.append(("Excel", "*.xlsx"))
+        path = filedialog.asksaveasfilename(parent=self.root, title="Експорт каталогу",
+                                            defaultextension=".csv", filetypes=filetypes)
+        if not path:
+            return
+        
+        tasks.submit(
+            exporter.export_catalog, path, channel='export',
+            on_done=lambda count: messagebox.showinfo(
+                "Експорт", f"Експортовано видань: {count}\n{path}"),
+            on_error=lambda e: messagebox.showerror(
+                "Помилка", f"Не вдалося експортувати каталог: {e}")
+        )
+    
+    def show_debug_panel(self):
+        """Open the SQL statistics window, or raise it if already open."""
+        if self.debug_panel is not None and self.debug_panel.winfo_exists():
+            self.debug_panel.lift()
+            return
+        self.debug_panel = DebugPanel(self.root)
+    
+    def show_flush_lag(self):
+        """Show how long committed changes have waited to be saved to disk."""
+        lag = get_flush_lag()
+        if lag:
+            self.flush_var.set(f"💾 Не збережено: {lag:.0f} с")
+        else:
+            self.flush_var.set("💾 Збережено")
+        self.root.after(1000, self.show_flush_lag)
     
-    def on_tab_changed(self, event):
-        """Handle tab change event - refresh data in the selected tab."""
+    def set_status(self, message):
+        """Set the status bar message shown while no database call is running."""
+        self.status_message = message
+        if not self.busy_bar.winfo_manager():
+            self.status_var.set(message)
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected view on first use, otherwise refresh its data
+        if any of its tables changed since it was last loaded."""
         selected_tab = self.notebook.select()
-        tab_name = self.notebook.tab(selected_tab, 'text')
-        
-        # Refresh data in the current tab
-        if "Видання" in tab_name:
-            self.publications_view.load_data()
-        elif "Автори" in tab_name:
-            self.authors_view.load_data()
-        elif "Жанри" in tab_name:
-            self.genres_view.load_data()
-        elif "Види" in tab_name:
-            self.types_view.load_data()
-        elif "Місця" in tab_name:
-            self.locations_view.load_data()
-        elif "Пошук" in tab_name:
-            self.search_view.refresh_dropdowns()
+        if not selected_tab or selected_tab == self.current_tab:
+            return
+        self.current_tab = selected_tab
+        attribute, container, factory = self.tabs[selected_tab]
+        
+        view = getattr(self, attribute)
+        if view is None:
+            # A new view loads its data itself
+            view = factory(container)
+            view.pack(fill='both', expand=True)
+            setattr(self, attribute, view)
+        elif view.rendered_generation == get_generation(view.TABLES):
+            return
+        elif attribute == 'search_view':
+            view.refresh_dropdowns()
+        elif attribute == 'publications_view':
+            # Keep the scroll position and selection, as in-place edits do
+            view.load_data(keep_position=True)
+        else:
+            view.load_data()
 
 
 def create_main_window():
@@ -1,16 +1,42 @@
 """
 Publications management view for Home Library application.
 """
+import bisect
 import tkinter as tk
 from tkinter import ttk, messagebox
 import models
+from database import TRACKED_TABLES, get_generation
+from ui.tracked_view import TrackedView
+from ui.virtual_list import VirtualList
+from ui import tasks
 
 
-class PublicationsView(ttk.Frame):
+def publication_values(row):
+    """Format a display row from models.list_publication_rows() for the
+    publication grids."""
+    _, title, kind, year, authors, genres, pub_type, location = row
+    kind_display = "📚 Книга" if kind == 'book' else "📰 Періодика"
+    return (title, kind_display, authors or "-", genres or "-", pub_type or "-",
+            year or "-", location or "-")
+
+
+def load_reference_data():
+    """Read the reference lists used by publication forms (runs on the worker)."""
+    return (models.get_all_authors(), models.get_all_genres(),
+            models.get_all_publication_types(), models.get_all_storage_locations())
+
+
+class PublicationsView(TrackedView):
     """Frame for managing publications (books and periodicals)."""
     
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = TRACKED_TABLES
+    
     def __init__(self, parent):
         super().__init__(parent)
+        self.publication_keys = []
+        # Title of each listed publication id, to bisect for its key
+        self.key_titles = {}
         self.setup_ui()
         self.load_data()
     
@@ -27,72 +53,120 @@ class PublicationsView(ttk.Frame):
         ttk.Button(toolbar, text="➕ Додати", command=self.add_publication).pack(side='left', padx=2)
         ttk.Button(toolbar, text="✏️ Редагувати", command=self.edit_publication).pack(side='left', padx=2)
         ttk.Button(toolbar, text="🗑️ Видалити", command=self.delete_publication).pack(side='left', padx=2)
+        ttk.Button(toolbar, text="📦 Перемістити", command=self.move_publications).pack(side='left', padx=2)
         ttk.Button(toolbar, text="🔄 Оновити", command=self.load_data).pack(side='left', padx=2)
         
-        # Treeview with scrollbar
-        tree_frame = ttk.Frame(self)
-        tree_frame.pack(fill='both', expand=True, padx=10, pady=5)
-        
+        # Virtual list: only the visible rows exist as Treeview items
         columns = ('id', 'title', 'kind', 'authors', 'genres', 'type', 'year', 'location')
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', selectmode='browse')
-        
-        self.tree.heading('id', text='ID')
-        self.tree.heading('title', text='Назва')
-        self.tree.heading('kind', text='Тип')
-        self.tree.heading('authors', text='Автор(и)')
-        self.tree.heading('genres', text='Жанр(и)')
-        self.tree.heading('type', text='Вид')
-        self.tree.heading('year', text='Рік')
-        self.tree.heading('location', text='Місце')
-        
-        self.tree.column('id', width=40, anchor='center')
-        self.tree.column('title', width=200)
-        self.tree.column('kind', width=80)
-        self.tree.column('authors', width=150)
-        self.tree.column('genres', width=120)
-        self.tree.column('type', width=120)
-        self.tree.column('year', width=50, anchor='center')
-        self.tree.column('location', width=120)
-        
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        self.tree.grid(row=0, column=0, sticky='nsew')
-        v_scrollbar.grid(row=0, column=1, sticky='ns')
-        h_scrollbar.grid(row=1, column=0, sticky='ew')
-        
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+        self.list = VirtualList(self, columns, selectmode='extended')
+        self.list.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        self.list.heading('id', text='ID')
+        self.list.heading('title', text='Назва')
+        self.list.heading('kind', text='Тип')
+        self.list.heading('authors', text='Автор(и)')
+        self.list.heading('genres', text='Жанр(и)')
+        self.list.heading('type', text='Вид')
+        self.list.heading('year', text='Рік')
+        self.list.heading('location', text='Місце')
+        
+        self.list.column('id', width=40, anchor='center')
+        self.list.column('title', width=200)
+        self.list.column('kind', width=80)
+        self.list.column('authors', width=150)
+        self.list.column('genres', width=120)
+        self.list.column('type', width=120)
+        self.list.column('year', width=50, anchor='center')
+        self.list.column('location', width=120)
         
         # Double-click to edit
-        self.tree.bind('<Double-1>', lambda e: self.edit_publication())
+        self.list.tree.bind('<Double-1>', lambda e: self.edit_publication())
+    
+    def load_data(self, keep_position=False):
+        """Load publications from database.
+        
+        Only the ordered (title, id) keys are read here, on the background
+        worker; rows are fetched as they scroll into view.
+        """
+        self.rendered_generation = get_generation(self.TABLES)
+        tasks.submit(models.get_publication_keys, channel='publications',
+                     on_done=lambda keys: self.show_keys(keys, keep_position))
     
-    def load_data(self):
-        """Load publications from database."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        publications = models.get_all_publications()
-        for pub in publications:
-            kind_display = "📚 Книга" if pub.publication_kind == 'book' else "📰 Періодика"
-            authors = ", ".join([a.name for a in pub.authors]) if pub.authors else "-"
-            genres = ", ".join([g.name for g in pub.genres]) if pub.genres else "-"
-            pub_type = pub.publication_type.name if pub.publication_type else "-"
-            year = pub.year if pub.year else "-"
-            location = str(pub.storage_location) if pub.storage_location else "-"
-            
-            self.tree.insert('', 'end', values=(
-                pub.id, pub.title, kind_display, authors, genres, pub_type, year, location
-            ))
+    def show_keys(self, keys, keep_position=False):
+        """Show a freshly loaded list of (title, id) keys."""
+        self.publication_keys = keys
+        self.key_titles = {pub_id: title for title, pub_id in keys}
+        self.list.set_source(len(self.publication_keys), self.fetch_rows, keep_position)
+    
+    def fetch_rows(self, start, stop):
+        """Get display rows for a slice of the publication list.
+        
+        Returns one row per requested position; publications deleted
+        elsewhere since the keys were loaded come back as blank rows, so
+        the rows after them stay at their positions.
+        """
+        ids = [pub_id for _, pub_id in self.publication_keys[start:stop]]
+        rows = {row.id: row for row in models.list_publication_rows(ids)}
+        return [(pub_id, (pub_id,) + publication_values(rows[pub_id])) if pub_id in rows
+                else (None, ())
+                for pub_id in ids]
+    
+    def find_row(self, pub_id):
+        """Get the list position of a publication, or None.
+        
+        The keys are sorted, so the position is found by bisecting for
+        the publication's (title, id).
+        """
+        title = self.key_titles.get(pub_id)
+        if title is None:
+            return None
+        return bisect.bisect_left(self.publication_keys, (title, pub_id))
+    
+    def insert_row(self, pub):
+        """Insert a publication row at its sorted position."""
+        index = bisect.bisect_left(self.publication_keys, (pub.title, pub.id))
+        self.publication_keys.insert(index, (pub.title, pub.id))
+        self.key_titles[pub.id] = pub.title
+        self.list.insert_row(index)
+        return index
+    
+    def remove_row(self, pub_id):
+        """Remove a publication row, if it is in the list."""
+        index = self.find_row(pub_id)
+        if index is not None:
+            del self.publication_keys[index]
+            del self.key_titles[pub_id]
+            self.list.remove_row(index)
+    
+    def update_row(self, pub):
+        """Refresh a publication row, moving it if its title changed."""
+        index = self.find_row(pub.id)
+        if index is not None and self.publication_keys[index][0] == pub.title:
+            self.list.update_row(index)
+            return
+        
+        selected = self.get_selected_id() == pub.id
+        self.remove_row(pub.id)
+        index = self.insert_row(pub)
+        if selected:
+            self.list.select_row(index, pub.id)
+    
+    def remove_rows(self, pub_ids):
+        """Remove several publication rows at once."""
+        pub_ids = set(pub_ids)
+        self.publication_keys = [key for key in self.publication_keys if key[1] not in pub_ids]
+        for pub_id in pub_ids:
+            self.key_titles.pop(pub_id, None)
+        self.list.clear_selection()
+        self.list.set_source(len(self.publication_keys), self.fetch_rows, keep_position=True)
     
     def get_selected_id(self):
         """Get the ID of selected item."""
-        selection = self.tree.selection()
-        if not selection:
-            return None
-        return self.tree.item(selection[0])['values'][0]
+        return self.list.get_selected_key()
+    
+    def get_selected_ids(self):
+        """Get the IDs of all selected items."""
+        return self.list.get_selected_keys()
     
     def add_publication(self):
         """Show dialog to add new publication."""
@@ -100,7 +174,7 @@ class PublicationsView(ttk.Frame):
         self.wait_window(dialog)
         if dialog.result:
             try:
-                models.create_publication(
+                publication = models.create_publication(
                     title=dialog.result['title'],
                     publication_kind=dialog.result['kind'],
                     year=dialog.result['year'],
@@ -109,7 +183,8 @@ class PublicationsView(ttk.Frame):
                     author_ids=dialog.result['author_ids'],
                     genre_ids=dialog.result['genre_ids']
                 )
-                self.load_data()
+                self.insert_row(publication)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося додати видання: {e}")
     
@@ -126,7 +201,7 @@ class PublicationsView(ttk.Frame):
             self.wait_window(dialog)
             if dialog.result:
                 try:
-                    models.update_publication(
+                    changes = models.update_publication(
                         publication_id=pub_id,
                         title=dialog.result['title'],
                         publication_kind=dialog.result['kind'],
@@ -136,23 +211,52 @@ class PublicationsView(ttk.Frame):
                         author_ids=dialog.result['author_ids'],
                         genre_ids=dialog.result['genre_ids']
                     )
-                    self.load_data()
+                    if changes is None:
+                        self.remove_row(pub_id)
+                    elif changes.changed:
+                        self.update_row(changes.publication)
+                    self.mark_rendered()
                 except Exception as e:
                     messagebox.showerror("Помилка", f"Не вдалося оновити видання: {e}")
     
     def delete_publication(self):
-        """Delete selected publication."""
-        pub_id = self.get_selected_id()
-        if not pub_id:
+        """Delete the selected publications."""
+        pub_ids = self.get_selected_ids()
+        if not pub_ids:
             messagebox.showwarning("Увага", "Виберіть видання для видалення")
             return
         
-        if messagebox.askyesno("Підтвердження", "Ви впевнені, що хочете видалити це видання?"):
+        if len(pub_ids) == 1:
+            question = "Ви впевнені, що хочете видалити це видання?"
+        else:
+            question = f"Ви впевнені, що хочете видалити вибрані видання ({len(pub_ids)})?"
+        if messagebox.askyesno("Підтвердження", question):
             try:
-                models.delete_publication(pub_id)
-                self.load_data()
+                deleted = models.delete_publications(pub_ids)
+                self.remove_rows(deleted)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося видалити видання: {e}")
+    
+    def move_publications(self):
+        """Move the selected publications to another storage location."""
+        pub_ids = self.get_selected_ids()
+        if not pub_ids:
+            messagebox.showwarning("Увага", "Виберіть видання для переміщення")
+            return
+        
+        dialog = MoveDialog(self, len(pub_ids))
+        self.wait_window(dialog)
+        if dialog.result:
+            try:
+                models.update_publications([
+                    {'id': pub_id, 'storage_location_id': dialog.result['location_id']}
+                    for pub_id in pub_ids
+                ])
+                self.list.refresh()
+                self.mark_rendered()
+            except Exception as e:
+                messagebox.showerror("Помилка", f"Не вдалося перемістити видання: {e}")
 
 
 class PublicationDialog(tk.Toplevel):
@@ -170,16 +274,31 @@ class PublicationDialog(tk.Toplevel):
         self.geometry("500x550")
         self.minsize(400, 450)
         
-        # Load reference data
-        self.all_authors = models.get_all_authors()
-        self.all_genres = models.get_all_genres()
-        self.all_types = models.get_all_publication_types()
-        self.all_locations = models.get_all_storage_locations()
+        # Reference data is loaded in the background and filled in when ready
+        self.all_authors = []
+        self.all_genres = []
+        self.all_types = []
+        self.all_locations = []
         
         self.setup_ui()
+        tasks.submit(load_reference_data, on_done=self.on_reference_loaded)
+    
+    def on_reference_loaded(self, data):
+        """Fill the choice lists with the loaded reference data."""
+        if not self.winfo_exists():
+            return
+        self.all_authors, self.all_genres, self.all_types, self.all_locations = data
         
-        if publication:
+        self.type_combo['values'] = [""] + [t.name for t in self.all_types]
+        self.location_combo['values'] = [""] + [str(loc) for loc in self.all_locations]
+        for author in self.all_authors:
+            self.authors_listbox.insert('end', author.name)
+        for genre in self.all_genres:
+            self.genres_listbox.insert('end', genre.name)
+        
+        if self.publication:
             self.populate_form()
+        self.save_button.config(state='normal')
     
     def setup_ui(self):
         """Setup the UI components."""
@@ -207,15 +326,13 @@ class PublicationDialog(tk.Toplevel):
         # Publication type
         ttk.Label(main_frame, text="Вид видання:").grid(row=3, column=0, sticky='w', pady=2)
         self.type_var = tk.StringVar()
-        type_values = [""] + [t.name for t in self.all_types]
-        self.type_combo = ttk.Combobox(main_frame, textvariable=self.type_var, values=type_values, state='readonly', width=30)
+        self.type_combo = ttk.Combobox(main_frame, textvariable=self.type_var, values=[""], state='readonly', width=30)
         self.type_combo.grid(row=3, column=1, sticky='w', pady=2)
         
         # Storage location
         ttk.Label(main_frame, text="Місце зберігання:").grid(row=4, column=0, sticky='w', pady=2)
         self.location_var = tk.StringVar()
-        location_values = [""] + [str(loc) for loc in self.all_locations]
-        self.location_combo = ttk.Combobox(main_frame, textvariable=self.location_var, values=location_values, state='readonly', width=30)
+        self.location_combo = ttk.Combobox(main_frame, textvariable=self.location_var, values=[""], state='readonly', width=30)
         self.location_combo.grid(row=4, column=1, sticky='w', pady=2)
         
         # Authors (multi-select listbox)
@@ -227,9 +344,6 @@ class PublicationDialog(tk.Toplevel):
         authors_scroll = ttk.Scrollbar(authors_frame, orient='vertical', command=self.authors_listbox.yview)
         self.authors_listbox.configure(yscrollcommand=authors_scroll.set)
         
-        for author in self.all_authors:
-            self.authors_listbox.insert('end', author.name)
-        
         self.authors_listbox.pack(side='left', fill='both', expand=True)
         authors_scroll.pack(side='right', fill='y')
         
@@ -242,9 +356,6 @@ class PublicationDialog(tk.Toplevel):
         genres_scroll = ttk.Scrollbar(genres_frame, orient='vertical', command=self.genres_listbox.yview)
         self.genres_listbox.configure(yscrollcommand=genres_scroll.set)
         
-        for genre in self.all_genres:
-            self.genres_listbox.insert('end', genre.name)
-        
         self.genres_listbox.pack(side='left', fill='both', expand=True)
         genres_scroll.pack(side='right', fill='y')
         
@@ -257,7 +368,9 @@ class PublicationDialog(tk.Toplevel):
         btn_frame = ttk.Frame(main_frame)
         btn_frame.grid(row=8, column=0, columnspan=2, pady=(15, 0))
         
-        ttk.Button(btn_frame, text="💾 Зберегти", command=self.save).pack(side='left', padx=5)
+        # Saving is enabled once the reference data has been loaded
+        self.save_button = ttk.Button(btn_frame, text="💾 Зберегти", command=self.save, state='disabled')
+        self.save_button.pack(side='left', padx=5)
         ttk.Button(btn_frame, text="❌ Скасувати", command=self.destroy).pack(side='left')
         
         # Configure grid weights
@@ -282,15 +395,15 @@ class PublicationDialog(tk.Toplevel):
             self.location_var.set(str(pub.storage_location))
         
         # Select authors
-        author_names = [a.name for a in pub.authors]
+        author_ids = {a.id for a in pub.authors}
         for i, author in enumerate(self.all_authors):
-            if author.name in author_names:
+            if author.id in author_ids:
                 self.authors_listbox.selection_set(i)
         
         # Select genres
-        genre_names = [g.name for g in pub.genres]
+        genre_ids = {g.id for g in pub.genres}
         for i, genre in enumerate(self.all_genres):
-            if genre.name in genre_names:
+            if genre.id in genre_ids:
                 self.genres_listbox.selection_set(i)
     
     def save(self):
@@ -312,23 +425,9 @@ class PublicationDialog(tk.Toplevel):
                 messagebox.showwarning("Увага", "Некоректний рік")
                 return
         
-        # Get type ID
-        type_id = None
-        type_name = self.type_var.get()
-        if type_name:
-            for t in self.all_types:
-                if t.name == type_name:
-                    type_id = t.id
-                    break
-        
-        # Get location ID
-        location_id = None
-        location_str = self.location_var.get()
-        if location_str:
-            for loc in self.all_locations:
-                if str(loc) == location_str:
-                    location_id = loc.id
-                    break
+        # Get type and location IDs
+        type_id = models.get_publication_type_ids_by_name().get(self.type_var.get())
+        location_id = models.get_storage_location_ids_by_label().get(self.location_var.get())
         
         # Get selected authors
         author_ids = []
@@ -350,3 +449,47 @@ class PublicationDialog(tk.Toplevel):
             'genre_ids': genre_ids
         }
         self.destroy()
+
+
+class MoveDialog(tk.Toplevel):
+    """Dialog for choosing a new storage location for several publications."""
+    
+    def __init__(self, parent, count):
+        super().__init__(parent)
+        self.title("Перемістити видання")
+        self.result = None
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+        
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill='both', expand=True)
+        
+        ttk.Label(main_frame, text=f"Вибрано видань: {count}").grid(row=0, column=0, columnspan=2, sticky='w', pady=2)
+        ttk.Label(main_frame, text="Нове місце:").grid(row=1, column=0, sticky='w', pady=2)
+        self.location_var = tk.StringVar()
+        self.location_combo = ttk.Combobox(main_frame, textvariable=self.location_var, values=[""], state='readonly', width=30)
+        self.location_combo.grid(row=1, column=1, sticky='w', pady=2)
+        
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.grid(row=2, column=0, columnspan=2, pady=(15, 0))
+        self.save_button = ttk.Button(btn_frame, text="📦 Перемістити", command=self.save, state='disabled')
+        self.save_button.pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="❌ Скасувати", command=self.destroy).pack(side='left')
+        
+        self.bind('<Escape>', lambda e: self.destroy())
+        tasks.submit(models.get_all_storage_locations, on_done=self.on_locations_loaded)
+    
+    def on_locations_loaded(self, locations):
+        """Fill the location list once it has been loaded."""
+        if not self.winfo_exists():
+            return
+        self.location_combo['values'] = [""] + [str(loc) for loc in locations]
+        self.save_button.config(state='normal')
+    
+    def save(self):
+        """Accept the chosen location; an empty choice clears the location."""
+        self.result = {
+            'location_id': models.get_storage_location_ids_by_label().get(self.location_var.get())
+        }
+        self.destroy()
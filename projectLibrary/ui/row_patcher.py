@@ -0,0 +1,65 @@
+"""
+Incremental row updates for Home Library application.
+Applies single-row changes to sorted Treeviews without reloading them.
+"""
+
+
+class RowPatcher:
+    """Queue row changes for a sorted Treeview and apply them on idle.
+    
+    Items use the entity id as their iid. Changes queued during one Tk
+    event cycle are applied together in a single after_idle pass, and the
+    scroll position and selection of the tree are left untouched.
+    """
+    
+    def __init__(self, tree, sort_key):
+        self.tree = tree
+        self.sort_key = sort_key
+        self.pending = {}
+        self.scheduled = False
+    
+    def upsert(self, key, values):
+        """Insert a row, or update it and move it to its sorted position."""
+        self.pending[str(key)] = values
+        self.schedule()
+    
+    def remove(self, key):
+        """Remove a row."""
+        self.pending[str(key)] = None
+        self.schedule()
+    
+    def schedule(self):
+        """Apply the queued changes once the current event cycle is done."""
+        if not self.scheduled:
+            self.scheduled = True
+            self.tree.after_idle(self.flush)
+    
+    def flush(self):
+        """Apply all queued changes."""
+        self.scheduled = False
+        pending, self.pending = self.pending, {}
+        for iid, values in pending.items():
+            if values is None:
+                if self.tree.exists(iid):
+                    self.tree.delete(iid)
+                continue
+            
+            index = self.sorted_index(iid, values)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+                self.tree.move(iid, '', index)
+            else:
+                self.tree.insert('', index, iid=iid, values=values)
+    
+    def sorted_index(self, iid, values):
+        """Binary-search the position of a row among the other rows."""
+        items = [item for item in self.tree.get_children() if item != iid]
+        key = self.sort_key(values)
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.sort_key(self.tree.item(items[mid], 'values')) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
@@ -1,17 +1,50 @@
 """
 Search view for Home Library application.
 """
+import statistics
+import time
 import tkinter as tk
+from collections import deque
 from tkinter import ttk
 import models
+from database import get_generation
+from ui.publications_view import publication_values, load_reference_data
+from ui.virtual_list import VirtualList
+from ui import tasks
 
 
 class SearchView(ttk.Frame):
     """Frame for searching publications."""
     
-    def __init__(self, parent):
+    # Tables shown in the dropdowns; the view is stale after a write to any of them
+    TABLES = ('authors', 'genres', 'publication_types', 'storage_locations')
+    
+    # Maximum number of ranked results shown in full-text mode
+    FULLTEXT_LIMIT = 500
+    # Default pause in typing, in milliseconds, before a live search starts
+    DEBOUNCE_MS = 300
+    # Number of recent searches used for the latency median
+    LATENCY_SAMPLES = 50
+    # Kind filter choices
+    KINDS = {"📚 Книга": 'book', "📰 Періодика": 'periodical'}
+    
+    def __init__(self, parent, on_status=None, debounce_ms=None):
         super().__init__(parent)
+        self.on_status = on_status
+        self.debounce_ms = self.DEBOUNCE_MS if debounce_ms is None else debounce_ms
+        self.debounce_id = None
+        self.changed_at = None
+        self.generation = 0
+        self.latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self.results = []
+        self.all_authors = []
+        self.all_genres = []
+        self.all_types = []
+        self.all_locations = []
+        self.facets = None
+        self.decades = []
         self.setup_ui()
+        self.refresh_dropdowns()
     
     def setup_ui(self):
         """Setup the UI components."""
@@ -23,47 +56,68 @@ class SearchView(ttk.Frame):
         search_frame = ttk.LabelFrame(self, text="Параметри пошуку", padding=10)
         search_frame.pack(fill='x', padx=10, pady=5)
         
-        # Load reference data
-        self.all_authors = models.get_all_authors()
-        self.all_genres = models.get_all_genres()
-        self.all_types = models.get_all_publication_types()
-        
         # Title search
         ttk.Label(search_frame, text="Назва:").grid(row=0, column=0, sticky='w', pady=3, padx=5)
         self.title_var = tk.StringVar()
         self.title_entry = ttk.Entry(search_frame, textvariable=self.title_var, width=30)
         self.title_entry.grid(row=0, column=1, sticky='w', pady=3)
         
-        # Author filter
-        ttk.Label(search_frame, text="Автор:").grid(row=0, column=2, sticky='w', pady=3, padx=(20, 5))
-        self.author_var = tk.StringVar()
-        author_values = ["-- Всі автори --"] + [a.name for a in self.all_authors]
-        self.author_combo = ttk.Combobox(search_frame, textvariable=self.author_var, 
-                                          values=author_values, state='readonly', width=25)
-        self.author_combo.current(0)
-        self.author_combo.grid(row=0, column=3, sticky='w', pady=3)
-        
-        # Genre filter
-        ttk.Label(search_frame, text="Жанр:").grid(row=1, column=0, sticky='w', pady=3, padx=5)
-        self.genre_var = tk.StringVar()
-        genre_values = ["-- Всі жанри --"] + [g.name for g in self.all_genres]
-        self.genre_combo = ttk.Combobox(search_frame, textvariable=self.genre_var,
-                                         values=genre_values, state='readonly', width=25)
-        self.genre_combo.current(0)
-        self.genre_combo.grid(row=1, column=1, sticky='w', pady=3)
-        
         # Type filter
-        ttk.Label(search_frame, text="Вид:").grid(row=1, column=2, sticky='w', pady=3, padx=(20, 5))
+        ttk.Label(search_frame, text="Вид:").grid(row=0, column=2, sticky='w', pady=3, padx=(20, 5))
         self.type_var = tk.StringVar()
-        type_values = ["-- Всі види --"] + [t.name for t in self.all_types]
         self.type_combo = ttk.Combobox(search_frame, textvariable=self.type_var,
-                                        values=type_values, state='readonly', width=25)
+                                        values=["-- Всі види --"], state='readonly', width=25)
         self.type_combo.current(0)
-        self.type_combo.grid(row=1, column=3, sticky='w', pady=3)
+        self.type_combo.grid(row=0, column=3, sticky='w', pady=3)
+        
+        # Kind filter
+        ttk.Label(search_frame, text="Тип:").grid(row=1, column=0, sticky='w', pady=3, padx=5)
+        self.kind_var = tk.StringVar()
+        self.kind_combo = ttk.Combobox(search_frame, textvariable=self.kind_var,
+                                        values=["-- Всі типи --"] + list(self.KINDS), state='readonly', width=25)
+        self.kind_combo.current(0)
+        self.kind_combo.grid(row=1, column=1, sticky='w', pady=3)
+        
+        # Storage location filter
+        ttk.Label(search_frame, text="Місце:").grid(row=1, column=2, sticky='w', pady=3, padx=(20, 5))
+        self.location_var = tk.StringVar()
+        self.location_combo = ttk.Combobox(search_frame, textvariable=self.location_var,
+                                            values=["-- Всі місця --"], state='readonly', width=25)
+        self.location_combo.current(0)
+        self.location_combo.grid(row=1, column=3, sticky='w', pady=3)
+        
+        # Year range
+        ttk.Label(search_frame, text="Рік:").grid(row=2, column=0, sticky='w', pady=3, padx=5)
+        year_frame = ttk.Frame(search_frame)
+        year_frame.grid(row=2, column=1, sticky='w', pady=3)
+        self.year_from_var = tk.StringVar()
+        self.year_to_var = tk.StringVar()
+        ttk.Label(year_frame, text="від").pack(side='left')
+        self.year_from_entry = ttk.Entry(year_frame, textvariable=self.year_from_var, width=6)
+        self.year_from_entry.pack(side='left', padx=(3, 8))
+        ttk.Label(year_frame, text="до").pack(side='left')
+        self.year_to_entry = ttk.Entry(year_frame, textvariable=self.year_to_var, width=6)
+        self.year_to_entry.pack(side='left', padx=3)
+        self.decade_combo = ttk.Combobox(year_frame, values=["-- Десятиліття --"], state='readonly', width=18)
+        self.decade_combo.current(0)
+        self.decade_combo.pack(side='left', padx=(8, 0))
+        self.decade_combo.bind('<<ComboboxSelected>>', lambda e: self.on_decade_selected())
+        
+        # Author and genre filters (multi-select, any/all)
+        ttk.Label(search_frame, text="Автори:").grid(row=3, column=0, sticky='nw', pady=3, padx=5)
+        self.authors_listbox, self.author_match_var = self.create_multi_select(search_frame, row=3, column=1)
+        ttk.Label(search_frame, text="Жанри:").grid(row=3, column=2, sticky='nw', pady=3, padx=(20, 5))
+        self.genres_listbox, self.genre_match_var = self.create_multi_select(search_frame, row=3, column=3)
+        
+        # Search mode
+        self.fulltext_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Повнотекстовий пошук (назва, автори, жанри)",
+                        variable=self.fulltext_var, command=self.on_mode_changed
+                        ).grid(row=4, column=0, columnspan=4, sticky='w', pady=3, padx=5)
         
         # Buttons
         btn_frame = ttk.Frame(search_frame)
-        btn_frame.grid(row=2, column=0, columnspan=4, pady=(10, 0))
+        btn_frame.grid(row=5, column=0, columnspan=4, pady=(10, 0))
         
         ttk.Button(btn_frame, text="🔍 Шукати", command=self.search).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="🔄 Скинути", command=self.reset).pack(side='left', padx=5)
@@ -71,6 +125,16 @@ class SearchView(ttk.Frame):
         # Bind Enter key to search
         self.title_entry.bind('<Return>', lambda e: self.search())
         
+        # Live search as the criteria change
+        for var in (self.title_var, self.year_from_var, self.year_to_var,
+                    self.author_match_var, self.genre_match_var):
+            var.trace_add('write', lambda *args: self.on_criteria_changed())
+        # The decade combo has its own handler, bound above
+        for combo in (self.type_combo, self.kind_combo, self.location_combo):
+            combo.bind('<<ComboboxSelected>>', lambda e: self.on_criteria_changed())
+        for listbox in (self.authors_listbox, self.genres_listbox):
+            listbox.bind('<<ListboxSelect>>', lambda e: self.on_criteria_changed())
+        
         # Results section
         results_frame = ttk.LabelFrame(self, text="Результати пошуку", padding=5)
         results_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -79,121 +143,288 @@ class SearchView(ttk.Frame):
         self.results_label = ttk.Label(results_frame, text="Введіть критерії пошуку та натисніть 'Шукати'")
         self.results_label.pack(anchor='w', pady=5)
         
-        # Results treeview
-        tree_frame = ttk.Frame(results_frame)
-        tree_frame.pack(fill='both', expand=True)
-        
+        # Results list: only the visible rows exist as Treeview items
         columns = ('title', 'kind', 'authors', 'genres', 'type', 'year', 'location')
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', selectmode='browse')
-        
-        self.tree.heading('title', text='Назва')
-        self.tree.heading('kind', text='Тип')
-        self.tree.heading('authors', text='Автор(и)')
-        self.tree.heading('genres', text='Жанр(и)')
-        self.tree.heading('type', text='Вид')
-        self.tree.heading('year', text='Рік')
-        self.tree.heading('location', text='Місце')
-        
-        self.tree.column('title', width=200)
-        self.tree.column('kind', width=80)
-        self.tree.column('authors', width=150)
-        self.tree.column('genres', width=120)
-        self.tree.column('type', width=120)
-        self.tree.column('year', width=50, anchor='center')
-        self.tree.column('location', width=120)
-        
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
-        h_scrollbar = ttk.Scrollbar(tree_frame, orient='horizontal', command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        self.tree.grid(row=0, column=0, sticky='nsew')
-        v_scrollbar.grid(row=0, column=1, sticky='ns')
-        h_scrollbar.grid(row=1, column=0, sticky='ew')
-        
-        tree_frame.grid_rowconfigure(0, weight=1)
-        tree_frame.grid_columnconfigure(0, weight=1)
+        self.list = VirtualList(results_frame, columns)
+        self.list.pack(fill='both', expand=True)
+        
+        self.list.heading('title', text='Назва')
+        self.list.heading('kind', text='Тип')
+        self.list.heading('authors', text='Автор(и)')
+        self.list.heading('genres', text='Жанр(и)')
+        self.list.heading('type', text='Вид')
+        self.list.heading('year', text='Рік')
+        self.list.heading('location', text='Місце')
+        
+        self.list.column('title', width=200)
+        self.list.column('kind', width=80)
+        self.list.column('authors', width=150)
+        self.list.column('genres', width=120)
+        self.list.column('type', width=120)
+        self.list.column('year', width=50, anchor='center')
+        self.list.column('location', width=120)
+    
+    def create_multi_select(self, parent, row, column):
+        """Create a multi-select list with an any/all switch; return (listbox, match_var)."""
+        frame = ttk.Frame(parent)
+        frame.grid(row=row, column=column, sticky='w', pady=3)
+        
+        list_frame = ttk.Frame(frame)
+        list_frame.pack(fill='x')
+        listbox = tk.Listbox(list_frame, selectmode='multiple', height=4, width=28, exportselection=False)
+        scroll = ttk.Scrollbar(list_frame, orient='vertical', command=listbox.yview)
+        listbox.configure(yscrollcommand=scroll.set)
+        listbox.pack(side='left', fill='both', expand=True)
+        scroll.pack(side='right', fill='y')
+        
+        match_var = tk.StringVar(value='any')
+        ttk.Radiobutton(frame, text="будь-який", variable=match_var, value='any').pack(side='left')
+        ttk.Radiobutton(frame, text="усі", variable=match_var, value='all').pack(side='left', padx=5)
+        return listbox, match_var
+    
+    def combos(self):
+        """Get the filter comboboxes."""
+        return (self.type_combo, self.kind_combo, self.location_combo, self.decade_combo)
+    
+    def has_filters(self):
+        """Check whether any field filter is set."""
+        return (any(combo.current() > 0 for combo in self.combos())
+                or bool(self.authors_listbox.curselection() or self.genres_listbox.curselection())
+                or bool(self.year_from_var.get().strip() or self.year_to_var.get().strip()))
     
     def refresh_dropdowns(self):
-        """Refresh dropdown values with latest data."""
-        self.all_authors = models.get_all_authors()
-        self.all_genres = models.get_all_genres()
-        self.all_types = models.get_all_publication_types()
-        
-        self.author_combo['values'] = ["-- Всі автори --"] + [a.name for a in self.all_authors]
-        self.genre_combo['values'] = ["-- Всі жанри --"] + [g.name for g in self.all_genres]
-        self.type_combo['values'] = ["-- Всі види --"] + [t.name for t in self.all_types]
-    
-    def search(self):
-        """Perform search with current criteria."""
-        # Refresh dropdowns in case data changed
-        self.refresh_dropdowns()
+        """Refresh dropdown values with latest data (loaded in the background)."""
+        self.rendered_generation = get_generation(self.TABLES)
+        tasks.submit(load_reference_data, channel='search-dropdowns', on_done=self.show_dropdowns)
+    
+    def show_dropdowns(self, data):
+        """Fill the filter dropdowns with loaded reference data."""
+        author_ids = set(self.selected_ids(self.authors_listbox, self.all_authors))
+        genre_ids = set(self.selected_ids(self.genres_listbox, self.all_genres))
+        type_id = self.selected_choice(self.type_combo, [t.id for t in self.all_types])
+        location_id = self.selected_choice(self.location_combo, [loc.id for loc in self.all_locations])
+        self.all_authors, self.all_genres, self.all_types, self.all_locations = data
+        
+        self.update_filter_labels(author_ids, genre_ids)
+        
+        # Keep the chosen type and location if they still exist
+        type_ids = [t.id for t in self.all_types]
+        location_ids = [loc.id for loc in self.all_locations]
+        self.type_combo.current(type_ids.index(type_id) + 1 if type_id in type_ids else 0)
+        self.location_combo.current(location_ids.index(location_id) + 1 if location_id in location_ids else 0)
+    
+    def update_filter_labels(self, author_ids=None, genre_ids=None):
+        """Label the filter choices, with facet counts of the last search if any.
+        
+        author_ids and genre_ids are the ids to select in the lists; by
+        default the current selection is kept.
+        """
+        counts = self.facets or {}
+        
+        def label(name, facet, key):
+            if self.facets is None:
+                return name
+            return f"{name} ({counts[facet].get(key, 0)})"
+        
+        def set_values(combo, values):
+            index = combo.current()
+            combo['values'] = values
+            combo.current(index if 0 <= index < len(values) else 0)
+        
+        set_values(self.type_combo, ["-- Всі види --"] +
+                   [label(t.name, 'type', t.id) for t in self.all_types])
+        set_values(self.location_combo, ["-- Всі місця --"] +
+                   [label(str(loc), 'location', loc.id) for loc in self.all_locations])
+        set_values(self.kind_combo, ["-- Всі типи --"] +
+                   [label(name, 'kind', kind) for name, kind in self.KINDS.items()])
+        
+        # Year buckets of the results; choosing one fills in the year range
+        self.decades = sorted(year for year in counts.get('year', {}) if year is not None)
+        self.decade_combo['values'] = ["-- Десятиліття --"] + [
+            f"{year}–{year + models.YEAR_BUCKET - 1} ({counts['year'][year]})" for year in self.decades]
+        self.decade_combo.current(0)
+        
+        # Refill the lists, keeping the selected authors and genres
+        if author_ids is None:
+            author_ids = set(self.selected_ids(self.authors_listbox, self.all_authors))
+        if genre_ids is None:
+            genre_ids = set(self.selected_ids(self.genres_listbox, self.all_genres))
+        for listbox, items, facet, selected in (
+                (self.authors_listbox, self.all_authors, 'author', author_ids),
+                (self.genres_listbox, self.all_genres, 'genre', genre_ids)):
+            state = listbox.cget('state')
+            top = listbox.yview()[0]
+            listbox.config(state='normal')
+            listbox.delete(0, 'end')
+            listbox.insert('end', *[label(item.name, facet, item.id) for item in items])
+            for i, item in enumerate(items):
+                if item.id in selected:
+                    listbox.selection_set(i)
+            listbox.yview_moveto(top)
+            listbox.config(state=state)
+    
+    def show_facets(self, facets):
+        """Show facet counts of the latest search next to the filter choices."""
+        self.facets = facets
+        self.update_filter_labels()
+    
+    def on_decade_selected(self):
+        """Fill the year range from the chosen decade."""
+        index = self.decade_combo.current()
+        if index > 0:
+            year = self.decades[index - 1]
+            self.year_from_var.set(str(year))
+            self.year_to_var.set(str(year + models.YEAR_BUCKET - 1))
+        self.on_criteria_changed()
+    
+    def selected_choice(self, combo, ids):
+        """Get the id chosen in a combobox whose entries follow `ids`, or None."""
+        index = combo.current()
+        return ids[index - 1] if 0 < index <= len(ids) else None
+    
+    def selected_ids(self, listbox, items):
+        """Get the ids of the items selected in a list."""
+        return [items[i].id for i in listbox.curselection() if i < len(items)]
+    
+    def parse_year(self, var):
+        """Get a year from an entry, or None if it is empty or not a number."""
+        try:
+            return int(var.get().strip())
+        except ValueError:
+            return None
+    
+    def on_mode_changed(self):
+        """Disable the field filters while full-text mode is on."""
+        fulltext = self.fulltext_var.get()
+        for combo in self.combos():
+            combo.config(state='disabled' if fulltext else 'readonly')
+        for widget in (self.authors_listbox, self.genres_listbox, self.year_from_entry, self.year_to_entry):
+            widget.config(state='disabled' if fulltext else 'normal')
+        self.on_criteria_changed()
+    
+    def on_criteria_changed(self):
+        """Restart the debounce timer after a change to the search criteria."""
+        self.changed_at = time.perf_counter()
+        self.cancel_pending()
+        self.debounce_id = self.after(self.debounce_ms, self.live_search)
+    
+    def cancel_pending(self):
+        """Drop a scheduled live search."""
+        if self.debounce_id is not None:
+            self.after_cancel(self.debounce_id)
+            self.debounce_id = None
+    
+    def live_search(self):
+        """Search once typing has paused; with no criteria the results are cleared."""
+        self.debounce_id = None
+        has_filters = not self.fulltext_var.get() and self.has_filters()
+        if self.title_var.get().strip() or has_filters:
+            self.search(started=self.changed_at)
+        else:
+            self.reset_results()
+    
+    def search(self, started=None):
+        """Perform search with current criteria.
+        
+        Each search gets a new generation number; results that arrive for
+        an older generation are dropped, and the superseded query itself is
+        cancelled on the worker.
+        """
+        self.cancel_pending()
+        self.generation += 1
+        generation = self.generation
+        started = started if started is not None else time.perf_counter()
+        on_done = lambda results: self.on_results(generation, started, results)
         
         # Get search parameters
         title = self.title_var.get().strip() or None
         
-        # Get author ID
-        author_id = None
-        author_name = self.author_var.get()
-        if author_name and not author_name.startswith("--"):
-            for a in self.all_authors:
-                if a.name == author_name:
-                    author_id = a.id
-                    break
-        
-        # Get genre ID
-        genre_id = None
-        genre_name = self.genre_var.get()
-        if genre_name and not genre_name.startswith("--"):
-            for g in self.all_genres:
-                if g.name == genre_name:
-                    genre_id = g.id
-                    break
-        
-        # Get type ID
-        type_id = None
-        type_name = self.type_var.get()
-        if type_name and not type_name.startswith("--"):
-            for t in self.all_types:
-                if t.name == type_name:
-                    type_id = t.id
-                    break
-        
-        # Perform search
-        results = models.search_publications(
+        # Full-text mode ranks matches across titles, authors and genres
+        if self.fulltext_var.get():
+            if title:
+                tasks.submit(models.search_text, title, limit=self.FULLTEXT_LIMIT, rows='tuple',
+                             channel='search', on_done=on_done)
+            else:
+                tasks.cancel('search')
+                self.show_results([])
+            return
+        
+        # Resolve filter choices to ids; entries may carry facet counts
+        type_id = self.selected_choice(self.type_combo, [t.id for t in self.all_types])
+        location_id = self.selected_choice(self.location_combo, [loc.id for loc in self.all_locations])
+        
+        # Perform search on the background worker; a newer search supersedes it
+        tasks.submit(
+            models.search_publications,
             title=title,
-            author_id=author_id,
-            genre_id=genre_id,
-            type_id=type_id
+            author_ids=self.selected_ids(self.authors_listbox, self.all_authors),
+            author_match=self.author_match_var.get(),
+            genre_ids=self.selected_ids(self.genres_listbox, self.all_genres),
+            genre_match=self.genre_match_var.get(),
+            type_id=type_id,
+            kind=self.selected_choice(self.kind_combo, list(self.KINDS.values())),
+            location_id=location_id,
+            year_from=self.parse_year(self.year_from_var),
+            year_to=self.parse_year(self.year_to_var),
+            facets=True,
+            rows='tuple',
+            channel='search',
+            on_done=on_done
         )
+    
+    def on_results(self, generation, started, results):
+        """Show results of the current search and record its latency."""
+        if generation != self.generation:
+            return
+        facets = None
+        if isinstance(results, tuple):
+            results, facets = results
+        self.show_results(results)
+        self.show_facets(facets)
         
-        # Clear previous results
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Display results
+        self.latencies.append(time.perf_counter() - started)
+        if self.on_status:
+            median_ms = statistics.median(self.latencies) * 1000
+            self.on_status(f"Пошук: медіана затримки {median_ms:.0f} мс "
+                           f"(останні {len(self.latencies)})")
+    
+    def show_results(self, results):
+        """Display a list of publication rows in the results list."""
+        self.results = results
         self.results_label.config(text=f"Знайдено видань: {len(results)}")
-        
-        for pub in results:
-            kind_display = "📚 Книга" if pub.publication_kind == 'book' else "📰 Періодика"
-            authors = ", ".join([a.name for a in pub.authors]) if pub.authors else "-"
-            genres = ", ".join([g.name for g in pub.genres]) if pub.genres else "-"
-            pub_type = pub.publication_type.name if pub.publication_type else "-"
-            year = pub.year if pub.year else "-"
-            location = str(pub.storage_location) if pub.storage_location else "-"
-            
-            self.tree.insert('', 'end', values=(
-                pub.title, kind_display, authors, genres, pub_type, year, location
-            ))
+        self.list.set_source(len(results), self.fetch_rows)
+    
+    def fetch_rows(self, start, stop):
+        """Get display rows for a slice of the results."""
+        return [(row[0], publication_values(row)) for row in self.results[start:stop]]
+    
+    def get_selected_id(self):
+        """Get the ID of the selected publication."""
+        return self.list.get_selected_key()
     
     def reset(self):
         """Reset all search criteria."""
         self.title_var.set("")
-        self.author_combo.current(0)
-        self.genre_combo.current(0)
-        self.type_combo.current(0)
-        
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.year_from_var.set("")
+        self.year_to_var.set("")
+        self.author_match_var.set('any')
+        self.genre_match_var.set('any')
+        for combo in self.combos():
+            combo.current(0)
+        for listbox in (self.authors_listbox, self.genres_listbox):
+            state = listbox.cget('state')
+            listbox.config(state='normal')
+            listbox.selection_clear(0, 'end')
+            listbox.config(state=state)
+        self.cancel_pending()
+        self.reset_results()
+    
+    def reset_results(self):
+        """Clear the results and drop any search still running."""
+        self.generation += 1
+        tasks.cancel('search')
+        self.results = []
+        self.list.clear()
+        self.show_facets(None)
         
         self.results_label.config(text="Введіть критерії пошуку та натисніть 'Шукати'")
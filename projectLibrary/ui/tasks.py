@@ -0,0 +1,171 @@
+"""
+Background database tasks for Home Library application.
+Runs models calls on a worker thread so the Tk main loop never blocks.
+"""
+import queue
+import threading
+from tkinter import messagebox
+from database import get_connection
+
+
+class Task:
+    """A submitted call. cancel() drops its result if it has not run yet
+    or discards it when it arrives."""
+    
+    def __init__(self, func, args, kwargs, on_done, on_error, channel):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.channel = channel
+        self.cancelled = False
+        self.result = None
+        self.error = None
+    
+    def cancel(self):
+        """Skip the call if it has not started and never deliver its result."""
+        self.cancelled = True
+
+
+class TaskRunner:
+    """Worker thread for database calls with results delivered to Tk.
+    
+    The worker gets its own SQLite connection from database.get_connection(),
+    which is per thread. Finished tasks are handed back through a queue that
+    the Tk main loop polls with after(), so callbacks always run on the Tk
+    thread. Submitting a task on a channel cancels the previous task on the
+    same channel; a query that is already running is aborted through the
+    SQLite progress handler.
+    """
+    
+    # Milliseconds between checks for finished tasks
+    POLL_MS = 20
+    # SQLite virtual machine steps between cancellation checks
+    PROGRESS_STEPS = 1000
+    
+    def __init__(self, root, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.jobs = queue.Queue()
+        self.finished = queue.Queue()
+        self.latest = {}
+        self.pending = 0
+        self.polling = False
+        self.thread = threading.Thread(target=self.work, name="database-worker", daemon=True)
+        self.thread.start()
+    
+    def submit(self, func, *args, on_done=None, on_error=None, channel=None, **kwargs):
+        """Run func(*args, **kwargs) on the worker and pass the result to on_done."""
+        task = Task(func, args, kwargs, on_done, on_error, channel)
+        if channel is not None:
+            previous = self.latest.get(channel)
+            if previous is not None:
+                previous.cancel()
+            self.latest[channel] = task
+        
+        self.pending += 1
+        self.jobs.put(task)
+        self.notify_busy()
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.POLL_MS, self.poll)
+        return task
+    
+    def cancel(self, channel):
+        """Cancel the latest task submitted on a channel, if any."""
+        task = self.latest.pop(channel, None)
+        if task is not None:
+            task.cancel()
+    
+    def work(self):
+        """Worker thread loop."""
+        while True:
+            task = self.jobs.get()
+            if task is None:
+                break
+            if not task.cancelled:
+                # A non-zero return from the handler interrupts the statement
+                conn = get_connection()
+                conn.set_progress_handler(lambda: task.cancelled, self.PROGRESS_STEPS)
+                try:
+                    task.result = task.func(*task.args, **task.kwargs)
+                except Exception as e:
+                    task.error = e
+                finally:
+                    conn.set_progress_handler(None, 0)
+            self.finished.put(task)
+    
+    def poll(self):
+        """Deliver finished tasks on the Tk thread.
+        
+        Polling is rescheduled before any callback runs, so a callback that
+        opens a modal dialog does not hold up later results.
+        """
+        done = []
+        while True:
+            try:
+                done.append(self.finished.get_nowait())
+            except queue.Empty:
+                break
+        
+        self.pending -= len(done)
+        if self.pending:
+            self.root.after(self.POLL_MS, self.poll)
+        else:
+            self.polling = False
+        self.notify_busy()
+        
+        for task in done:
+            if self.latest.get(task.channel) is task:
+                del self.latest[task.channel]
+            if task.cancelled:
+                continue
+            if task.error is not None:
+                if task.on_error:
+                    task.on_error(task.error)
+                else:
+                    messagebox.showerror("Помилка", f"Помилка бази даних: {task.error}")
+            elif task.on_done:
+                task.on_done(task.result)
+    
+    def notify_busy(self):
+        """Report the number of unfinished tasks."""
+        if self.on_busy:
+            self.on_busy(self.pending)
+    
+    def shutdown(self, timeout=5.0):
+        """Cancel queued tasks and stop the worker thread."""
+        for task in self.latest.values():
+            task.cancel()
+        self.jobs.put(None)
+        self.thread.join(timeout)
+
+
+_runner = None
+
+
+def start_runner(root, on_busy=None) -> TaskRunner:
+    """Start the shared task runner for the application window."""
+    global _runner
+    _runner = TaskRunner(root, on_busy)
+    return _runner
+
+
+def submit(func, *args, on_done=None, on_error=None, channel=None, **kwargs) -> Task:
+    """Submit a call to the shared task runner."""
+    return _runner.submit(func, *args, on_done=on_done, on_error=on_error,
+                          channel=channel, **kwargs)
+
+
+def cancel(channel):
+    """Cancel the latest task on a channel of the shared task runner."""
+    _runner.cancel(channel)
+
+
+def shutdown_runner():
+    """Stop the shared task runner, if it was started."""
+    global _runner
+    if _runner is not None:
+        _runner.shutdown()
+        _runner = None
@@ -0,0 +1,22 @@
+"""
+Base frame for Home Library views that track table generations.
+"""
+from tkinter import ttk
+from database import get_generation
+
+
+class TrackedView(ttk.Frame):
+    """Frame showing rows of the TABLES it declares.
+    
+    rendered_generation is the generation of those tables the rows on
+    screen reflect; the main window reloads the view on tab switch when
+    it falls behind.
+    """
+    
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = ()
+    
+    def mark_rendered(self):
+        """Record that the rows already show the view's own latest write,
+        so switching tabs does not reload them."""
+        self.rendered_generation = get_generation(self.TABLES)
@@ -4,11 +4,17 @@ Publication Types management view for Home Library application.
 import tkinter as tk
 from tkinter import ttk, messagebox
 import models
+from database import get_generation
+from ui.row_patcher import RowPatcher
+from ui.tracked_view import TrackedView
 
 
-class TypesView(ttk.Frame):
+class TypesView(TrackedView):
     """Frame for managing publication types."""
     
+    # Tables shown by the view; it is stale after a write to any of them
+    TABLES = ('publication_types',)
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.setup_ui()
@@ -44,17 +50,21 @@ class TypesView(ttk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Applies single-row changes after add/edit/delete
+        self.patcher = RowPatcher(self.tree, sort_key=lambda values: str(values[1]))
+        
         # Double-click to edit
         self.tree.bind('<Double-1>', lambda e: self.edit_type())
     
     def load_data(self):
         """Load types from database."""
+        self.rendered_generation = get_generation(self.TABLES)
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         types = models.get_all_publication_types()
         for pub_type in types:
-            self.tree.insert('', 'end', values=(pub_type.id, pub_type.name))
+            self.tree.insert('', 'end', iid=pub_type.id, values=(pub_type.id, pub_type.name))
     
     def get_selected_id(self):
         """Get the ID of selected item."""
@@ -69,8 +79,9 @@ class TypesView(ttk.Frame):
         self.wait_window(dialog)
         if dialog.result:
             try:
-                models.create_publication_type(dialog.result)
-                self.load_data()
+                pub_type = models.create_publication_type(dialog.result)
+                self.patcher.upsert(pub_type.id, (pub_type.id, pub_type.name))
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося додати вид: {e}")
     
@@ -87,8 +98,9 @@ class TypesView(ttk.Frame):
             self.wait_window(dialog)
             if dialog.result:
                 try:
-                    models.update_publication_type(type_id, dialog.result)
-                    self.load_data()
+                    pub_type = models.update_publication_type(type_id, dialog.result)
+                    self.patcher.upsert(pub_type.id, (pub_type.id, pub_type.name))
+                    self.mark_rendered()
                 except Exception as e:
                     messagebox.showerror("Помилка", f"Не вдалося оновити вид: {e}")
     
@@ -102,7 +114,8 @@ class TypesView(ttk.Frame):
         if messagebox.askyesno("Підтвердження", "Ви впевнені, що хочете видалити цей вид?"):
             try:
                 models.delete_publication_type(type_id)
-                self.load_data()
+                self.patcher.remove(type_id)
+                self.mark_rendered()
             except Exception as e:
                 messagebox.showerror("Помилка", f"Не вдалося видалити вид: {e}")
 
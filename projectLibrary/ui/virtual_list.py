@@ -0,0 +1,297 @@
+"""
+Virtual list widget for Home Library application.
+Shows large result sets in a Treeview that only holds the visible rows.
+"""
+from tkinter import ttk
+from collections import OrderedDict
+
+
+class VirtualList(ttk.Frame):
+    """Treeview-like grid that creates Tk items only for the visible rows.
+    
+    Rows come from a data source set with set_source(count, fetch), where
+    fetch(start, stop) returns a list of (key, values) pairs for that
+    slice. Rows are fetched in blocks as the list scrolls, and a few
+    recently used blocks are kept as a buffer.
+    
+    With selectmode='extended' several rows can be selected; the selection
+    is kept by key, so it survives scrolling the rows out of view.
+    """
+    
+    # Rows fetched from the data source at a time
+    BLOCK_SIZE = 100
+    # Fetched blocks kept in memory
+    CACHE_BLOCKS = 5
+    # Rows moved per mouse wheel step
+    WHEEL_ROWS = 3
+    
+    def __init__(self, parent, columns, selectmode='browse'):
+        super().__init__(parent)
+        self.selectmode = selectmode
+        self.count = 0
+        self.fetch = None
+        self.first = 0
+        self.visible = 1
+        self.selected_index = None
+        self.selected_key = None
+        self.selected_keys = set()
+        self.item_rows = {}
+        self.cache = OrderedDict()
+        self.render_pending = False
+        
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', selectmode=selectmode)
+        self.v_scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        h_scrollbar = ttk.Scrollbar(self, orient='horizontal', command=self.tree.xview)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
+        
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.v_scrollbar.grid(row=0, column=1, sticky='ns')
+        h_scrollbar.grid(row=1, column=0, sticky='ew')
+        
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        
+        self.tree.bind('<Configure>', lambda e: self.render())
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-self.WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(self.WHEEL_ROWS))
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.move_selection(-self.visible))
+        self.tree.bind('<Next>', lambda e: self.move_selection(self.visible))
+        self.tree.bind('<Home>', lambda e: self.move_selection(-self.count))
+        self.tree.bind('<End>', lambda e: self.move_selection(self.count))
+    
+    def heading(self, column, **kwargs):
+        """Configure a column heading."""
+        return self.tree.heading(column, **kwargs)
+    
+    def column(self, column, **kwargs):
+        """Configure a column."""
+        return self.tree.column(column, **kwargs)
+    
+    def set_source(self, count, fetch, keep_position=False):
+        """Show `count` rows provided by fetch(start, stop)."""
+        self.count = count
+        self.fetch = fetch
+        self.cache.clear()
+        if not keep_position:
+            self.first = 0
+            self.selected_index = None
+            self.selected_keys.clear()
+        elif self.selected_index is not None:
+            # Keep the selection only if the same row is still at that index
+            if self.selected_index >= count or self.get_row(self.selected_index)[0] != self.selected_key:
+                self.selected_index = None
+        if self.selected_index is None:
+            self.selected_key = None
+        self.render()
+    
+    def clear(self):
+        """Remove all rows."""
+        self.set_source(0, None)
+    
+    def refresh(self):
+        """Re-read the visible rows from the data source."""
+        self.cache.clear()
+        self.render()
+    
+    def insert_row(self, index):
+        """Account for a row inserted into the source at `index`."""
+        self.count += 1
+        if self.selected_index is not None and self.selected_index >= index:
+            self.selected_index += 1
+        if index < self.first:
+            self.first += 1
+        self.invalidate(index, self.count)
+    
+    def remove_row(self, index):
+        """Account for a row removed from the source at `index`."""
+        self.count -= 1
+        if self.selected_index == index:
+            self.selected_index = None
+            self.selected_key = None
+        elif self.selected_index is not None and self.selected_index > index:
+            self.selected_index -= 1
+        if index < self.first:
+            self.first -= 1
+        self.invalidate(index, self.count)
+    
+    def update_row(self, index):
+        """Account for a changed row at `index`."""
+        self.invalidate(index, index + 1)
+    
+    def select_row(self, index, key):
+        """Select the row at `index`, whose key is `key`."""
+        self.selected_index = index
+        self.selected_key = key
+        self.selected_keys = {key}
+        self.schedule_render()
+    
+    def clear_selection(self):
+        """Unselect all rows."""
+        self.selected_index = None
+        self.selected_key = None
+        self.selected_keys.clear()
+        self.schedule_render()
+    
+    def invalidate(self, start, stop):
+        """Drop cached rows in [start, stop) and redraw on idle."""
+        first_block = start // self.BLOCK_SIZE
+        last_block = max(start, stop - 1) // self.BLOCK_SIZE
+        for block in list(self.cache):
+            if first_block <= block <= last_block:
+                del self.cache[block]
+        self.schedule_render()
+    
+    def schedule_render(self):
+        """Redraw once, after all changes of the current Tk event cycle."""
+        if not self.render_pending:
+            self.render_pending = True
+            self.after_idle(self.idle_render)
+    
+    def idle_render(self):
+        """Redraw scheduled by schedule_render()."""
+        self.render_pending = False
+        self.render()
+    
+    def get_selected_key(self):
+        """Get the key of the selected row, even if it is scrolled away."""
+        return self.selected_key
+    
+    def get_selected_keys(self):
+        """Get the keys of all selected rows."""
+        if self.selectmode == 'extended':
+            return list(self.selected_keys)
+        return [self.selected_key] if self.selected_key is not None else []
+    
+    def get_row(self, index):
+        """Get the (key, values) pair of a row, fetching its block if needed.
+        
+        Rows that vanished from the source since count was taken are blank.
+        """
+        block = index // self.BLOCK_SIZE
+        if block in self.cache:
+            self.cache.move_to_end(block)
+        else:
+            start = block * self.BLOCK_SIZE
+            self.cache[block] = self.fetch(start, min(start + self.BLOCK_SIZE, self.count))
+            if len(self.cache) > self.CACHE_BLOCKS:
+                self.cache.popitem(last=False)
+        rows = self.cache[block]
+        offset = index - block * self.BLOCK_SIZE
+        return rows[offset] if offset < len(rows) else (None, ())
+    
+    def visible_rows(self):
+        """Get how many rows fit in the current height of the tree."""
+        rowheight = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        rowheight = int(rowheight)
+        items = self.tree.get_children()
+        bbox = self.tree.bbox(items[0]) if items else None
+        header = bbox[1] if bbox else rowheight
+        return max(1, (self.tree.winfo_height() - header) // rowheight)
+    
+    def render(self):
+        """Show the rows of the current window in a fixed set of Tk items."""
+        self.visible = self.visible_rows()
+        self.first = max(0, min(self.first, self.count - self.visible))
+        shown = min(self.visible, self.count - self.first)
+        
+        items = list(self.tree.get_children())
+        if len(items) > shown:
+            self.tree.delete(*items[shown:])
+            items = items[:shown]
+        while len(items) < shown:
+            items.append(self.tree.insert('', 'end'))
+        
+        self.item_rows = {}
+        selected_item = None
+        selected_items = []
+        for offset, item in enumerate(items):
+            index = self.first + offset
+            key, values = self.get_row(index)
+            self.tree.item(item, values=values)
+            self.item_rows[item] = index
+            if index == self.selected_index:
+                selected_item = item
+            if key in self.selected_keys:
+                selected_items.append(item)
+        
+        if self.selectmode == 'extended':
+            self.tree.selection_set(selected_items)
+            if selected_item:
+                self.tree.focus(selected_item)
+        elif selected_item:
+            self.tree.selection_set(selected_item)
+            self.tree.focus(selected_item)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        
+        if self.count:
+            self.v_scrollbar.set(self.first / self.count, (self.first + shown) / self.count)
+        else:
+            self.v_scrollbar.set(0, 1)
+    
+    def scroll_to(self, first):
+        """Make `first` the top visible row."""
+        first = max(0, min(first, self.count - self.visible))
+        if first != self.first:
+            self.first = first
+            self.render()
+    
+    def scroll_rows(self, rows):
+        """Scroll by a number of rows."""
+        self.scroll_to(self.first + rows)
+        return 'break'
+    
+    def yview(self, *args):
+        """Scrollbar command: handle 'moveto' and 'scroll' requests."""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * self.count))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.scroll_rows(int(args[1]) * step)
+    
+    def on_mousewheel(self, event):
+        """Scroll on mouse wheel (Windows and macOS deltas)."""
+        direction = -1 if event.delta > 0 else 1
+        return self.scroll_rows(direction * self.WHEEL_ROWS)
+    
+    def on_select(self, event):
+        """Remember the selected row by index and key."""
+        selection = self.tree.selection()
+        if self.selectmode == 'extended':
+            # Only the visible rows can have changed
+            for item, index in self.item_rows.items():
+                key = self.get_row(index)[0]
+                if item in selection:
+                    self.selected_keys.add(key)
+                else:
+                    self.selected_keys.discard(key)
+            focus = self.tree.focus()
+            if focus in selection:
+                selection = (focus,)
+            elif not self.selected_keys:
+                self.selected_index = None
+                self.selected_key = None
+        if selection and selection[0] in self.item_rows:
+            self.selected_index = self.item_rows[selection[0]]
+            self.selected_key = self.get_row(self.selected_index)[0]
+    
+    def move_selection(self, rows):
+        """Move the selection by a number of rows, scrolling as needed."""
+        if not self.count:
+            return 'break'
+        current = self.selected_index if self.selected_index is not None else self.first
+        index = max(0, min(current + rows, self.count - 1))
+        self.selected_index = index
+        self.selected_key = self.get_row(index)[0]
+        self.selected_keys = {self.selected_key}
+        
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        self.render()
+        return 'break'
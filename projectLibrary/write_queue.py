@@ -0,0 +1,258 @@
+"""
+Write coordinator for Home Library application.
+Runs every models write on one writer thread, so writes of this process
+never compete with each other for the SQLite write lock.
+
+The writer takes the lock with BEGIN IMMEDIATE and, when another process
+holds it, retries with exponential backoff instead of failing with
+"database is locked". Writes queued within a short window share one
+transaction; each runs in its own savepoint, so a failing write does not
+undo the others.
+
+Until start() is called, writes run directly on the calling thread.
+"""
+import functools
+import queue
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import database
+
+# Least time, in seconds, spent retrying a locked database before giving
+# up; a longer busy_timeout of the storage profile extends it
+RETRY_SECONDS = 5.0
+# First and longest pause, in seconds, between attempts
+BACKOFF_START = 0.01
+BACKOFF_MAX = 1.0
+# Busy timeout of the writer connection, in milliseconds; retries are
+# handled here with backoff instead
+WRITER_BUSY_TIMEOUT_MS = 100
+
+# Seconds to wait for more writes to join a transaction, and the most
+# writes grouped into one
+GROUP_WINDOW = 0.002
+GROUP_MAX = 50
+
+# SQLite result codes of a locked database
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+@dataclass
+class WriteStats:
+    queued: int = 0
+    max_queued: int = 0
+    writes: int = 0
+    transactions: int = 0
+    retries: int = 0
+    failures: int = 0
+    
+    @property
+    def writes_per_transaction(self) -> float:
+        return self.writes / self.transactions if self.transactions else 0.0
+
+
+class _Job:
+    """A queued write and, once run, its result or error."""
+    
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Check whether an error means another connection holds a lock."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error)
+    return 'locked' in message or 'busy' in message
+
+
+def retry_budget() -> float:
+    """Seconds to keep retrying a write while another process holds the lock.
+    
+    At least the busy_timeout of the storage profile, so a write waits as
+    long as a plain connection would have.
+    """
+    profile = database.STORAGE_PROFILES[database.get_storage_profile()]
+    return max(RETRY_SECONDS, profile.get('busy_timeout', 0) / 1000)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Pause before retry number `attempt` (0-based), with jitter."""
+    delay = min(BACKOFF_START * 2 ** attempt, BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class WriteQueue:
+    """Single writer thread that runs queued writes in grouped transactions."""
+    
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.stats = WriteStats()
+        self.stats_lock = threading.Lock()
+        self.closed = False
+        self.thread = threading.Thread(target=self.work, name="database-writer", daemon=True)
+        self.thread.start()
+    
+    def call(self, func, *args, **kwargs):
+        """Run func on the writer thread and return its result or raise its error."""
+        job = _Job(func, args, kwargs)
+        with self.stats_lock:
+            if self.closed:
+                job = None
+            else:
+                self.stats.queued += 1
+                self.stats.max_queued = max(self.stats.max_queued, self.stats.queued)
+                self.jobs.put(job)
+        if job is None:
+            # Shutting down; nothing will take new jobs from the queue
+            return func(*args, **kwargs)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+    
+    def work(self):
+        """Writer thread loop."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            group = [job]
+            stop = self.collect(group)
+            self.run_group(group)
+            with self.stats_lock:
+                self.stats.queued -= len(group)
+            for job in group:
+                job.done.set()
+            if stop:
+                break
+    
+    def collect(self, group) -> bool:
+        """Add writes that arrive within GROUP_WINDOW to the group.
+        
+        Returns True if the queue was asked to stop meanwhile.
+        """
+        deadline = time.monotonic() + GROUP_WINDOW
+        while len(group) < GROUP_MAX:
+            timeout = deadline - time.monotonic()
+            try:
+                job = self.jobs.get(timeout=timeout) if timeout > 0 else self.jobs.get_nowait()
+            except queue.Empty:
+                return False
+            if job is None:
+                return True
+            group.append(job)
+        return False
+    
+    def run_group(self, group):
+        """Run a group of writes in one transaction, retrying while the
+        database is locked by another process."""
+        database.get_connection().execute(f"PRAGMA busy_timeout = {WRITER_BUSY_TIMEOUT_MS}")
+        deadline = time.monotonic() + retry_budget()
+        attempt = 0
+        while True:
+            try:
+                with database.transaction(immediate=True) as conn:
+                    for job in group:
+                        self.run_job(conn, job)
+                break
+            except sqlite3.OperationalError as e:
+                remaining = deadline - time.monotonic()
+                if not is_busy_error(e) or remaining <= 0:
+                    if is_busy_error(e):
+                        with self.stats_lock:
+                            self.stats.failures += 1
+                    for job in group:
+                        job.result, job.error = None, e
+                    return
+                with self.stats_lock:
+                    self.stats.retries += 1
+                # The last pause ends at the deadline for one final attempt
+                time.sleep(min(backoff_delay(attempt), remaining))
+                attempt += 1
+        with self.stats_lock:
+            self.stats.writes += len(group)
+            self.stats.transactions += 1
+    
+    def run_job(self, conn, job):
+        """Run one write in a savepoint of the group transaction.
+        
+        A busy error aborts the whole group so it can be retried; any other
+        error only undoes this write and is handed back to its caller.
+        """
+        conn.execute("SAVEPOINT queued_write")
+        try:
+            job.result = job.func(*job.args, **job.kwargs)
+            job.error = None
+        except Exception as e:
+            if is_busy_error(e):
+                raise
+            conn.execute("ROLLBACK TO queued_write")
+            database.run_rollback_hooks()
+            job.result, job.error = None, e
+        conn.execute("RELEASE queued_write")
+    
+    def get_stats(self) -> WriteStats:
+        with self.stats_lock:
+            return WriteStats(**vars(self.stats))
+    
+    def shutdown(self, timeout=5.0):
+        """Finish the queued writes and stop the writer thread."""
+        with self.stats_lock:
+            self.closed = True
+            self.jobs.put(None)
+        self.thread.join(timeout)
+
+
+_queue = None
+
+
+def start() -> WriteQueue:
+    """Start routing models writes through the shared writer thread."""
+    global _queue
+    if _queue is None:
+        _queue = WriteQueue()
+    return _queue
+
+
+def stop():
+    """Stop the writer thread; later writes run on the calling thread."""
+    global _queue
+    if _queue is not None:
+        writer, _queue = _queue, None
+        writer.shutdown()
+
+
+def get_stats():
+    """Get the writer statistics, or None when the queue is not running."""
+    return _queue.get_stats() if _queue is not None else None
+
+
+def queued_write(func):
+    """Decorator for models functions that write.
+    
+    The call runs on the writer thread while the queue is running. It runs
+    directly when the queue is stopped, on the writer thread itself, and
+    inside a caller's transaction() block, which must stay on its thread.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        writer = _queue
+        if (writer is None or threading.current_thread() is writer.thread
+                or database.in_transaction()):
+            return func(*args, **kwargs)
+        return writer.call(func, *args, **kwargs)
+    wrapper.__queued_write__ = True
+    return wrapper